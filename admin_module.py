@@ -15,30 +15,51 @@ Behaviour is 100% preserved.
 
 import os
 import subprocess
+import time
 import streamlit as st
 
-from database import (
-    list_book_names,
-    load_unreadable,
-    load_approved_practices,
-    save_approved_practices,
-    load_practice_candidates,
-    save_practice_candidates,
-    load_sessions,
-    save_sessions,
-    SESSION_TTL_MINUTES,
+from json_store import read_json, atomic_write_json
+from candidate_queue import get_candidate_queue, book_name
+from candidate_scanner import plan_scan, run_incremental_scan
+from practice_store import (
+    get_practice_store,
+    LEVEL_BANDS,
+    PRACTICE_KINDS,
+    practice_deity,
+    practice_level,
+    practice_age_group,
+    StaleEntryError,
 )
-from admin_tools import (
-    scan_practice_candidates_from_chroma,
-    fetch_online_practices,
+from online_suggestions import fetch_suggestions, cache_stats as online_cache_stats
+from book_catalog import (
+    book_catalog,
+    book_names,
+    book_watermark,
+    books_needing_reindex,
+    index_chunk_counts,
+    last_reindex,
+    record_reindex,
+)
+from book_uploads import save_uploaded_book
+from media_store import release_media, collect_garbage
+from media_derivatives import existing_derivative, ensure_derivatives, backfill_derivatives
+from media_server import media_src
+from session_store import load_session_records, session_expired
+from warmup import start_warmup, warmup_status
+from metrics import snapshot as metrics_snapshot, rate as metrics_rate
+from passage_store import cache_stats as passage_cache_stats
+from profiling import (
+    list_profiles,
+    profiling_active,
+    request_profiling,
+    top_functions,
 )
 
 from practices_module import (
     get_practice_candidates,
     approve_selected_candidates,
+    reject_selected_candidates,
     filter_candidates_by_books,
-    meditation_band,
-    mantra_band,
     get_approved,
     update_approved_list,
 )
@@ -48,8 +69,9 @@ from guidance_module import (
 )
 
 from feedback_module import (
-    load_feedback,
-    save_feedback,
+    load_feedback_page,
+    delete_feedback,
+    feedback_log_version,
 )
 
 from reflection_module import (
@@ -60,6 +82,10 @@ from reflection_module import (
 BOOKS_DIR = "books"
 os.makedirs(BOOKS_DIR, exist_ok=True)
 
+# Approved-practices pagination
+PAGE_SIZE_OPTIONS = [5, 10, 20, 50]
+ADMIN_PAGE_SIZE = int(os.environ.get("ADMIN_PAGE_SIZE", "10"))
+
 
 # ----------------------------------------
 # MAIN ENTRY POINT
@@ -78,6 +104,7 @@ def render_admin_panel():
             "Daily reflection",
             "Internet search",
             "Feedback collection",
+            "Operations",
         ],
         horizontal=True,
         key="admin_view_mode",
@@ -104,6 +131,9 @@ def render_admin_panel():
     elif admin_view == "Feedback collection":
         render_feedback_panel()
 
+    elif admin_view == "Operations":
+        render_operations_panel()
+
 
 
 # ============================================================
@@ -127,27 +157,17 @@ def render_books_indexing_panel():
 
     if uploaded_books and st.button("📥 Save uploaded books", key="save_uploaded_books"):
         saved_files = []
+        duplicates = []
 
         for f in uploaded_books:
-            original_name = os.path.basename(f.name)
-            if not original_name:
-                continue
-
-            base, ext = os.path.splitext(original_name)
-            if not ext:
-                ext = ".pdf"
-
-            dest_path = os.path.join(BOOKS_DIR, original_name)
-
-            counter = 1
-            while os.path.exists(dest_path):
-                dest_path = os.path.join(BOOKS_DIR, f"{base}_{counter}{ext}")
-                counter += 1
+            status, name = save_uploaded_book(f, BOOKS_DIR)
+            if status == "saved":
+                saved_files.append(name)
+            elif status == "duplicate":
+                duplicates.append(f"{os.path.basename(f.name)} (same as {name})")
 
-            with open(dest_path, "wb") as out:
-                out.write(f.getbuffer())
-
-            saved_files.append(os.path.basename(dest_path))
+        if duplicates:
+            st.warning(f"Skipped {len(duplicates)} already uploaded: {', '.join(duplicates)}")
 
         if saved_files:
             st.success(f"Saved {len(saved_files)}: {', '.join(saved_files)}")
@@ -155,8 +175,19 @@ def render_books_indexing_panel():
 
     st.markdown("---")
 
+    pending = books_needing_reindex(BOOKS_DIR)
+    if pending:
+        st.info(f"{len(pending)} book(s) new or changed since the last reindex.")
+
+    last = last_reindex()
+    if last:
+        status = "ok" if last.get("ok") else "failed"
+        st.caption(f"Last reindex: {last['at']} ({last['seconds']}s, {status})")
+
     if st.button("🔄 Reindex books now", key="admin_reindex"):
         with st.spinner("Reindexing..."):
+            marks = {name: book_watermark(name, BOOKS_DIR) for name in book_names(BOOKS_DIR)}
+            started = time.time()
             try:
                 result = subprocess.run(
                     ["python3", "prepare_data.py"],
@@ -164,6 +195,7 @@ def render_books_indexing_panel():
                     capture_output=True,
                     text=True,
                 )
+                record_reindex(marks, started, ok=True, chunk_counts=index_chunk_counts())
                 st.success("Reindexing completed.")
 
                 if result.stdout:
@@ -173,24 +205,35 @@ def render_books_indexing_panel():
 
                 st.cache_data.clear()
                 st.cache_resource.clear()
+                start_warmup(force=True)
 
             except subprocess.CalledProcessError as e:
+                record_reindex(marks, started, ok=False)
                 st.error("Reindex failed.")
                 st.text_area("error", e.stderr or str(e), height=200)
 
     st.markdown("---")
 
-    unreadable = load_unreadable()
+    catalog = book_catalog(BOOKS_DIR)
+
+    unreadable = {name: meta for name, meta in catalog.items() if not meta["readable"]}
     if unreadable:
         st.warning("Unreadable books:")
-        for path, reason in unreadable.items():
-            st.write(f"- `{os.path.basename(path)}` — {reason}")
+        for name, meta in unreadable.items():
+            st.write(f"- `{name}` — {meta['unreadable_reason']}")
 
-    book_list = list_book_names()
-    if book_list:
+    if catalog:
         with st.expander("Books available"):
-            for b in book_list:
-                st.write("•", b)
+            for name, meta in catalog.items():
+                details = [f"{meta['size'] / (1024 * 1024):.1f} MB"]
+                if meta.get("pages"):
+                    details.append(f"{meta['pages']} pages")
+                if meta.get("chunks") is not None:
+                    details.append(f"{meta['chunks']} chunks")
+                details.append(
+                    f"indexed {meta['last_indexed']}" if meta.get("last_indexed") else "not indexed yet"
+                )
+                st.write("•", name, f"({', '.join(details)})")
     else:
         st.info("No books found in `books/`.")
 
@@ -203,9 +246,14 @@ def render_books_indexing_panel():
 def render_approved_practices_panel():
     st.subheader("✅ Approved practices overview")
 
-    approved = load_approved_practices()
-    med_practices = approved.get("meditation", []) or []
-    mantra_practices = approved.get("mantra", []) or []
+    store = get_practice_store()
+
+    page_size = st.selectbox(
+        "Practices per page",
+        PAGE_SIZE_OPTIONS,
+        index=PAGE_SIZE_OPTIONS.index(ADMIN_PAGE_SIZE) if ADMIN_PAGE_SIZE in PAGE_SIZE_OPTIONS else 0,
+        key="approved_page_size",
+    )
 
     col_m, col_mantra = st.columns(2)
 
@@ -215,71 +263,25 @@ def render_approved_practices_panel():
     with col_m:
         st.markdown("### 🧘 Meditation practices")
 
-        if not med_practices:
+        if not store.count("meditation"):
             st.info("No meditation practices approved yet.")
         else:
             level_filter = st.selectbox(
                 "Filter by level band",
-                ["All levels", "Beginner", "Intermediate", "Deeper"],
+                ["All levels", *LEVEL_BANDS],
                 key="meditation_level_filter",
             )
 
-            for idx, practice in enumerate(med_practices, start=1):
-                band = meditation_band(idx)
+            filters = {"band": None if level_filter == "All levels" else level_filter}
+            med_practices, total = _fetch_page(
+                "med_page", filters, page_size,
+                lambda offset, limit: store.query_page("meditation", offset, limit, **filters),
+            )
 
-                if level_filter != "All levels" and band != level_filter:
-                    continue
+            for practice in med_practices:
+                _render_meditation_entry(practice)
 
-                src = practice.get("source") or "manual-guidance"
-                text_full = practice.get("text", "") or ""
-
-                preview = text_full[:260] + ("..." if len(text_full) > 260 else "")
-                header = f"Meditation {idx} ({band}) — Source: {os.path.basename(src)}"
-
-                with st.expander(header, expanded=False):
-                    st.markdown(
-                        f"<div class='source-text'>{preview}</div>",
-                        unsafe_allow_html=True
-                    )
-
-                    audio = practice.get("audio_path")
-                    if audio and os.path.exists(audio):
-                        st.audio(audio)
-
-                    image = practice.get("image_path")
-                    if image and os.path.exists(image):
-                        st.image(image)
-
-                    video = practice.get("video_path")
-                    if video and os.path.exists(video):
-                        st.video(video)
-
-                    new_text = st.text_area(
-                        "Edit meditation text",
-                        value=text_full,
-                        key=f"med_edit_text_{idx}",
-                        height=180,
-                    )
-
-                    col_save, col_delete = st.columns(2)
-
-                    with col_save:
-                        if st.button("Save changes", key=f"med_save_{idx}"):
-                            med_list = approved.get("meditation", [])
-                            med_list[idx - 1]["text"] = new_text.strip()
-                            approved["meditation"] = med_list
-                            save_approved_practices(approved)
-                            st.success("Saved.")
-                            st.rerun()
-
-                    with col_delete:
-                        if st.button("Delete", key=f"med_delete_{idx}"):
-                            med_list = approved.get("meditation", [])
-                            med_list.pop(idx - 1)
-                            approved["meditation"] = med_list
-                            save_approved_practices(approved)
-                            st.warning("Deleted.")
-                            st.rerun()
+            _render_page_controls("med_page", total, page_size)
 
     # ---------------------------
     # Mantras
@@ -287,15 +289,11 @@ def render_approved_practices_panel():
     with col_mantra:
         st.markdown("### 📿 Mantra practices")
 
-        if not mantra_practices:
+        if not store.count("mantra"):
             st.info("No mantra practices approved yet.")
             return
 
-        deity_names = sorted(
-            { (p.get("deity") or "General").strip() or "General"
-              for p in mantra_practices },
-            key=str.lower
-        )
+        deity_names = store.deities("mantra")
 
         deity_filter = st.selectbox(
             "Filter by deity",
@@ -305,139 +303,313 @@ def render_approved_practices_panel():
 
         level_filter = st.selectbox(
             "Filter by level band",
-            ["All levels", "Beginner", "Intermediate", "Deeper"],
+            ["All levels", *LEVEL_BANDS],
             key="mantra_level_filter",
         )
 
-        for idx, practice in enumerate(mantra_practices, start=1):
+        filters = {
+            "deity": None if deity_filter == "All deities" else deity_filter,
+            "band": None if level_filter == "All levels" else level_filter,
+        }
+        mantra_practices, total = _fetch_page(
+            "mantra_page", filters, page_size,
+            lambda offset, limit: store.query_page("mantra", offset, limit, **filters),
+        )
 
-            deity = (practice.get("deity") or "General").strip() or "General"
+        for practice in mantra_practices:
+            _render_mantra_entry(practice)
 
-            try:
-                lvl = int(practice.get("level", 1))
-            except:
-                lvl = 1
-
-            band = mantra_band(lvl)
-
-            # Filters
-            if deity_filter != "All deities" and deity != deity_filter:
-                continue
-            if level_filter != "All levels" and band != level_filter:
-                continue
-
-            age_meta = practice.get("age_group") or "both"
-            age_label = (
-                "Children" if age_meta == "child"
-                else "Adults" if age_meta == "adult"
-                else "All ages"
-            )
+        _render_page_controls("mantra_page", total, page_size)
 
-            src = practice.get("source") or "manual-guidance"
-            raw_text = practice.get("mantra_text") or practice.get("text") or ""
-            preview = raw_text[:260] + ("..." if len(raw_text) > 260 else "")
 
-            safe_preview = (
-                preview.replace("&", "&amp;")
-                .replace("<", "&lt;")
-                .replace(">", "&gt;")
-            )
+def _page_offset(key: str, filters: dict, page_size: int) -> int:
+    """Current page offset; back to page 1 whenever filters or page size change."""
+    signature = (tuple(sorted(filters.items())), page_size)
+    if st.session_state.get(f"{key}_signature") != signature:
+        st.session_state[f"{key}_signature"] = signature
+        st.session_state[key] = 0
+    return st.session_state.get(key, 0) * page_size
 
-            heading = f"{deity} — Level {lvl} ({band}) — Visible to: {age_label}"
 
-            with st.expander(heading, expanded=False):
-                st.markdown(
-                    f"<div class='mantra-box'>{safe_preview}</div>",
-                    unsafe_allow_html=True
-                )
+def _fetch_page(key: str, filters: dict, page_size: int, fetch):
+    """
+    fetch(offset, limit) -> (items, total) for the current page. A page left
+    past the end (after deletes or approvals) is clamped to the last one.
+    """
+    offset = _page_offset(key, filters, page_size)
+    items, total = fetch(offset, page_size)
+    if offset and offset >= total:
+        st.session_state[key] = max(0, -(-total // page_size) - 1)
+        items, total = fetch(st.session_state[key] * page_size, page_size)
+    return items, total
 
-                audio = practice.get("audio_path")
-                if audio and os.path.exists(audio):
-                    st.audio(audio)
 
-                image = practice.get("image_path")
-                if image and os.path.exists(image):
-                    st.image(image)
+def _render_page_controls(key: str, total: int, page_size: int):
+    pages = max(1, -(-total // page_size))
+    page = min(st.session_state.get(key, 0), pages - 1)
 
-                video = practice.get("video_path")
-                if video and os.path.exists(video):
-                    st.video(video)
+    col_prev, col_info, col_next = st.columns([1, 2, 1])
 
-                edit_deity = st.text_input(
-                    "Deity",
-                    value=deity,
-                    key=f"mantra_deity_{idx}",
-                )
+    with col_prev:
+        if page > 0 and st.button("◀ Previous", key=f"{key}_prev"):
+            st.session_state[key] = page - 1
+            st.rerun()
 
-                edit_level = st.number_input(
-                    "Level",
-                    min_value=1,
-                    max_value=20,
-                    value=lvl,
-                    step=1,
-                    key=f"mantra_level_{idx}",
-                )
+    with col_info:
+        st.caption(f"Page {page + 1} of {pages} · {total} practices")
 
-                age_index = (
-                    1 if age_meta == "child"
-                    else 2 if age_meta == "adult"
-                    else 0
-                )
-                edit_age = st.selectbox(
-                    "Suitable for:",
-                    ["All ages", "Children", "Adults"],
-                    index=age_index,
-                    key=f"mantra_age_{idx}",
-                )
+    with col_next:
+        if page + 1 < pages and st.button("Next ▶", key=f"{key}_next"):
+            st.session_state[key] = page + 1
+            st.rerun()
 
-                edit_age_code = (
-                    "child" if edit_age == "Children"
-                    else "adult" if edit_age == "Adults"
-                    else "both"
-                )
 
-                edit_mantra_text = st.text_area(
-                    "Mantra text",
-                    value=practice.get("mantra_text") or "",
-                    key=f"mantra_text_edit_{idx}",
-                    height=120,
-                )
+def _load_original(pid: str, field: str) -> bool:
+    """A "Load original" button that stays pressed for the session."""
+    key = f"orig_{field}_{pid}"
+    if st.session_state.get(key):
+        return True
+    if st.button("Load original", key=f"{key}_btn"):
+        st.session_state[key] = True
+        return True
+    return False
+
+
+def _render_practice_media(practice: dict):
+    """
+    Previews by default (media_derivatives); the full-size original is only
+    sent to the browser when asked for. With MEDIA_BASE_URL set, files are
+    referenced by URL (media_server) so players stream them with range
+    requests.
+    """
+    pid = practice["id"]
+    pending = False
+
+    audio = practice.get("audio_path")
+    if audio and os.path.exists(audio):
+        pending |= ensure_derivatives(audio)
+        preview = existing_derivative(audio, "audio_preview")
+        if preview:
+            st.audio(media_src(preview))
+        if _load_original(pid, "audio"):
+            st.audio(media_src(audio))
+
+    image = practice.get("image_path")
+    if image and os.path.exists(image):
+        pending |= ensure_derivatives(image)
+        preview = existing_derivative(image, "preview")
+        if preview:
+            st.image(media_src(preview))
+        if _load_original(pid, "image"):
+            st.image(media_src(image))
+
+    video = practice.get("video_path")
+    if video and os.path.exists(video):
+        pending |= ensure_derivatives(video)
+        preview = existing_derivative(video, "video_preview")
+        poster = existing_derivative(video, "poster")
+        if preview:
+            st.video(media_src(preview))
+        elif poster:
+            st.image(media_src(poster))
+        if _load_original(pid, "video"):
+            st.video(media_src(video))
+
+    if pending:
+        st.caption("Previews are being generated; they appear on a later visit.")
+
+
+def _render_media_thumb(practice: dict):
+    """Small thumbnail (image thumb or video poster) for the list view."""
+    thumb = (
+        existing_derivative(practice.get("image_path"), "thumb")
+        or existing_derivative(practice.get("video_path"), "poster")
+    )
+    if thumb:
+        st.image(media_src(thumb), width=128)
 
-                edit_desc = st.text_area(
-                    "Description",
-                    value=practice.get("text") or "",
-                    key=f"mantra_desc_edit_{idx}",
-                    height=160,
-                )
 
-                col_save, col_delete = st.columns(2)
+def _has_media(practice: dict) -> bool:
+    return any(practice.get(k) for k in ("audio_path", "image_path", "video_path"))
+
+
+def _render_meditation_entry(practice: dict):
+    idx = practice["position"]
+    band = practice["band"]
+    pid = practice["id"]
+
+    src = practice.get("source") or "manual-guidance"
+    text_full = practice.get("text", "") or ""
+
+    preview = text_full[:260] + ("..." if len(text_full) > 260 else "")
+    header = f"Meditation {idx} ({band}) — Source: {os.path.basename(src)}"
+
+    with st.expander(header, expanded=False):
+        st.markdown(
+            f"<div class='source-text'>{preview}</div>",
+            unsafe_allow_html=True
+        )
+
+        _render_media_thumb(practice)
+
+        # Media players and editors are only built when asked for, so a
+        # page of collapsed entries stays cheap to render.
+        if _has_media(practice) and st.checkbox("Show media", key=f"med_media_{pid}"):
+            _render_practice_media(practice)
+
+        if not st.checkbox("Edit", key=f"med_edit_{pid}"):
+            return
+
+        new_text = st.text_area(
+            "Edit meditation text",
+            value=text_full,
+            key=f"med_edit_text_{pid}",
+            height=180,
+        )
+
+        col_save, col_delete = st.columns(2)
+
+        with col_save:
+            if st.button("Save changes", key=f"med_save_{pid}"):
+                if _update_practice(practice, {"text": new_text.strip()}):
+                    st.success("Saved.")
+                    st.rerun()
+
+        with col_delete:
+            if st.button("Delete", key=f"med_delete_{pid}"):
+                if _delete_practice(practice):
+                    st.warning("Deleted.")
+                    st.rerun()
+
+
+def _render_mantra_entry(practice: dict):
+    deity = practice_deity(practice)
+    lvl = practice_level(practice)
+    band = practice["band"]
+    age_meta = practice_age_group(practice)
+    pid = practice["id"]
+
+    age_label = (
+        "Children" if age_meta == "child"
+        else "Adults" if age_meta == "adult"
+        else "All ages"
+    )
+
+    raw_text = practice.get("mantra_text") or practice.get("text") or ""
+    preview = raw_text[:260] + ("..." if len(raw_text) > 260 else "")
+
+    safe_preview = (
+        preview.replace("&", "&amp;")
+        .replace("<", "&lt;")
+        .replace(">", "&gt;")
+    )
+
+    heading = f"{deity} — Level {lvl} ({band}) — Visible to: {age_label}"
+
+    with st.expander(heading, expanded=False):
+        st.markdown(
+            f"<div class='mantra-box'>{safe_preview}</div>",
+            unsafe_allow_html=True
+        )
+
+        _render_media_thumb(practice)
+
+        if _has_media(practice) and st.checkbox("Show media", key=f"mantra_media_{pid}"):
+            _render_practice_media(practice)
+
+        if not st.checkbox("Edit", key=f"mantra_edit_{pid}"):
+            return
+
+        edit_deity = st.text_input(
+            "Deity",
+            value=deity,
+            key=f"mantra_deity_{pid}",
+        )
+
+        edit_level = st.number_input(
+            "Level",
+            min_value=1,
+            max_value=20,
+            value=lvl,
+            step=1,
+            key=f"mantra_level_{pid}",
+        )
+
+        age_index = (
+            1 if age_meta == "child"
+            else 2 if age_meta == "adult"
+            else 0
+        )
+        edit_age = st.selectbox(
+            "Suitable for:",
+            ["All ages", "Children", "Adults"],
+            index=age_index,
+            key=f"mantra_age_{pid}",
+        )
+
+        edit_age_code = (
+            "child" if edit_age == "Children"
+            else "adult" if edit_age == "Adults"
+            else "both"
+        )
+
+        edit_mantra_text = st.text_area(
+            "Mantra text",
+            value=practice.get("mantra_text") or "",
+            key=f"mantra_text_edit_{pid}",
+            height=120,
+        )
+
+        edit_desc = st.text_area(
+            "Description",
+            value=practice.get("text") or "",
+            key=f"mantra_desc_edit_{pid}",
+            height=160,
+        )
+
+        col_save, col_delete = st.columns(2)
 
-                with col_save:
-                    if st.button("Save changes", key=f"mantra_save_{idx}"):
-                        man_list = approved.get("mantra", [])
-                        entry = man_list[idx - 1]
+        with col_save:
+            if st.button("Save changes", key=f"mantra_save_{pid}"):
+                changes = {
+                    "deity": edit_deity.strip(),
+                    "level": int(edit_level),
+                    "age_group": edit_age_code,
+                    "mantra_text": edit_mantra_text.rstrip(),
+                    "text": edit_desc.strip(),
+                }
+                if _update_practice(practice, changes):
+                    st.success("Mantra updated.")
+                    st.rerun()
 
-                        entry["deity"] = edit_deity.strip()
-                        entry["level"] = int(edit_level)
-                        entry["age_group"] = edit_age_code
-                        entry["mantra_text"] = edit_mantra_text.rstrip()
-                        entry["text"] = edit_desc.strip()
+        with col_delete:
+            if st.button("Delete", key=f"mantra_delete_{pid}"):
+                if _delete_practice(practice):
+                    st.warning("Deleted.")
+                    st.rerun()
 
-                        man_list[idx - 1] = entry
-                        approved["mantra"] = man_list
-                        save_approved_practices(approved)
 
-                        st.success("Mantra updated.")
-                        st.rerun()
+def _update_practice(practice: dict, changes: dict) -> bool:
+    """Per-entry save; refuses to overwrite another admin's newer edit."""
+    try:
+        get_practice_store().put(
+            dict(changes, id=practice["id"]),
+            expected_rev=practice.get("rev"),
+        )
+        return True
+    except StaleEntryError:
+        st.error("This practice was changed by someone else. Reload to see the latest version.")
+        return False
 
-                with col_delete:
-                    if st.button("Delete", key=f"mantra_delete_{idx}"):
-                        man_list = approved.get("mantra", [])
-                        man_list.pop(idx - 1)
-                        approved["mantra"] = man_list
-                        save_approved_practices(approved)
-                        st.warning("Deleted.")
-                        st.rerun()
+
+def _delete_practice(practice: dict) -> bool:
+    try:
+        get_practice_store().delete(practice["id"], expected_rev=practice.get("rev"))
+        release_media(practice)
+        return True
+    except StaleEntryError:
+        st.error("This practice was changed by someone else. Reload to see the latest version.")
+        return False
 
 
 
@@ -446,8 +618,165 @@ def render_approved_practices_panel():
 # ============================================================
 
 def render_practice_approval_panel():
-    """Compatibility wrapper — approval is inside Approved Practices panel."""
-    st.info("Practice approval is included inside the ‘Approved practices’ panel.")
+    st.subheader("🗂️ Practice candidates (review queue)")
+
+    _render_candidate_scan()
+
+    queue = get_candidate_queue()
+
+    status_label = st.radio(
+        "Show",
+        ["Pending", "Approved", "Rejected", "Duplicate"],
+        horizontal=True,
+        key="cand_status_filter",
+    )
+    status = status_label.lower()
+
+    book_counts = queue.books(status=status)
+    selected_books = st.multiselect(
+        "Books",
+        [b for b, _ in book_counts],
+        format_func=lambda b: f"{b} ({dict(book_counts).get(b, 0)})",
+        key="cand_book_filter",
+    )
+
+    kind_label = st.radio(
+        "Kind",
+        ["All", "Mantra", "Meditation"],
+        horizontal=True,
+        key="cand_kind_filter",
+    )
+    kind = None if kind_label == "All" else kind_label.lower()
+
+    page_size = st.selectbox(
+        "Candidates per page",
+        [20, 50, 100, 200],
+        key="cand_page_size",
+    )
+
+    filters = {"books": selected_books, "kind": kind, "status": status}
+    candidates, total = _fetch_page(
+        "cand_page",
+        {"books": tuple(selected_books), "kind": kind, "status": status},
+        page_size,
+        lambda offset, limit: queue.page(offset, limit, **filters),
+    )
+
+    if not total:
+        st.info("No candidates match these filters.")
+        return
+
+    # A form keeps checkbox clicks from triggering a rerun each time.
+    with st.form("candidate_review_form"):
+        picked = []
+        for cand in candidates:
+            cid = cand["id"]
+            text = cand.get("text") or ""
+            preview = text[:260] + ("..." if len(text) > 260 else "")
+            label = (
+                f"**{(cand.get('kind') or '?').upper()}** — "
+                f"{book_name(cand.get('source') or '') or 'unknown source'}"
+            )
+            if cand.get("dup_of"):
+                label += f" — duplicate of `{cand['dup_of']}`"
+
+            col_ck, col_txt = st.columns([1, 12])
+            with col_ck:
+                if st.checkbox("Select", key=f"cand_pick_{cid}", label_visibility="collapsed"):
+                    picked.append(cid)
+            with col_txt:
+                st.markdown(label)
+                st.markdown(
+                    f"<div class='source-text'>{preview}</div>",
+                    unsafe_allow_html=True,
+                )
+
+        if status == "pending":
+            col_a, col_r = st.columns(2)
+            with col_a:
+                approve_clicked = st.form_submit_button("✅ Approve selected")
+            with col_r:
+                reject_clicked = st.form_submit_button("🚫 Reject selected")
+        else:
+            approve_clicked = reject_clicked = False
+            st.form_submit_button("Refresh")
+
+    if approve_clicked and picked:
+        _report_approval(*approve_selected_candidates(picked))
+        st.rerun()
+
+    if reject_clicked and picked:
+        rejected = reject_selected_candidates(picked)
+        st.warning(f"Rejected {rejected} candidates.")
+        st.rerun()
+
+    _render_page_controls("cand_page", total, page_size)
+
+    if status == "pending":
+        st.markdown("---")
+        st.caption(f"Bulk actions apply to all {total} candidates matching the filters.")
+        col_all_a, col_all_r = st.columns(2)
+        with col_all_a:
+            if st.button(f"✅ Approve all {total}", key="cand_approve_all"):
+                _report_approval(*approve_selected_candidates(queue.ids(**filters)))
+                st.rerun()
+        with col_all_r:
+            if st.button(f"🚫 Reject all {total}", key="cand_reject_all"):
+                rejected = reject_selected_candidates(queue.ids(**filters))
+                st.warning(f"Rejected {rejected} candidates.")
+                st.rerun()
+
+
+
+def _report_approval(added: int, duplicates: int):
+    st.success(f"Approved {added} candidates.")
+    if duplicates:
+        st.info(f"Skipped {duplicates} near-duplicates of practices already approved.")
+
+
+def _render_candidate_scan():
+    """Incremental scan: only books/kinds that changed since the last scan."""
+    with st.expander("🔎 Scan books for new candidates", expanded=False):
+        kinds = st.multiselect(
+            "Kinds",
+            ["mantra", "meditation"],
+            default=["mantra", "meditation"],
+            key="scan_kinds",
+        )
+        keywords_raw = st.text_input(
+            "Extra keywords (comma separated)",
+            key="scan_extra_keywords",
+        )
+        force = st.checkbox("Rescan everything", key="scan_force")
+
+        extra_keywords = [k.strip() for k in keywords_raw.split(",") if k.strip()]
+        pending = plan_scan(kinds, extra_keywords=extra_keywords, force=force)
+        st.caption(f"{len(pending)} book/kind pairs need scanning.")
+
+        if pending and st.button("Start scan", key="scan_start"):
+            progress = st.progress(0.0)
+            status = st.empty()
+            added_total = dup_total = 0
+            errors = []
+
+            for event in run_incremental_scan(kinds, extra_keywords=extra_keywords, force=force):
+                progress.progress(event["done"] / event["total"])
+                if event["error"]:
+                    errors.append(f"{event['book']} ({event['kind']}): {event['error']}")
+                added_total += event["added"]
+                dup_total += event["duplicates"]
+                status.write(
+                    f"{event['done']}/{event['total']} — {event['book']} "
+                    f"({event['kind']}): {event['found']} found, {event['added']} new, "
+                    f"{event['duplicates']} duplicates"
+                )
+
+            st.success(
+                f"Scan finished: {added_total} new candidates "
+                f"({dup_total} near-duplicates grouped)."
+            )
+            for err in errors:
+                st.error(err)
 
 
 
@@ -568,6 +897,34 @@ def render_guidance_panel():
         st.success("Guidance saved.")
         st.rerun()
 
+    st.markdown("---")
+
+    with st.expander("🖼️ Media previews", expanded=False):
+        st.caption("Previews are made when guidance is saved; this covers older media.")
+        retry = st.checkbox(
+            "Also retry previews that failed before",
+            key="guidance_media_backfill_retry",
+        )
+        if st.button("Generate missing previews", key="guidance_media_backfill"):
+            store = get_practice_store()
+            queued = backfill_derivatives(
+                (e for kind in PRACTICE_KINDS for e in store.list(kind)),
+                retry=retry,
+            )
+            st.success(f"Queued {queued} media files for preview generation.")
+
+    with st.expander("🧹 Unused guidance media", expanded=False):
+        # Both actions walk the media directories, so only on request.
+        col_check, col_delete = st.columns(2)
+        with col_check:
+            if st.button("Check for unused media", key="guidance_media_gc_check"):
+                files, size = collect_garbage(dry_run=True)
+                st.write(f"{files} unreferenced files ({size / 1_048_576:.1f} MB).")
+        with col_delete:
+            if st.button("Delete unused media", key="guidance_media_gc"):
+                files, size = collect_garbage()
+                st.success(f"Removed {files} files ({size / 1_048_576:.1f} MB).")
+
 
 
 # ============================================================
@@ -577,10 +934,8 @@ def render_guidance_panel():
 def render_daily_reflection_panel():
     st.subheader("🪞 Daily reflection (Admin)")
 
-    try:
-        with open("daily_reflection.json", "r", encoding="utf-8") as f:
-            overrides = json.load(f)
-    except Exception:
+    overrides = read_json("daily_reflection.json", {})
+    if not isinstance(overrides, dict):
         overrides = {}
 
     child_val = overrides.get("child", "")
@@ -597,8 +952,7 @@ def render_daily_reflection_panel():
             "adult": new_adult.strip(),
             "both": new_both.strip(),
         }
-        with open("daily_reflection.json", "w", encoding="utf-8") as f:
-            json.dump(new_data, f, ensure_ascii=False, indent=2)
+        atomic_write_json("daily_reflection.json", new_data, indent=2)
         st.success("Daily reflections updated.")
         st.rerun()
 
@@ -636,7 +990,7 @@ def render_internet_search_panel():
             return
 
         with st.spinner("Fetching suggestions..."):
-            results = fetch_online_practices(
+            results = fetch_suggestions(
                 deity_name=deity_name,
                 scope=scope_choice,
                 level_label=level_choice,
@@ -673,7 +1027,7 @@ def render_internet_search_panel():
                 add_flags.append((idx, ck))
 
         if st.button("💾 Save selected suggestions", key="online_save_suggestions"):
-            approved = load_approved_practices()
+            new_entries = []
 
             for idx, flag in add_flags:
                 if not flag:
@@ -684,8 +1038,8 @@ def render_internet_search_panel():
                 if kind not in ("mantra", "meditation"):
                     continue
 
-                approved_list = approved.get(kind) or []
                 entry = {
+                    "kind": kind,
                     "source": "online-generated",
                     "text": item.get("text", "").strip(),
                 }
@@ -695,11 +1049,13 @@ def render_internet_search_panel():
                     entry["level"] = int(item.get("level", 1))
                     entry["age_group"] = item.get("age_group") or "both"
 
-                approved_list.append(entry)
-                approved[kind] = approved_list
+                new_entries.append(entry)
 
-            save_approved_practices(approved)
-            st.success("Saved selected online suggestions.")
+            added, duplicates = get_practice_store().add_unique(new_entries)
+            msg = f"Saved {added} online suggestion(s)."
+            if duplicates:
+                msg += f" Skipped {duplicates} near-duplicate(s) of approved practices."
+            st.success(msg)
             st.session_state["online_search_results"] = []
             st.rerun()
 
@@ -712,12 +1068,30 @@ def render_internet_search_panel():
 def render_feedback_panel():
     st.subheader("💬 User feedback")
 
-    feedback_list = load_feedback()
-    if not feedback_list:
+    # Paging state: a stack of byte offsets into the feedback log, reset
+    # whenever the log is compacted (offsets are only valid per version).
+    version = feedback_log_version()
+    if st.session_state.get("fb_log_version") != version:
+        st.session_state["fb_log_version"] = version
+        st.session_state["fb_page_offsets"] = [0]
+
+    offsets = st.session_state.setdefault("fb_page_offsets", [0])
+
+    page_size = st.selectbox(
+        "Entries per page",
+        [10, 20, 50, 100],
+        index=1,
+        key="fb_page_size",
+    )
+
+    feedback_page, next_offset = load_feedback_page(offsets[-1], page_size)
+    if not feedback_page and len(offsets) == 1:
         st.info("No feedback submitted yet.")
         return
 
-    for idx, fb in enumerate(feedback_list, start=1):
+    first_number = (len(offsets) - 1) * page_size + 1
+
+    for idx, fb in enumerate(feedback_page, start=first_number):
         with st.expander(f"Feedback {idx}", expanded=False):
             st.write(f"**User:** {fb.get('user','Anonymous')}")
             st.write(f"**Date:** {fb.get('date','Unknown')}")
@@ -728,13 +1102,139 @@ def render_feedback_panel():
                 unsafe_allow_html=True,
             )
 
-            if st.button("Delete", key=f"fb_delete_{idx}"):
-                items = load_feedback()
-                if 0 <= idx - 1 < len(items):
-                    items.pop(idx - 1)
-                    save_feedback(items)
-                    st.warning("Feedback deleted.")
-                    st.rerun()
+            if st.button("Delete", key=f"fb_delete_{fb.get('id', idx)}"):
+                delete_feedback(fb.get("id"))
+                st.warning("Feedback deleted.")
+                st.rerun()
+
+    col_prev, col_page, col_next = st.columns([1, 2, 1])
+
+    with col_prev:
+        if len(offsets) > 1 and st.button("◀ Previous", key="fb_prev_page"):
+            offsets.pop()
+            st.rerun()
+
+    with col_page:
+        st.caption(f"Page {len(offsets)}")
+
+    with col_next:
+        if next_offset is not None and st.button("Next ▶", key="fb_next_page"):
+            offsets.append(next_offset)
+            st.rerun()
+
+
+
+# ============================================================
+#  O P E R A T I O N S
+# ============================================================
+
+def _hit_ratio(stats: dict) -> str:
+    total = stats.get("hits", 0) + stats.get("misses", 0)
+    if not total:
+        return "–"
+    return f"{100 * stats['hits'] / total:.0f}% of {total}"
+
+
+def _session_counts():
+    """(active, stored) sessions in the session store."""
+    sessions = load_session_records()
+    active = sum(1 for sess in sessions.values() if not session_expired(sess))
+    return active, len(sessions)
+
+
+def render_operations_panel():
+    st.subheader("📈 Operations")
+    st.caption(
+        "Live figures from this server process's metrics registry "
+        "(other worker processes export theirs to metrics/<pid>.json)."
+    )
+    st.button("🔄 Refresh", key="ops_refresh")
+
+    snap = metrics_snapshot()
+    gauges = snap["gauges"]
+    active, stored = _session_counts()
+
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Questions / min", f"{metrics_rate('chat.questions', 60) * 60:.1f}")
+    col2.metric("Page runs / s", f"{metrics_rate('app.runs', 60):.2f}")
+    col3.metric("LLM in flight", int(gauges.get("llm.in_flight") or 0))
+    col4.metric("Active sessions", f"{active} / {stored} stored")
+
+    st.markdown("#### Stage latency")
+    if snap["histograms"]:
+        st.table([
+            {
+                "stage": name,
+                "calls": int(snap["counters"].get(f"{name}.calls", h["count"])),
+                "errors": int(snap["counters"].get(f"{name}.errors", 0)),
+                "p50 ms": h["p50_ms"],
+                "p95 ms": h["p95_ms"],
+                "p99 ms": h["p99_ms"],
+                "max ms": h["max_ms"],
+            }
+            for name, h in sorted(snap["histograms"].items())
+        ])
+    else:
+        st.info("No requests timed yet in this process.")
+
+    st.markdown("#### Caches")
+    online = online_cache_stats()
+    passages = passage_cache_stats()
+    st.table([
+        {"cache": "Online suggestions", "hit ratio": _hit_ratio(online), "entries": online["entries"]},
+        {"cache": "Chat passages", "hit ratio": _hit_ratio(passages), "entries": passages["entries"]},
+    ])
+
+    st.markdown("#### Background work")
+    last = last_reindex()
+    if last:
+        status = "ok" if last.get("ok") else "failed"
+        st.write(f"Last reindex: {last['at']} — {last['seconds']}s ({status})")
+    else:
+        st.write("Last reindex: not recorded yet")
+
+    warm = warmup_status()
+    warm_time = f" in {warm['seconds']}s" if warm["seconds"] is not None else ""
+    st.write(f"Warm-up: {warm['state']}{warm_time}")
+    if warm["error"]:
+        st.caption(f"Warm-up error: {warm['error']}")
+
+    st.caption(f"Process {snap['pid']}, up {snap['uptime_s'] / 60:.0f} min, span sample rate {snap['sample_rate']}.")
+
+    _render_profiling_section()
+
+
+def _render_profiling_section():
+    st.markdown("#### Profiling")
+
+    if profiling_active(st.session_state):
+        st.info(
+            f"Profiling this session: {st.session_state['profile_remaining']} "
+            "rerun(s) left. Open the page you want to profile."
+        )
+    else:
+        reruns = st.number_input(
+            "Reruns to profile", min_value=1, max_value=50, value=5, key="ops_profile_reruns"
+        )
+        if st.button("⏺ Profile my next reruns", key="ops_profile_start"):
+            request_profiling(st.session_state, reruns)
+            st.rerun()
+        st.caption("To profile a user's session, start the server with PROFILE_RERUNS and PROFILE_USER.")
+
+    profiles = list_profiles()
+    if not profiles:
+        return
+
+    choice = st.selectbox(
+        "Saved profiles",
+        [p["id"] for p in profiles],
+        format_func=lambda pid: next(
+            f"{p['id']} — {p['reruns']} rerun(s), saved {p['saved']}" for p in profiles if p["id"] == pid
+        ),
+        key="ops_profile_choice",
+    )
+    sort = st.radio("Sort by", ["cumulative", "tottime", "calls"], horizontal=True, key="ops_profile_sort")
+    st.table(top_functions(choice, sort=sort))
 
 
 
@@ -14,9 +14,12 @@ from sidebar_module import render_sidebar
 
 # 4. chat/story engine
 from chat_module import render_story_chat, render_saved_stories
+from warmup import start_warmup
+from metrics import inc, start_metrics_exporter
+from profiling import enable_from_env, profile_rerun
 
-# 5. admin panel
-from admin_module import render_admin_panel
+# 5. admin panel: imported on the admin route only (see ROUTING), so user
+#    sessions never load admin_tools, Chroma scanning or the admin stores.
 
 
 # ---------------------
@@ -26,6 +29,14 @@ st.set_page_config(page_title="Dharma Story Chat", page_icon="📚", layout="wid
 apply_global_css()
 
 
+# ---------------------
+# WARM-UP + METRICS (once per server process, in the background)
+# ---------------------
+start_warmup()
+start_metrics_exporter()
+inc("app.runs")
+
+
 # ---------------------
 # RESTORE SESSION (if ?session=token)
 # ---------------------
@@ -56,11 +67,19 @@ show_session_expiry_warning()
 # ---------------------
 role = st.session_state.get("role")
 
-if role == "admin":
-    render_admin_panel()
-else:
-    age_group = st.session_state.get("age_group")
-    render_story_chat(age_group)
-
-    if st.session_state.get("show_history_panel"):
-        render_saved_stories()
+# Profiling (admin toggle or PROFILE_RERUNS / PROFILE_USER) covers the page body.
+enable_from_env(
+    st.session_state,
+    (st.session_state.get("user_profile") or {}).get("username") or st.session_state.get("user_name"),
+)
+
+with profile_rerun(st.session_state, role or "guest"):
+    if role == "admin":
+        from admin_module import render_admin_panel
+        render_admin_panel()
+    else:
+        age_group = st.session_state.get("age_group")
+        render_story_chat(age_group)
+
+        if st.session_state.get("show_history_panel"):
+            render_saved_stories()
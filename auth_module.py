@@ -1,15 +1,17 @@
 import datetime
-import secrets
 import streamlit as st
 
-from auth import (
-    hash_password,
-    check_password,
-    load_users,
-    save_users,
-    get_admin_credentials,
+from auth import get_admin_credentials
+from password_pool import PasswordPoolBusy, hash_password
+from session_store import (
+    age_group_for,
+    authenticate_user,
+    create_session_record,
+    load_user_records,
+    register_user,
 )
-from database import load_sessions, save_sessions
+
+BUSY_MESSAGE = "Sign-in is busy right now. Please try again in a moment."
 
 
 # ---------------------------------------------
@@ -17,33 +19,15 @@ from database import load_sessions, save_sessions
 # ---------------------------------------------
 def _start_session(role: str, username: str):
     """Create a new session token and save it to disk."""
-    sessions = load_sessions()
-    token = secrets.token_urlsafe(16)
-
-    sessions[token] = {
-        "role": role,
-        "username": username,
-        "created_at": datetime.datetime.now().isoformat(),
-    }
-
-    save_sessions(sessions)
-    st.session_state["session_token"] = token
+    st.session_state["session_token"] = create_session_record(role, username)
 
 
 def _set_logged_in_user(username: str, profile: dict):
     """Save user session state values."""
-    year = profile.get("year_of_birth")
-    age_group = None
-
-    if isinstance(year, int):
-        current_year = datetime.datetime.now().year
-        age = current_year - year
-        age_group = "adult" if age >= 22 else "child"
-
     st.session_state.update({
         "role": "user",
         "user_name": profile.get("first_name") or username,
-        "age_group": age_group,
+        "age_group": age_group_for(profile),
         "user_profile": profile,
     })
 
@@ -89,18 +73,21 @@ def _render_user_signin():
             st.error("Password must be at least 8 characters and contain a special character.")
             return
 
-        users = load_users()
-        profile = users.get(username)
+        # Verifies the password and upgrades legacy hashes / old work factors
+        status, profile = authenticate_user(username, password.strip())
 
-        if not profile:
+        if status == "unknown_user":
             st.error("No account found with that username. Please sign up first.")
             return
 
-        stored_pw = profile.get("password", "")
-        if not check_password(password.strip(), stored_pw):
+        if status == "bad_password":
             st.error("Incorrect password.")
             return
 
+        if status == "busy":
+            st.error(BUSY_MESSAGE)
+            return
+
         # Mark user logged in
         _set_logged_in_user(username, profile)
         _start_session("user", username)
@@ -162,15 +149,18 @@ def _render_user_signup():
             return
 
         # Check username availability
-        users = load_users()
-        if username in users:
+        if username in load_user_records():
             st.error("That username is already taken. Choose another.")
             return
 
         # Compute age group
         age = current_year - year
         age_group = "adult" if age >= 22 else "child"
-        hashed_pw = hash_password(password.strip())
+        try:
+            hashed_pw = hash_password(password.strip())
+        except PasswordPoolBusy:
+            st.error(BUSY_MESSAGE)
+            return
 
         # Prepare profile
         profile = {
@@ -183,9 +173,11 @@ def _render_user_signup():
             "password": hashed_pw,
         }
 
-        # Save to users database
-        users[username] = profile
-        save_users(users)
+        # Save to users database (re-checked under the lock: another worker
+        # may have taken the name while we were hashing)
+        if not register_user(username, profile):
+            st.error("That username is already taken. Choose another.")
+            return
 
         # Begin user session
         _set_logged_in_user(username, profile)
@@ -0,0 +1,134 @@
+"""
+benchmarks/import_budget.py
+
+Import-time budget for the non-admin (user) path of app.py.
+
+Run from the repository root:
+
+    python -m benchmarks.import_budget --budget 3.0 --repeat 3
+
+The modules app.py imports at top level are read from app.py itself and
+imported in a fresh interpreter (best of --repeat runs). Exits non-zero if
+the import time exceeds --budget seconds, or if any admin-only module ends
+up loaded on the user path. The admin-module check also runs as a test
+(tests/test_import_budget.py); the timing budget is only checked here.
+"""
+
+import argparse
+import ast
+import json
+import os
+import subprocess
+import sys
+
+APP_FILE = "app.py"
+
+# Modules that only the admin route may import.
+ADMIN_ONLY_MODULES = (
+    "admin_module",
+    "admin_tools",
+    "practices_module",
+    "guidance_module",
+    "feedback_module",
+    "reflection_module",
+    "practice_store",
+    "candidate_queue",
+    "candidate_scanner",
+    "near_duplicates",
+    "online_suggestions",
+    "book_catalog",
+    "book_uploads",
+    "media_store",
+    "media_derivatives",
+)
+
+_CHILD = r"""
+import json, sys, time
+mods = json.loads(sys.argv[1])
+start = time.perf_counter()
+for name in mods:
+    __import__(name)
+elapsed = time.perf_counter() - start
+print(json.dumps({"seconds": elapsed, "modules": sorted(sys.modules)}))
+"""
+
+
+def user_path_imports(app_file: str = APP_FILE) -> list:
+    """Modules app.py imports at module level (i.e. for every session)."""
+    with open(app_file, "r", encoding="utf-8") as f:
+        tree = ast.parse(f.read(), app_file)
+
+    mods = []
+    for node in tree.body:
+        if isinstance(node, ast.Import):
+            mods.extend(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+            mods.append(node.module)
+    return list(dict.fromkeys(mods))
+
+
+def _measure(mods: list):
+    result = subprocess.run(
+        [sys.executable, "-c", _CHILD, json.dumps(mods)],
+        capture_output=True,
+        text=True,
+        cwd=os.getcwd(),
+    )
+    if result.returncode != 0:
+        raise SystemExit(f"importing the user path failed:\n{result.stderr}")
+    return json.loads(result.stdout)
+
+
+def _heaviest(mods: list, top: int):
+    """(cumulative microseconds, module) for the slowest imports, via -X importtime."""
+    code = ";".join(f"import {m}" for m in mods)
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        text=True,
+    )
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        rows.append((int(cumulative_us), name.strip()))
+    return sorted(rows, reverse=True)[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[3])
+    parser.add_argument("--budget", type=float, default=float(os.environ.get("IMPORT_BUDGET_SECONDS", "3.0")))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    mods = user_path_imports()
+    runs = [_measure(mods) for _ in range(max(1, args.repeat))]
+    best = min(r["seconds"] for r in runs)
+    loaded = set(runs[0]["modules"])
+
+    print(f"user path: {', '.join(mods)}")
+    print(f"import time (best of {len(runs)}): {best:.3f}s   budget: {args.budget:.3f}s")
+    print(f"modules loaded: {len(loaded)}")
+
+    print("heaviest imports (cumulative):")
+    for us, name in _heaviest(mods, args.top):
+        print(f"  {us / 1000:9.1f} ms  {name}")
+
+    failures = []
+    leaked = sorted(m for m in ADMIN_ONLY_MODULES if m in loaded)
+    if leaked:
+        failures.append(f"admin-only modules loaded on the user path: {', '.join(leaked)}")
+    if best > args.budget:
+        failures.append(f"import time {best:.3f}s exceeds budget {args.budget:.3f}s")
+
+    for msg in failures:
+        print(f"FAIL: {msg}")
+    if failures:
+        sys.exit(1)
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
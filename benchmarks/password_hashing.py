@@ -0,0 +1,77 @@
+"""
+benchmarks/password_hashing.py
+
+Login throughput at a given hash cost through the public password_pool API,
+one sign-in at a time vs. --users simultaneous sign-ins.
+
+Run from the repository root:
+
+    python -m benchmarks.password_hashing --rounds 200000 --logins 64 --users 16
+
+--users is the number of simultaneous sign-ins (Streamlit script threads).
+"""
+
+import argparse
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import password_pool
+
+
+def _run_logins(check, stored: str, logins: int, users: int):
+    latencies = []
+
+    def one_login(_):
+        start = time.perf_counter()
+        ok = check("correct horse!", stored)
+        latencies.append(time.perf_counter() - start)
+        return ok
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=users) as ex:
+        results = list(ex.map(one_login, range(logins)))
+    elapsed = time.perf_counter() - start
+
+    if not all(results):
+        raise SystemExit("verification failed during benchmark")
+    return elapsed, latencies
+
+
+def _report(label: str, logins: int, elapsed: float, latencies):
+    latencies = sorted(latencies)
+    p95 = latencies[int(0.95 * (len(latencies) - 1))]
+    print(
+        f"{label:<8} {logins / elapsed:8.1f} logins/s   "
+        f"p50 {statistics.median(latencies) * 1000:7.1f} ms   "
+        f"p95 {p95 * 1000:7.1f} ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[3])
+    parser.add_argument("--rounds", type=int, default=password_pool.PASSWORD_HASH_ROUNDS)
+    parser.add_argument("--logins", type=int, default=64)
+    parser.add_argument("--users", type=int, default=16)
+    args = parser.parse_args()
+
+    print(
+        f"rounds={args.rounds} logins={args.logins} users={args.users} "
+        f"pool_workers={password_pool.PASSWORD_POOL_WORKERS}"
+    )
+
+    try:
+        # Also warms the pool so process start-up is not counted.
+        stored = password_pool.hash_password("correct horse!", rounds=args.rounds)
+
+        elapsed, lat = _run_logins(password_pool.check_password, stored, args.logins, 1)
+        _report("serial", args.logins, elapsed, lat)
+
+        elapsed, lat = _run_logins(password_pool.check_password, stored, args.logins, args.users)
+        _report("parallel", args.logins, elapsed, lat)
+    finally:
+        password_pool.shutdown_pool()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+"""
+benchmarks/rag_benchmark.py
+
+Throughput and latency of rag_module.get_answer, without live model services.
+
+Run from the repository root:
+
+    python -m benchmarks.rag_benchmark --requests 200 --users 16 --retrieve-ms 40 --answer-ms 300
+    python -m benchmarks.rag_benchmark --backend real --requests 20 --users 4
+
+The default "stub" backend is a deterministic local stand-in for
+retrieve_passages / answer_question / generate_styled_image. It sleeps
+for the configured latency (+/- --jitter, seeded), as a network-bound model
+call would. "--backend real" uses the real `rag` module against whatever
+local vector index exists; add --build-index to build it from books/
+first with prepare_data.py.
+
+Two runs are reported: serial and concurrent (--users threads, one per
+simulated Streamlit session).
+"""
+
+import argparse
+import hashlib
+import random
+import statistics
+import subprocess
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import rag_module
+
+AGE_GROUPS = ("child", "adult")
+
+
+class StubBackend:
+    """Deterministic stand-in for the `rag` module."""
+
+    def __init__(self, retrieve_ms=40.0, answer_ms=300.0, image_ms=800.0, jitter=0.2, seed=0, passages=4):
+        self.retrieve_ms = retrieve_ms
+        self.answer_ms = answer_ms
+        self.image_ms = image_ms
+        self.jitter = jitter
+        self.passages = passages
+        self._rng = random.Random(seed)
+        self._rng_lock = threading.Lock()
+
+    def _sleep(self, ms: float):
+        with self._rng_lock:
+            factor = 1 + self._rng.uniform(-self.jitter, self.jitter)
+        time.sleep(max(0.0, ms * factor) / 1000)
+
+    def retrieve_passages(self, question, age_group):
+        self._sleep(self.retrieve_ms)
+        digest = hashlib.sha1(f"{question}|{age_group}".encode("utf-8")).hexdigest()
+        return [
+            {"source": f"books/sample_{int(digest[i * 2:i * 2 + 2], 16) % 7}.pdf",
+             "text": f"Passage {digest[i * 8:i * 8 + 8]} about {question[:40]}"}
+            for i in range(self.passages)
+        ]
+
+    def answer_question(self, question, passages, age_group):
+        self._sleep(self.answer_ms)
+        return f"[{age_group}] A story for '{question}' drawing on {len(passages)} passages."
+
+    def generate_styled_image(self, prompt):
+        self._sleep(self.image_ms)
+        return None
+
+
+def _questions(count: int):
+    return [
+        (f"Tell me story number {i} about courage", AGE_GROUPS[i % len(AGE_GROUPS)])
+        for i in range(count)
+    ]
+
+
+def _run(questions, users: int, images: bool):
+    latencies = []
+    lock = threading.Lock()
+
+    def one(item):
+        question, age_group = item
+        start = time.perf_counter()
+        rag_module.get_answer(question, age_group)
+        rag_module.get_sources()
+        if images:
+            rag_module.generate_image(question)
+        with lock:
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    if users <= 1:
+        for item in questions:
+            one(item)
+    else:
+        with ThreadPoolExecutor(max_workers=users) as ex:
+            list(ex.map(one, questions))
+    return time.perf_counter() - start, latencies
+
+
+def _pct(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * (len(values) - 1) + 0.5))]
+
+
+def _report(label: str, elapsed: float, latencies):
+    print(
+        f"{label:<11} {len(latencies) / elapsed:8.1f} req/s   "
+        f"p50 {statistics.median(latencies) * 1000:8.1f} ms   "
+        f"p95 {_pct(latencies, 0.95) * 1000:8.1f} ms   "
+        f"p99 {_pct(latencies, 0.99) * 1000:8.1f} ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[3])
+    parser.add_argument("--backend", choices=["stub", "real"], default="stub")
+    parser.add_argument("--build-index", action="store_true", help="run prepare_data.py first (real backend)")
+    parser.add_argument("--requests", type=int, default=100)
+    parser.add_argument("--users", type=int, default=8)
+    parser.add_argument("--images", action="store_true", help="also call generate_image per request")
+    parser.add_argument("--retrieve-ms", type=float, default=40.0)
+    parser.add_argument("--answer-ms", type=float, default=300.0)
+    parser.add_argument("--image-ms", type=float, default=800.0)
+    parser.add_argument("--jitter", type=float, default=0.2)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    if args.backend == "stub":
+        rag_module.configure_backend(StubBackend(
+            args.retrieve_ms, args.answer_ms, args.image_ms, args.jitter, args.seed,
+        ))
+    else:
+        if args.build_index:
+            subprocess.run(["python3", "prepare_data.py"], check=True)
+        rag_module.configure_backend(None)
+        start = time.perf_counter()
+        rag_module.retrieve_passages("warm up", AGE_GROUPS[0])
+        print(f"backend load + first retrieval: {time.perf_counter() - start:.2f}s")
+
+    print(
+        f"backend={args.backend} requests={args.requests} users={args.users} "
+        f"images={args.images}"
+        + (f" latency(ms) retrieve={args.retrieve_ms} answer={args.answer_ms}" if args.backend == "stub" else "")
+    )
+
+    questions = _questions(args.requests)
+    _report("serial", *_run(questions, 1, args.images))
+    _report("concurrent", *_run(questions, args.users, args.images))
+
+
+if __name__ == "__main__":
+    main()
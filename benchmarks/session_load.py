@@ -0,0 +1,186 @@
+"""
+benchmarks/session_load.py
+
+Concurrent-session load test for account and session storage.
+
+Run from the repository root:
+
+    python -m benchmarks.session_load --processes 8 --threads 4 --users 25 --rounds 20000
+
+Each process stands in for one server worker and each thread for one
+Streamlit session. Every simulated user runs signup -> signin -> restore
+-> logout through the real session_store functions, i.e. the real
+`auth` / `database` storage and the json_store locks.
+
+Data files are created relative to --workdir (default: a fresh temporary
+directory), so production users.json / sessions.json are never touched.
+--rounds sets PASSWORD_HASH_ROUNDS for the run (lower it to stress the
+storage rather than the hashing).
+
+Afterwards the stores are checked for:
+- lost users        signups that returned success but are missing
+- lost sessions     sessions that restore could not find right after signin
+- stale sessions    sessions still stored after logout (a lost delete)
+- corrupted records session records without the expected fields
+The run exits non-zero if any are found.
+"""
+
+import argparse
+import multiprocessing
+import os
+import statistics
+import tempfile
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+OPS = ("signup", "signin", "restore", "logout")
+PASSWORD = "load-test-pw!"
+
+
+def _simulate_user(username: str):
+    """One user's journey; returns ({op: seconds}, token, problems)."""
+    from password_pool import hash_password
+    from session_store import (
+        authenticate_user,
+        create_session_record,
+        end_session,
+        lookup_session,
+        register_user,
+    )
+
+    timings = {}
+    problems = []
+
+    start = time.perf_counter()
+    profile = {
+        "username": username,
+        "first_name": "Load",
+        "year_of_birth": 1990,
+        "password": hash_password(PASSWORD),
+    }
+    if not register_user(username, profile):
+        problems.append("signup rejected")
+    timings["signup"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    status, _ = authenticate_user(username, PASSWORD)
+    if status != "ok":
+        problems.append(f"signin: {status}")
+    token = create_session_record("user", username)
+    timings["signin"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    sess = lookup_session(token)
+    timings["restore"] = time.perf_counter() - start
+    if not sess:
+        problems.append("lost session")
+    elif sess.get("username") != username:
+        problems.append("corrupted session")
+
+    start = time.perf_counter()
+    end_session(token)
+    timings["logout"] = time.perf_counter() - start
+
+    return timings, token, problems
+
+
+def _worker(workdir: str, prefix: str, proc: int, threads: int, users: int):
+    os.chdir(workdir)
+    names = [f"{prefix}_{proc}_{i}" for i in range(users)]
+
+    with ThreadPoolExecutor(max_workers=max(1, threads)) as ex:
+        results = list(ex.map(_simulate_user, names))
+
+    from password_pool import shutdown_pool
+    shutdown_pool()
+
+    return [
+        {"username": name, "timings": timings, "token": token, "problems": problems}
+        for name, (timings, token, problems) in zip(names, results)
+    ]
+
+
+def _pct(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * (len(values) - 1) + 0.5))]
+
+
+def _verify(workdir: str, results):
+    """Check the stores after the run; returns {problem: count}."""
+    os.chdir(workdir)
+    from session_store import load_session_records, load_user_records
+
+    users = load_user_records()
+    sessions = load_session_records()
+
+    counts = {"lost users": 0, "lost sessions": 0, "stale sessions": 0, "corrupted records": 0}
+    for r in results:
+        if "signup rejected" not in r["problems"] and r["username"] not in users:
+            counts["lost users"] += 1
+        if "lost session" in r["problems"]:
+            counts["lost sessions"] += 1
+        if r["token"] in sessions:
+            counts["stale sessions"] += 1
+        if "corrupted session" in r["problems"]:
+            counts["corrupted records"] += 1
+
+    for sess in sessions.values():
+        if not isinstance(sess, dict) or not {"role", "username", "created_at"} <= set(sess):
+            counts["corrupted records"] += 1
+
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[3])
+    parser.add_argument("--processes", type=int, default=4)
+    parser.add_argument("--threads", type=int, default=4, help="concurrent sessions per process")
+    parser.add_argument("--users", type=int, default=25, help="users simulated per process")
+    parser.add_argument("--rounds", type=int, default=None, help="PASSWORD_HASH_ROUNDS for the run")
+    parser.add_argument("--workdir", default=None)
+    args = parser.parse_args()
+
+    if args.rounds:
+        os.environ["PASSWORD_HASH_ROUNDS"] = str(args.rounds)
+    workdir = os.path.abspath(args.workdir or tempfile.mkdtemp(prefix="session-load-"))
+    os.makedirs(workdir, exist_ok=True)
+    prefix = f"loadtest_{uuid.uuid4().hex[:6]}"
+
+    print(
+        f"processes={args.processes} threads={args.threads} users/process={args.users} "
+        f"rounds={os.environ.get('PASSWORD_HASH_ROUNDS', 'default')} workdir={workdir}"
+    )
+
+    ctx = multiprocessing.get_context("spawn")
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=args.processes, mp_context=ctx) as ex:
+        futures = [
+            ex.submit(_worker, workdir, prefix, p, args.threads, args.users)
+            for p in range(args.processes)
+        ]
+        results = [r for f in futures for r in f.result()]
+    elapsed = time.perf_counter() - start
+
+    total_ops = len(results) * len(OPS)
+    print(f"{len(results)} users, {total_ops} operations in {elapsed:.2f}s ({total_ops / elapsed:.1f} ops/s)")
+    for op in OPS:
+        lat = [r["timings"][op] for r in results if op in r["timings"]]
+        print(
+            f"  {op:<8} p50 {statistics.median(lat) * 1000:8.1f} ms   "
+            f"p95 {_pct(lat, 0.95) * 1000:8.1f} ms   "
+            f"p99 {_pct(lat, 0.99) * 1000:8.1f} ms   "
+            f"max {max(lat) * 1000:8.1f} ms"
+        )
+
+    counts = _verify(workdir, results)
+    for name, n in counts.items():
+        print(f"{name:<18} {n}")
+
+    if any(counts.values()):
+        raise SystemExit(1)
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,264 @@
+"""
+book_catalog.py
+
+Cached catalog of the books in books/ with per-book metadata:
+
+    {name: {"size", "mtime_ns", "sha256", "pages", "chunks",
+            "last_indexed", "indexed_mark", "readable", "unreadable_reason"}}
+
+- Metadata is persisted in BOOK_CATALOG_FILE and recomputed for a book only
+  when its size or mtime changes (hash, page count via pypdf if installed).
+- Each process keeps the built catalog in memory, keyed on the books
+  directory mtime and store_version("books"). Adding, removing or renaming
+  a book changes the directory mtime; uploads and reindex runs bump the
+  version. So renders cost one stat() and one small read.
+- Readability comes from database.load_unreadable(), read on rebuild only.
+- The catalog is the source for book lists in the admin panel, candidate
+  filtering, the incremental candidate scanner and upload de-duplication.
+  books_needing_reindex() lists books added or changed since they were
+  last indexed.
+- Chunk counts are taken from the Chroma index after each reindex
+  (index_chunk_counts(), by each chunk's "source" metadata).
+- Readers get copies; the cached catalog itself is never handed out.
+"""
+
+import collections
+import datetime
+import os
+import threading
+import time
+
+from database import load_unreadable
+from json_store import store_lock, store_version, bump_store_version, read_json, atomic_write_json
+from uploads import sha256_file
+
+try:
+    from pypdf import PdfReader
+except ImportError:  # page counts are optional
+    PdfReader = None
+
+BOOKS_DIR = "books"
+CHROMA_DIR = os.environ.get("CHROMA_DIR", "chroma_db")
+BOOK_CATALOG_FILE = "book_catalog.json"
+LEGACY_BOOK_HASH_FILE = "book_hashes.json"
+
+_cache = {}  # books_dir -> (key, catalog)
+_cache_lock = threading.Lock()
+
+
+def _is_book_file(name: str) -> bool:
+    return not name.startswith(".") and not name.endswith(".part")
+
+
+def _now_iso() -> str:
+    return datetime.datetime.now().isoformat(timespec="seconds")
+
+
+def _page_count(path: str):
+    if PdfReader is None or not path.lower().endswith(".pdf"):
+        return None
+    try:
+        return len(PdfReader(path).pages)
+    except Exception:
+        return None
+
+
+def _load_catalog_file() -> dict:
+    data = read_json(BOOK_CATALOG_FILE, {})
+    if not isinstance(data, dict):
+        data = {}
+    data.setdefault("books", {})
+    data.setdefault("last_reindex", None)
+    return data
+
+
+def _dir_mtime(books_dir: str):
+    try:
+        return os.stat(books_dir).st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+
+def _rebuild(books_dir: str) -> dict:
+    """Sync BOOK_CATALOG_FILE with the directory. Call under store_lock("books")."""
+    data = _load_catalog_file()
+    known = data["books"]
+    legacy = None
+
+    entries = list(os.scandir(books_dir)) if os.path.isdir(books_dir) else []
+    fresh = {}
+    changed = False
+
+    for entry in entries:
+        if not entry.is_file() or not _is_book_file(entry.name):
+            continue
+        info = entry.stat()
+        meta = dict(known.get(entry.name) or {})
+
+        if meta.get("size") != info.st_size or meta.get("mtime_ns") != info.st_mtime_ns:
+            if legacy is None:
+                legacy = read_json(LEGACY_BOOK_HASH_FILE, {})
+            old = legacy.get(entry.name) if isinstance(legacy, dict) else None
+            if old and old.get("size") == info.st_size and old.get("mtime_ns") == info.st_mtime_ns:
+                digest = old["sha256"]
+            else:
+                digest = sha256_file(entry.path)
+            meta.update(
+                size=info.st_size,
+                mtime_ns=info.st_mtime_ns,
+                sha256=digest,
+                pages=_page_count(entry.path),
+            )
+            meta.setdefault("chunks", None)
+            meta.setdefault("last_indexed", None)
+            meta.setdefault("indexed_mark", None)
+            changed = True
+
+        fresh[entry.name] = meta
+
+    if changed or set(fresh) != set(known):
+        data["books"] = fresh
+        atomic_write_json(BOOK_CATALOG_FILE, data, indent=2)
+
+    unreadable = {os.path.basename(p): reason for p, reason in (load_unreadable() or {}).items()}
+    catalog = {}
+    for name in sorted(fresh):
+        meta = dict(fresh[name])
+        meta["readable"] = name not in unreadable
+        meta["unreadable_reason"] = unreadable.get(name)
+        catalog[name] = meta
+    return catalog
+
+
+# -----------------------------------------------------------
+# READS
+# -----------------------------------------------------------
+
+def book_catalog(books_dir: str = BOOKS_DIR) -> dict:
+    """{name: metadata} for every book, rebuilt only when something changed."""
+    return {name: dict(meta) for name, meta in _cached_catalog(books_dir).items()}
+
+
+def _cached_catalog(books_dir: str) -> dict:
+    """The shared cached catalog; callers must not modify it."""
+    key = (_dir_mtime(books_dir), store_version("books"))
+    with _cache_lock:
+        hit = _cache.get(books_dir)
+        if hit and hit[0] == key:
+            return hit[1]
+
+    with store_lock("books"):
+        # Re-read the key under the lock so a concurrent writer's bump is seen.
+        key = (_dir_mtime(books_dir), store_version("books"))
+        catalog = _rebuild(books_dir)
+
+    with _cache_lock:
+        _cache[books_dir] = (key, catalog)
+    return catalog
+
+
+def book_names(books_dir: str = BOOKS_DIR) -> list:
+    return list(_cached_catalog(books_dir))
+
+
+def book_hashes(books_dir: str = BOOKS_DIR) -> dict:
+    """{sha256: filename} for every book."""
+    return {meta["sha256"]: name for name, meta in _cached_catalog(books_dir).items()}
+
+
+def book_watermark(name: str, books_dir: str = BOOKS_DIR):
+    """[size, mtime_ns] of a catalogued book, or None."""
+    meta = _cached_catalog(books_dir).get(name)
+    return [meta["size"], meta["mtime_ns"]] if meta else None
+
+
+def books_needing_reindex(books_dir: str = BOOKS_DIR) -> list:
+    """Books added or changed since they were last indexed."""
+    return [
+        name for name, meta in _cached_catalog(books_dir).items()
+        if meta.get("indexed_mark") != [meta["size"], meta["mtime_ns"]]
+    ]
+
+
+def index_chunk_counts(chroma_dir: str = CHROMA_DIR) -> dict:
+    """
+    {book: chunks} counted from the Chroma index by each chunk's "source"
+    metadata. {} when chromadb or the index is unavailable.
+    """
+    if not os.path.isdir(chroma_dir):
+        return {}
+    try:
+        import chromadb  # heavy; only needed after a reindex
+    except ImportError:
+        return {}
+
+    counts = collections.Counter()
+    try:
+        client = chromadb.PersistentClient(path=chroma_dir)
+        for col in client.list_collections():
+            # Older chromadb returns Collection objects, newer ones names.
+            collection = client.get_collection(getattr(col, "name", col))
+            total = collection.count()
+            for offset in range(0, total, 5000):
+                batch = collection.get(include=["metadatas"], limit=5000, offset=offset)
+                for meta in batch.get("metadatas") or []:
+                    source = (meta or {}).get("source")
+                    if source:
+                        counts[os.path.basename(source)] += 1
+    except Exception:
+        return {}
+    return dict(counts)
+
+
+def last_reindex():
+    """{"at", "seconds", "ok"} for the most recent reindex run, or None."""
+    return _load_catalog_file()["last_reindex"]
+
+
+# -----------------------------------------------------------
+# WRITES
+# -----------------------------------------------------------
+
+def record_book(name: str, sha256: str, books_dir: str = BOOKS_DIR):
+    """Record a freshly saved book's hash so it is not re-hashed."""
+    path = os.path.join(books_dir, name)
+    with store_lock("books"):
+        info = os.stat(path)
+        data = _load_catalog_file()
+        data["books"][name] = {
+            "size": info.st_size,
+            "mtime_ns": info.st_mtime_ns,
+            "sha256": sha256,
+            "pages": _page_count(path),
+            "chunks": None,
+            "last_indexed": None,
+            "indexed_mark": None,
+        }
+        atomic_write_json(BOOK_CATALOG_FILE, data, indent=2)
+        bump_store_version("books")
+
+
+def record_reindex(marks: dict, started: float, ok: bool, chunk_counts: dict = None):
+    """
+    Record a reindex run. marks is {name: [size, mtime_ns]} as captured
+    before the run started (see book_watermark); those books are marked
+    indexed if the run succeeded. chunk_counts ({name: n}, see
+    index_chunk_counts) sets their chunk counts; a book missing from a
+    non-empty chunk_counts has none.
+    """
+    seconds = round(time.time() - started, 2)
+    with store_lock("books"):
+        data = _load_catalog_file()
+        at = datetime.datetime.fromtimestamp(started).isoformat(timespec="seconds")
+        if ok:
+            for name, mark in marks.items():
+                meta = data["books"].get(name)
+                if meta is None:
+                    continue
+                meta["last_indexed"] = at
+                meta["indexed_mark"] = mark
+                if chunk_counts:
+                    meta["chunks"] = chunk_counts.get(name, 0)
+        data["last_reindex"] = {"at": at, "seconds": seconds, "ok": ok, "finished": _now_iso()}
+        atomic_write_json(BOOK_CATALOG_FILE, data, indent=2)
+        bump_store_version("books")
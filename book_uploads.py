@@ -0,0 +1,58 @@
+"""
+book_uploads.py
+
+Saving uploaded books into books/ without duplicates.
+
+Uploads are streamed to disk with their SHA-256 computed on the way
+(uploads.stream_upload). A byte-identical book that is already in books/
+is detected and skipped before it lands there, so it is never indexed
+twice. Hashes of existing books come from the book catalog
+(book_catalog.book_hashes), so each book is hashed only once.
+"""
+
+import contextlib
+import os
+
+from book_catalog import BOOKS_DIR, book_hashes, record_book
+from json_store import store_lock
+from uploads import stream_upload
+
+
+def save_uploaded_book(upload, books_dir: str = BOOKS_DIR):
+    """
+    Save one uploaded book. Returns (status, filename):
+    ("saved", new_name), ("duplicate", existing_name) or ("skipped", None).
+    """
+    original_name = os.path.basename(upload.name or "")
+    if not original_name:
+        return "skipped", None
+
+    base, ext = os.path.splitext(original_name)
+    if not ext:
+        ext = ".pdf"
+
+    tmp_path, digest, _ = stream_upload(upload, books_dir)
+
+    try:
+        with store_lock("books"):
+            existing = book_hashes(books_dir)
+            if digest in existing:
+                return "duplicate", existing[digest]
+
+            dest_path = os.path.join(books_dir, original_name)
+            counter = 1
+            while os.path.exists(dest_path):
+                dest_path = os.path.join(books_dir, f"{base}_{counter}{ext}")
+                counter += 1
+
+            os.replace(tmp_path, dest_path)
+            tmp_path = None
+
+            # Record the hash now so the next upload in this batch sees it.
+            record_book(os.path.basename(dest_path), digest, books_dir)
+
+            return "saved", os.path.basename(dest_path)
+    finally:
+        if tmp_path:
+            with contextlib.suppress(OSError):
+                os.remove(tmp_path)
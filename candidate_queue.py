@@ -0,0 +1,374 @@
+"""
+candidate_queue.py
+
+Review queue over the practice candidates found by the Chroma scanner.
+
+- Every candidate gets a stable id (hash of kind, source and text), so the
+  admin UI addresses candidates by id instead of list position.
+- A per-book / per-kind / per-status index is built once per store version
+  (json_store.store_version("practice_candidates")) and reused across reruns.
+  The candidates file's mtime and size are part of the version, so writers
+  that bypass the queue are noticed too.
+- approve() / reject() handle any number of ids in one transaction: one
+  candidates save and one practice-store journal write.
+- Near-duplicates are clustered when scanned candidates are merged (status
+  "duplicate", "dup_of" pointing at the first copy). The LSH index used for
+  that is kept between merges and only rebuilt when another writer changed
+  the store. Candidates are checked again against approved practices at
+  approval time.
+"""
+
+import functools
+import hashlib
+import os
+import threading
+from typing import Iterable, List, Optional
+
+from database import load_practice_candidates, save_practice_candidates
+from json_store import store_lock, store_version, bump_store_version
+from near_duplicates import NearDuplicateIndex, minhash
+from practice_store import get_practice_store
+
+STORE_NAME = "practice_candidates"
+
+# Written by database.save_practice_candidates
+CANDIDATES_FILE = os.environ.get("PRACTICE_CANDIDATES_FILE", "practice_candidates.json")
+
+STATUS_PENDING = "pending"
+STATUS_APPROVED = "approved"
+STATUS_REJECTED = "rejected"
+STATUS_DUPLICATE = "duplicate"
+
+SKETCH_CACHE_SIZE = int(os.environ.get("CANDIDATE_SKETCH_CACHE_SIZE", "20000"))
+
+
+# -----------------------------------------------------------
+# CANDIDATE FIELDS
+# -----------------------------------------------------------
+
+def candidate_id(cand: dict) -> str:
+    """Stable id derived from what the candidate is, not where it sits."""
+    if cand.get("id"):
+        return cand["id"]
+    raw = "\0".join(
+        [cand.get("kind") or "", cand.get("source") or "", cand.get("text") or ""]
+    )
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:16]
+
+
+@functools.lru_cache(maxsize=4096)
+def book_name(source: str) -> str:
+    """Book filename for a candidate source path (memoised)."""
+    return os.path.basename(source) if source else ""
+
+
+@functools.lru_cache(maxsize=SKETCH_CACHE_SIZE)
+def _sketch(cid: str, text: str):
+    return minhash(text)
+
+
+def candidate_sketch(cand: dict):
+    """MinHash sketch of a candidate's text (memoised per id)."""
+    return _sketch(candidate_id(cand), cand.get("text") or "")
+
+
+def candidate_status(cand: dict) -> str:
+    status = cand.get("status")
+    if status:
+        return status
+    return STATUS_APPROVED if cand.get("approved") else STATUS_PENDING
+
+
+# -----------------------------------------------------------
+# QUEUE
+# -----------------------------------------------------------
+
+class CandidateQueue:
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._version = None
+        self._by_id = {}
+        # (field, value) -> [id] in list order; fields: book, kind, status
+        self._index = {}
+        self._index_sets = {}
+        self._position = {}
+        # filters -> matching ids, valid for the current version only
+        self._ids_cache = {}
+        # merge(): LSH index of non-duplicate candidates, and the version
+        # of the store it was built from
+        self._dup_index = None
+        self._dup_version = None
+
+    @staticmethod
+    def _current_version():
+        try:
+            info = os.stat(CANDIDATES_FILE)
+            stamp = (info.st_mtime_ns, info.st_size)
+        except FileNotFoundError:
+            stamp = None
+        return store_version(STORE_NAME), stamp
+
+    def _load(self):
+        """(Re)build the cache and indexes if another writer changed the store."""
+        version = self._current_version()
+        with self._lock:
+            if version == self._version:
+                return
+
+            candidates = load_practice_candidates() or []
+            by_id = {}
+            index = {}
+
+            for cand in candidates:
+                cid = candidate_id(cand)
+                cand["id"] = cid
+                if cid in by_id:
+                    continue  # same passage scanned twice
+                by_id[cid] = cand
+                for key in (
+                    ("book", book_name(cand.get("source") or "")),
+                    ("kind", cand.get("kind") or ""),
+                    ("status", candidate_status(cand)),
+                ):
+                    index.setdefault(key, []).append(cid)
+
+            self._by_id = by_id
+            self._index = index
+            self._index_sets = {key: frozenset(ids) for key, ids in index.items()}
+            self._position = {cid: pos for pos, cid in enumerate(by_id)}
+            self._ids_cache = {}
+            self._version = version
+
+    def _save(self, candidates: List[dict]):
+        """Persist candidates; caller holds store_lock(STORE_NAME)."""
+        save_practice_candidates(candidates)
+        bump_store_version(STORE_NAME)
+
+    # -------------------------------------------------------
+    # READING
+    # -------------------------------------------------------
+
+    def books(self, status: Optional[str] = STATUS_PENDING):
+        """[(book, count)] of books that have candidates in the given status."""
+        self._load()
+        with self._lock:
+            wanted = set(self._index.get(("status", status), [])) if status else None
+            out = []
+            for (field, value), ids in self._index.items():
+                if field != "book" or not value:
+                    continue
+                count = len(ids) if wanted is None else sum(1 for i in ids if i in wanted)
+                if count:
+                    out.append((value, count))
+        return sorted(out, key=lambda item: item[0].lower())
+
+    def ids(
+        self,
+        books: Optional[Iterable[str]] = None,
+        kind: Optional[str] = None,
+        status: Optional[str] = STATUS_PENDING,
+    ) -> List[str]:
+        """Ids matching the filters, in scan order (a new list each call)."""
+        self._load()
+        books = tuple(sorted(books)) if books else ()
+        cache_key = (books, kind, status)
+
+        with self._lock:
+            cached = self._ids_cache.get(cache_key)
+            if cached is not None:
+                return list(cached)
+
+            # (ordered ids, id set) per active filter
+            parts = []
+            if books:
+                if len(books) == 1:
+                    key = ("book", books[0])
+                    parts.append((self._index.get(key, []), self._index_sets.get(key, frozenset())))
+                else:
+                    book_ids = set()
+                    for b in books:
+                        book_ids.update(self._index_sets.get(("book", b), ()))
+                    parts.append((sorted(book_ids, key=self._position.__getitem__), book_ids))
+            for key in (("kind", kind), ("status", status)):
+                if key[1]:
+                    parts.append((self._index.get(key, []), self._index_sets.get(key, frozenset())))
+
+            if not parts:
+                result = list(self._by_id)
+            else:
+                # Walk the shortest index list (already in scan order) and
+                # check membership in the others.
+                parts.sort(key=lambda part: len(part[0]))
+                base = parts[0][0]
+                others = [part[1] for part in parts[1:]]
+                result = [cid for cid in base if all(cid in o for o in others)]
+
+            self._ids_cache[cache_key] = result
+            return list(result)
+
+    def page(self, offset: int, limit: int, **filters):
+        """(candidates, total) for one page of ids(**filters)."""
+        matching = self.ids(**filters)
+        with self._lock:
+            items = [
+                dict(self._by_id[cid])
+                for cid in matching[offset:offset + limit]
+                if cid in self._by_id
+            ]
+        return items, len(matching)
+
+    def get(self, cid: str):
+        self._load()
+        with self._lock:
+            cand = self._by_id.get(cid)
+            return dict(cand) if cand else None
+
+    def all(self) -> List[dict]:
+        self._load()
+        with self._lock:
+            return [dict(c) for c in self._by_id.values()]
+
+    # -------------------------------------------------------
+    # WRITING
+    # -------------------------------------------------------
+
+    def _set_status(self, ids: Iterable[str], status: str):
+        """
+        Mark pending candidates with status. Returns (all candidates,
+        changed candidates); caller saves while holding store_lock(STORE_NAME).
+        """
+        wanted = set(ids)
+        changed = []
+
+        candidates = load_practice_candidates() or []
+        for cand in candidates:
+            cid = candidate_id(cand)
+            cand["id"] = cid
+            if cid not in wanted or candidate_status(cand) != STATUS_PENDING:
+                continue
+            wanted.discard(cid)  # duplicates in the file count once
+            cand["status"] = status
+            cand["approved"] = status == STATUS_APPROVED
+            changed.append(cand)
+
+        return candidates, changed
+
+    def approve(self, ids: Iterable[str]):
+        """
+        Approve candidates by id in one transaction.
+
+        Candidates that near-duplicate an approved practice, or another
+        candidate in the same batch, are marked "duplicate" instead.
+        Returns (added, duplicates).
+        """
+        store = get_practice_store()
+
+        with store_lock(STORE_NAME):
+            candidates, changed = self._set_status(ids, STATUS_APPROVED)
+            batch = NearDuplicateIndex()
+            new_entries = []
+            duplicates = 0
+
+            for cand in changed:
+                sig = candidate_sketch(cand)
+                dup_of = store.find_near_duplicate(sig=sig) if sig else None
+                dup_of = dup_of or (batch.find(sig=sig) if sig else None)
+                if dup_of:
+                    cand.update(status=STATUS_DUPLICATE, approved=False, dup_of=dup_of)
+                    duplicates += 1
+                    continue
+                if sig:
+                    batch.add(cand["id"], sig=sig)
+
+                if cand.get("kind") in ("mantra", "meditation"):
+                    new_entries.append(
+                        (
+                            {
+                                "kind": cand.get("kind"),
+                                "text": cand.get("text", ""),
+                                "source": cand.get("source", ""),
+                                "candidate_id": cand["id"],
+                            },
+                            None,
+                        )
+                    )
+
+            # Practices first: if that fails the candidates stay pending.
+            store.put_many(new_entries)
+            if changed:
+                self._save(candidates)
+
+        return len(new_entries), duplicates
+
+    def reject(self, ids: Iterable[str]) -> int:
+        """Reject candidates by id in one save. Returns how many changed."""
+        with store_lock(STORE_NAME):
+            candidates, changed = self._set_status(ids, STATUS_REJECTED)
+            if changed:
+                self._save(candidates)
+        return len(changed)
+
+    def merge(self, new_candidates: Iterable[dict]):
+        """
+        Append newly scanned candidates that are not already queued.
+        Near-duplicates of queued candidates are stored with status
+        "duplicate" so rescans do not bring them back.
+        Returns (added, duplicates).
+        """
+        # store_lock also serialises threads, so it guards _dup_index too.
+        with store_lock(STORE_NAME):
+            version = self._current_version()
+            candidates = load_practice_candidates() or []
+            known = {candidate_id(cand) for cand in candidates}
+
+            # Taken out while it is updated: if the save fails it is rebuilt.
+            index, self._dup_index = self._dup_index, None
+            if index is None or self._dup_version != version:
+                index = NearDuplicateIndex()
+                for cand in candidates:
+                    if candidate_status(cand) != STATUS_DUPLICATE:
+                        index.add(candidate_id(cand), sig=candidate_sketch(cand))
+
+            added = duplicates = 0
+            for cand in new_candidates:
+                cid = candidate_id(cand)
+                if cid in known:
+                    continue
+                known.add(cid)
+                cand["id"] = cid
+
+                sig = candidate_sketch(cand)
+                dup_of = index.find(sig=sig) if sig else None
+                if dup_of:
+                    cand.update(status=STATUS_DUPLICATE, dup_of=dup_of)
+                    duplicates += 1
+                else:
+                    index.add(cid, sig=sig)
+                    added += 1
+                candidates.append(cand)
+
+            if added or duplicates:
+                self._save(candidates)
+            self._dup_index = index
+            self._dup_version = self._current_version()
+        return added, duplicates
+
+    def replace_all(self, items: List[dict]):
+        """Overwrite the candidate list (ids are assigned on save)."""
+        with store_lock(STORE_NAME):
+            for cand in items:
+                cand["id"] = candidate_id(cand)
+            self._save(items)
+
+
+_queue = None
+_queue_guard = threading.Lock()
+
+
+def get_candidate_queue() -> CandidateQueue:
+    """Process-wide CandidateQueue instance."""
+    global _queue
+    with _queue_guard:
+        if _queue is None:
+            _queue = CandidateQueue()
+        return _queue
@@ -0,0 +1,140 @@
+"""
+candidate_scanner.py
+
+Incremental practice-candidate scanning.
+
+admin_tools.scan_practice_candidates_from_chroma() scans whatever books it
+is given. Here it is called once per (book, kind), and only for pairs whose
+watermark has moved since the last scan. The watermark is the book's size,
+mtime and last_indexed time from the book catalog plus the extra keywords
+used, so a reindex makes a book scannable again even if the file did not
+change (a scan between upload and reindex finds nothing). Progress is
+yielded as each job finishes, so the admin UI can stream it.
+
+Jobs run one at a time by default. SCAN_WORKERS > 1 runs them in parallel
+threads, which is only safe if scan_practice_candidates_from_chroma (and
+the Chroma client it uses) is thread-safe; nothing here guarantees that.
+
+Cursors are kept in SCAN_CURSOR_FILE:
+    {book: {kind: {"watermark": [...], "scanned_at": iso, "found": n}}}
+"""
+
+import datetime
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Iterable, List, Optional
+
+from admin_tools import scan_practice_candidates_from_chroma
+from book_catalog import book_catalog
+from candidate_queue import get_candidate_queue
+from json_store import read_json, update_json
+
+SCAN_CURSOR_FILE = "scan_cursors.json"
+SCAN_KINDS = ("mantra", "meditation")
+SCAN_WORKERS = int(os.environ.get("SCAN_WORKERS", "1"))
+
+
+def _watermark(meta: Optional[dict], extra_keywords: Optional[List[str]]):
+    if not meta:
+        return None
+    keywords = sorted(k.strip().lower() for k in (extra_keywords or []) if k.strip())
+    return [meta["size"], meta["mtime_ns"], meta.get("last_indexed"), keywords]
+
+
+def load_scan_cursors() -> dict:
+    data = read_json(SCAN_CURSOR_FILE, {})
+    return data if isinstance(data, dict) else {}
+
+
+def plan_scan(
+    kinds: Iterable[str] = SCAN_KINDS,
+    books: Optional[Iterable[str]] = None,
+    extra_keywords: Optional[List[str]] = None,
+    force: bool = False,
+):
+    """[(book, kind, watermark)] pairs that need scanning."""
+    cursors = load_scan_cursors()
+    catalog = book_catalog()
+    jobs = []
+
+    for book in books or list(catalog):
+        mark = _watermark(catalog.get(book), extra_keywords)
+        if mark is None:
+            continue
+        for kind in kinds:
+            seen = (cursors.get(book) or {}).get(kind) or {}
+            if force or seen.get("watermark") != mark:
+                jobs.append((book, kind, mark))
+
+    return jobs
+
+
+def _record_cursor(book: str, kind: str, mark, found: int):
+    def mutate(cursors):
+        if not isinstance(cursors, dict):
+            cursors = {}
+        cursors.setdefault(book, {})[kind] = {
+            "watermark": mark,
+            "scanned_at": datetime.datetime.now().isoformat(timespec="seconds"),
+            "found": found,
+        }
+        return cursors
+
+    update_json(SCAN_CURSOR_FILE, mutate, {}, indent=2)
+
+
+def _scan_one(book: str, kind: str, extra_keywords):
+    return scan_practice_candidates_from_chroma(
+        kind_filter=kind,
+        book_filter=[book],
+        extra_keywords=extra_keywords,
+    ) or []
+
+
+def run_incremental_scan(
+    kinds: Iterable[str] = SCAN_KINDS,
+    books: Optional[Iterable[str]] = None,
+    extra_keywords: Optional[List[str]] = None,
+    force: bool = False,
+    max_workers: int = SCAN_WORKERS,
+):
+    """
+    Scan only new or changed (book, kind) pairs.
+
+    Generator: yields one dict per finished job
+        {"done", "total", "book", "kind", "found", "added", "duplicates", "error"}
+    Results are merged into the candidate queue as each job finishes, so an
+    interrupted scan keeps the work it completed.
+    """
+    jobs = plan_scan(kinds, books, extra_keywords, force)
+    total = len(jobs)
+    if not total:
+        return
+
+    queue = get_candidate_queue()
+    done = 0
+
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as ex:
+        futures = {
+            ex.submit(_scan_one, book, kind, extra_keywords): (book, kind, mark)
+            for book, kind, mark in jobs
+        }
+
+        for fut in as_completed(futures):
+            book, kind, mark = futures[fut]
+            done += 1
+            event = {
+                "done": done, "total": total, "book": book, "kind": kind,
+                "found": 0, "added": 0, "duplicates": 0, "error": None,
+            }
+
+            try:
+                found = fut.result()
+                event["found"] = len(found)
+                event["added"], event["duplicates"] = queue.merge(found)
+                _record_cursor(book, kind, mark, len(found))
+            except Exception as e:
+                # Leave the cursor alone so the pair is retried next time.
+                event["error"] = str(e)
+
+            yield event
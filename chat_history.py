@@ -0,0 +1,143 @@
+"""
+chat_history.py
+
+Bounded chat history for the story chat.
+
+- A message is {"id", "question", "answer", "passage_ids", "image_path"}; the
+  passage text lives once in passage_store, not in every message.
+- Only the newest CHAT_MEMORY_TURNS messages stay in session state. Older
+  ones are spilled, in order, to CHAT_HISTORY_DIR/<session key>.jsonl and
+  read back only when the user asks for earlier turns.
+- The chat view caches the small rendered "answer_html" on the message;
+  rendered sources live in its own LRU keyed by passage ids.
+- The spill file is keyed by a random id per Streamlit session
+  ("chat_session_id"), matching the in-memory list and "chat_spilled"
+  count it extends. A refresh or a second tab on the same login starts its
+  own file; files of ended sessions are pruned after
+  CHAT_HISTORY_MAX_AGE_HOURS.
+
+Functions take the session state mapping explicitly (st.session_state in
+the app).
+"""
+
+import contextlib
+import json
+import os
+import time
+import uuid
+
+from passage_store import put_passages, get_passages
+
+CHAT_HISTORY_DIR = "chat_history"
+CHAT_MEMORY_TURNS = int(os.environ.get("CHAT_MEMORY_TURNS", "20"))
+# Turns rendered by default; "Show earlier" extends the window by this much.
+CHAT_RENDER_TURNS = int(os.environ.get("CHAT_RENDER_TURNS", "5"))
+# Spill files untouched for this long belong to dead sessions.
+CHAT_HISTORY_MAX_AGE_HOURS = float(os.environ.get("CHAT_HISTORY_MAX_AGE_HOURS", "24"))
+
+
+def make_message(question: str, answer: str, sources, image_path=None) -> dict:
+    return {
+        "id": uuid.uuid4().hex[:12],
+        "question": question,
+        "answer": answer,
+        "passage_ids": put_passages(sources),
+        "image_path": image_path,
+    }
+
+
+def message_sources(msg: dict) -> list:
+    """Source passages of a message (older messages may still embed them)."""
+    if "passage_ids" in msg:
+        return get_passages(msg["passage_ids"])
+    return msg.get("sources") or []
+
+
+def _session_key(state) -> str:
+    if not state.get("chat_session_id"):
+        state["chat_session_id"] = uuid.uuid4().hex[:20]
+    return state["chat_session_id"]
+
+
+def _history_path(state) -> str:
+    return os.path.join(CHAT_HISTORY_DIR, f"{_session_key(state)}.jsonl")
+
+
+def spilled_count(state) -> int:
+    return state.get("chat_spilled", 0)
+
+
+def append_message(state, msg: dict):
+    """Add a message; spill the oldest in-memory ones past the window."""
+    msgs = state.setdefault("messages", [])
+    msgs.append(msg)
+
+    overflow = len(msgs) - max(1, CHAT_MEMORY_TURNS)
+    if overflow <= 0:
+        return
+
+    path = _history_path(state)
+    if not os.path.exists(path):
+        os.makedirs(CHAT_HISTORY_DIR, exist_ok=True)
+        prune_chat_history()
+
+    with open(path, "a", encoding="utf-8") as f:
+        for old in msgs[:overflow]:
+            f.write(json.dumps(old, ensure_ascii=False) + "\n")
+        f.flush()
+        os.fsync(f.fileno())
+
+    del msgs[:overflow]
+    state["chat_spilled"] = spilled_count(state) + overflow
+
+
+def load_spilled(state, start: int, stop: int) -> list:
+    """Spilled messages [start, stop) in conversation order."""
+    out = []
+    if stop <= start:
+        return out
+    try:
+        with open(_history_path(state), "r", encoding="utf-8") as f:
+            for i, line in enumerate(f):
+                if i >= stop:
+                    break
+                if i >= start and line.strip():
+                    out.append(json.loads(line))
+    except FileNotFoundError:
+        pass
+    return out
+
+
+def total_messages(state) -> int:
+    return spilled_count(state) + len(state.get("messages", []))
+
+
+def recent_messages(state, count: int) -> list:
+    """The newest count messages, reading spilled ones from disk if needed."""
+    msgs = state.get("messages", [])
+    if count <= len(msgs):
+        return msgs[len(msgs) - count:] if count > 0 else []
+    spilled = spilled_count(state)
+    need = min(count - len(msgs), spilled)
+    return load_spilled(state, spilled - need, spilled) + msgs
+
+
+def clear_history(state):
+    """Drop in-memory and spilled history (on logout)."""
+    if state.get("chat_session_id"):
+        with contextlib.suppress(OSError):
+            os.remove(_history_path(state))
+    state["messages"] = []
+    state["chat_spilled"] = 0
+    state.pop("chat_session_id", None)
+
+
+def prune_chat_history(max_age_hours: float = CHAT_HISTORY_MAX_AGE_HOURS):
+    """Remove spill files of sessions idle for longer than max_age_hours."""
+    if not os.path.isdir(CHAT_HISTORY_DIR):
+        return
+    cutoff = time.time() - max_age_hours * 3600
+    for entry in os.scandir(CHAT_HISTORY_DIR):
+        with contextlib.suppress(OSError):
+            if entry.is_file() and entry.stat().st_mtime < cutoff:
+                os.remove(entry.path)
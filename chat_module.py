@@ -1,14 +1,44 @@
 # chat_module.py
 
+import collections
+import os
+import threading
+
 import streamlit as st
 from rag_module import get_answer, get_sources, generate_image
 from ui_module import render_answer_html, render_source_html, render_mantra_html
-from database import load_favourites, save_favourites
+from favourites_store import (
+    add_favourite,
+    delete_favourite,
+    favourites_log_version,
+    load_favourites_page,
+)
+from media_server import media_src
+from session_store import lookup_session
+from warmup import is_ready
+from metrics import inc, span
+from chat_history import (
+    CHAT_RENDER_TURNS,
+    append_message,
+    make_message,
+    message_sources,
+    recent_messages,
+    total_messages,
+)
+
+# Rendered sources, shared by every message (and session) citing the same
+# passages; kept off the messages so session state stays small.
+SOURCES_HTML_CACHE_SIZE = int(os.environ.get("SOURCES_HTML_CACHE_SIZE", "256"))
+_sources_html = collections.OrderedDict()  # tuple of passage ids -> html
+_sources_html_lock = threading.Lock()
 
 def render_story_chat(age_group):
     """Main story chat interface (question → answer)."""
     st.markdown("### 📝 Ask a question")
 
+    if not is_ready():
+        st.info("⏳ The story engine is still warming up — the first answer may take a little longer.")
+
     question = st.text_input(
         "Ask anything from the dharmic stories:",
         key="question_input"
@@ -19,7 +49,8 @@ def render_story_chat(age_group):
             st.error("Please enter a question.")
             return
 
-        with st.spinner("Thinking..."):
+        inc("chat.questions")
+        with st.spinner("Thinking..."), span("chat.answer"):
             answer = get_answer(question, age_group)
             sources = get_sources()
 
@@ -28,12 +59,11 @@ def render_story_chat(age_group):
             else:
                 img_path = None
 
-        st.session_state.messages.append({
-            "question": question,
-            "answer": answer,
-            "sources": sources,
-            "image_path": img_path,
-        })
+        # Passages go to the shared passage store; older turns spill to disk.
+        append_message(
+            st.session_state,
+            make_message(question, answer, sources, img_path),
+        )
 
         st.rerun()
 
@@ -48,32 +78,146 @@ def _render_messages():
     st.markdown("---")
     st.markdown("### 📚 Story responses")
 
-    for msg in msgs:
-        st.markdown(render_answer_html(msg["answer"]), unsafe_allow_html=True)
+    # Only the newest turns are rendered; older ones (possibly spilled to
+    # disk) come in behind "Show earlier messages".
+    total = total_messages(st.session_state)
+    window = st.session_state.get("chat_render_turns", CHAT_RENDER_TURNS)
+    if window < total and st.button(
+        f"Show earlier messages ({total - window} more)", key="chat_show_earlier"
+    ):
+        window += CHAT_RENDER_TURNS
+        st.session_state["chat_render_turns"] = window
 
-        if msg.get("image_path"):
-            st.image(msg["image_path"], use_column_width=True)
+    with span("render.messages"):
+        for msg in recent_messages(st.session_state, window):
+            _render_message(msg)
 
-        if msg.get("sources"):
-            st.markdown(render_source_html(msg["sources"]), unsafe_allow_html=True)
 
-        st.markdown("---")
+def _sources_html_for(msg: dict) -> str:
+    ids = msg.get("passage_ids")
+    if ids is None:
+        # Older messages embed their passages; nothing to key the cache on.
+        sources = message_sources(msg)
+        return render_source_html(sources) if sources else ""
+
+    key = tuple(ids)
+    with _sources_html_lock:
+        html = _sources_html.get(key)
+        if html is not None:
+            _sources_html.move_to_end(key)
+            return html
+
+    sources = message_sources(msg)
+    html = render_source_html(sources) if sources else ""
+    with _sources_html_lock:
+        _sources_html[key] = html
+        while len(_sources_html) > SOURCES_HTML_CACHE_SIZE:
+            _sources_html.popitem(last=False)
+    return html
+
+
+def _message_html(msg: dict):
+    """Rendered answer HTML (kept on the message) and sources HTML (LRU)."""
+    if "answer_html" not in msg:
+        msg["answer_html"] = render_answer_html(msg["answer"])
+    return msg["answer_html"], _sources_html_for(msg)
+
+
+def _render_message(msg: dict):
+    answer_html, sources_html = _message_html(msg)
+    st.markdown(answer_html, unsafe_allow_html=True)
+
+    if msg.get("image_path"):
+        st.image(media_src(msg["image_path"]), use_column_width=True)
+
+    if sources_html:
+        st.markdown(sources_html, unsafe_allow_html=True)
+
+    _render_save_button(msg)
+
+    st.markdown("---")
+
+
+def _favourites_user():
+    """Login username for the favourites store (None for guests)."""
+    if "favourites_user" not in st.session_state:
+        user = (st.session_state.get("user_profile") or {}).get("username")
+        token = st.session_state.get("session_token")
+        if not user and token:
+            user = (lookup_session(token) or {}).get("username")
+        if not user:
+            return None  # guest, or session not found: look again next rerun
+        st.session_state["favourites_user"] = user
+    return st.session_state["favourites_user"]
+
+
+def _render_save_button(msg: dict):
+    user = _favourites_user()
+    msg_id = msg.get("id")
+    if not user or not msg_id:
+        return
+
+    saved = st.session_state.setdefault("saved_message_ids", set())
+    if msg_id in saved:
+        st.caption("⭐ Saved to your stories")
+    elif st.button("⭐ Save story", key=f"fav_save_{msg_id}"):
+        add_favourite(user, {
+            "question": msg.get("question"),
+            "answer": msg.get("answer"),
+            "passage_ids": msg.get("passage_ids", []),
+            "image_path": msg.get("image_path"),
+        })
+        saved.add(msg_id)
+        st.rerun()
 
 def render_saved_stories():
-    """Show user's saved stories."""
-    fav = load_favourites()
-    if not fav:
+    """Show user's saved stories, newest first, one page at a time."""
+    user = _favourites_user()
+    if not user:
+        st.info("No saved stories yet.")
+        return
+
+    # Paging state: a stack of cursors into the user's favourites log, reset
+    # whenever the log is compacted (cursors are only valid per version).
+    version = favourites_log_version(user)
+    if st.session_state.get("fav_log_version") != version:
+        st.session_state["fav_log_version"] = version
+        st.session_state["fav_page_cursors"] = [None]
+
+    cursors = st.session_state.setdefault("fav_page_cursors", [None])
+    fav, next_cursor = load_favourites_page(user, cursors[-1])
+    if not fav and len(cursors) == 1:
         st.info("No saved stories yet.")
         return
 
     st.header("📜 Saved Stories")
     for entry in fav:
-        st.markdown(render_answer_html(entry["answer"]), unsafe_allow_html=True)
+        answer_html, sources_html = _message_html(entry)
+        st.markdown(answer_html, unsafe_allow_html=True)
 
         if entry.get("image_path"):
-            st.image(entry["image_path"], use_column_width=True)
+            st.image(media_src(entry["image_path"]), use_column_width=True)
+
+        if sources_html:
+            st.markdown(sources_html, unsafe_allow_html=True)
 
-        if entry.get("sources"):
-            st.markdown(render_source_html(entry["sources"]), unsafe_allow_html=True)
+        if st.button("Remove", key=f"fav_delete_{entry['id']}"):
+            delete_favourite(user, entry["id"])
+            st.rerun()
 
         st.markdown("---")
+
+    col_prev, col_page, col_next = st.columns([1, 2, 1])
+
+    with col_prev:
+        if len(cursors) > 1 and st.button("◀ Newer", key="fav_prev_page"):
+            cursors.pop()
+            st.rerun()
+
+    with col_page:
+        st.caption(f"Page {len(cursors)}")
+
+    with col_next:
+        if next_cursor is not None and st.button("Older ▶", key="fav_next_page"):
+            cursors.append(next_cursor)
+            st.rerun()
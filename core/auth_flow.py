@@ -1,15 +1,13 @@
-import datetime
-import secrets
 import streamlit as st
 
-from auth import (
-    hash_password,
-    check_password,
-    load_users,
-    save_users,
-    get_admin_credentials,
+from auth import get_admin_credentials
+from password_pool import PasswordPoolBusy, hash_password, check_password
+from session_store import (
+    age_group_for,
+    create_session_record,
+    load_user_records,
+    register_user,
 )
-from database import load_sessions, save_sessions
 
 def render_login_screen():
     st.title("📚 Dharma Story Chat")
@@ -50,22 +48,23 @@ def render_user_signin():
     password = st.text_input("Password", type="password")
 
     if st.button("Sign in as User"):
-        users = load_users()
+        users = load_user_records()
         profile = users.get(username)
 
         if not profile:
             st.error("No account found. Please sign up.")
             return
 
-        if not check_password(password.strip(), profile.get("password", "")):
+        try:
+            ok = check_password(password.strip(), profile.get("password", ""))
+        except PasswordPoolBusy:
+            st.error("Sign-in is busy right now. Please try again in a moment.")
+            return
+        if not ok:
             st.error("Incorrect password.")
             return
 
-        year = profile.get("year_of_birth")
-        age_group = None
-        if isinstance(year, int):
-            age = datetime.datetime.now().year - year
-            age_group = "adult" if age >= 22 else "child"
+        age_group = age_group_for(profile)
 
         st.session_state.update({
             "role": "user",
@@ -94,17 +93,20 @@ def render_user_signup():
     if st.button("Sign up"):
         try:
             year = int(yob)
-            age = datetime.datetime.now().year - year
-            age_group = "adult" if age >= 22 else "child"
         except ValueError:
             st.error("Invalid birth year.")
             return
 
-        users = load_users()
-        if username in users:
+        if username in load_user_records():
             st.error("Username already taken.")
             return
 
+        try:
+            hashed_pw = hash_password(password.strip())
+        except PasswordPoolBusy:
+            st.error("Sign-up is busy right now. Please try again in a moment.")
+            return
+
         profile = {
             "username": username,
             "first_name": first,
@@ -112,11 +114,13 @@ def render_user_signup():
             "year_of_birth": year,
             "language": lang,
             "location": location or None,
-            "password": hash_password(password.strip()),
+            "password": hashed_pw,
         }
 
-        users[username] = profile
-        save_users(users)
+        if not register_user(username, profile):
+            st.error("Username already taken.")
+            return
+        age_group = age_group_for(profile)
 
         st.session_state.update({
             "role": "user",
@@ -131,12 +135,4 @@ def render_user_signup():
         st.rerun()
 
 def start_session(role, username):
-    sessions = load_sessions()
-    token = secrets.token_urlsafe(16)
-    sessions[token] = {
-        "role": role,
-        "username": username,
-        "created_at": datetime.datetime.now().isoformat(),
-    }
-    save_sessions(sessions)
-    st.session_state["session_token"] = token
+    st.session_state["session_token"] = create_session_record(role, username)
@@ -1,6 +1,7 @@
-import datetime
 import streamlit as st
-from database import load_sessions, save_sessions, SESSION_TTL_MINUTES
+from session_store import age_group_for, end_session, load_user_records, lookup_session
+from metrics import timed
+from chat_history import clear_history
 
 def restore_session():
     if st.session_state.get("role") != "guest":
@@ -13,27 +14,15 @@ def restore_session():
     if not token_list:
         return
 
-    token = token_list[0]
+    _restore(token_list[0])
 
-    sessions = load_sessions()
-    sess = sessions.get(token)
+@timed("session.restore")
+def _restore(token: str):
+    """The lookup itself; only this is timed, not the no-op reruns."""
+    sess = lookup_session(token)  # None if unknown or expired (expired ones are removed)
     if not sess:
         return
 
-    try:
-        created_dt = datetime.datetime.fromisoformat(sess["created_at"])
-        expired = (
-            datetime.datetime.now() - created_dt
-            > datetime.timedelta(minutes=SESSION_TTL_MINUTES)
-        )
-    except Exception:
-        expired = True
-
-    if expired:
-        sessions.pop(token, None)
-        save_sessions(sessions)
-        return
-
     role = sess.get("role")
     username = sess.get("username")
 
@@ -45,16 +34,12 @@ def restore_session():
         })
         return
 
-    from auth import load_users
-    users = load_users()
+    users = load_user_records()
     profile = users.get(username)
     if not profile:
         return
 
-    year = profile.get("year_of_birth")
-    age_group = None
-    if isinstance(year, int):
-        age_group = "adult" if (datetime.datetime.now().year - year) >= 22 else "child"
+    age_group = age_group_for(profile)
 
     st.session_state.update({
         "role": "user",
@@ -67,10 +52,9 @@ def restore_session():
 def handle_logout():
     token = st.session_state.get("session_token")
     if token:
-        sessions = load_sessions()
-        sessions.pop(token, None)
-        save_sessions(sessions)
+        end_session(token)
 
+    clear_history(st.session_state)
     st.session_state.clear()
     st.session_state["role"] = "guest"
     st.rerun()
@@ -0,0 +1,271 @@
+"""
+favourites_store.py
+
+Saved stories, one append-only log per user:
+
+- favourites/<user>.jsonl       one saved story per line
+  {"id", "saved_at", "question", "answer", "passage_ids", "image_path"}
+- favourites/<user>.tombstones  ids of deleted stories, one per line
+
+Saving appends one line; deleting appends a tombstone. Once a user has
+FAVOURITES_COMPACT_AFTER tombstones their log is rewritten without the
+deleted stories. Pages are read newest-first by scanning the log backwards
+from a byte cursor, so the first page costs the same however many stories
+a user has saved. Cursors carry the log version (favourites_log_version),
+and one from before a compaction starts again at the newest page.
+
+The legacy shared database.load_favourites() list is migrated once into
+favourites/shared/legacy.jsonl, a read-only log that follows each user's
+own log when paging. A user sees the legacy entries tagged with their name
+and the untagged ones; deleting one only tombstones it for that user.
+"""
+
+import datetime
+import hashlib
+import json
+import os
+import re
+import uuid
+
+from database import load_favourites
+from json_store import bump_store_version, store_lock, store_version
+
+FAVOURITES_DIR = "favourites"
+FAVOURITES_PAGE_SIZE = int(os.environ.get("FAVOURITES_PAGE_SIZE", "10"))
+FAVOURITES_COMPACT_AFTER = int(os.environ.get("FAVOURITES_COMPACT_AFTER", "50"))
+
+_READ_BLOCK = 64 * 1024
+_SAFE_NAME = re.compile(r"[^A-Za-z0-9_.-]")
+
+
+# -----------------------------------------------------------
+# INTERNAL HELPERS
+# -----------------------------------------------------------
+
+def _user_path(user: str) -> str:
+    # Keep readable names, but never let a username escape the directory.
+    safe = _SAFE_NAME.sub("_", user)[:64]
+    if safe != user:
+        safe += "-" + hashlib.sha1(user.encode("utf-8")).hexdigest()[:8]
+    return os.path.join(FAVOURITES_DIR, f"{safe}.jsonl")
+
+
+def _tombstone_path(user: str) -> str:
+    return _user_path(user)[: -len(".jsonl")] + ".tombstones"
+
+
+def _encode(entry: dict) -> bytes:
+    return (json.dumps(entry, ensure_ascii=False, separators=(",", ":")) + "\n").encode("utf-8")
+
+
+def _append(path: str, payload: bytes):
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+    try:
+        os.write(fd, payload)
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _new_entry(entry: dict) -> dict:
+    out = {k: v for k, v in entry.items() if k not in ("answer_html", "sources_html")}
+    out["id"] = out.get("id") or uuid.uuid4().hex[:12]
+    out.setdefault("saved_at", datetime.datetime.now().isoformat(timespec="seconds"))
+    return out
+
+
+def _legacy_path() -> str:
+    # A subdirectory, so no username can map onto it.
+    return os.path.join(FAVOURITES_DIR, "shared", "legacy.jsonl")
+
+
+def _store_name(user: str) -> str:
+    return f"favourites_{os.path.basename(_user_path(user))}"
+
+
+def _user_lock(user: str):
+    return store_lock(_store_name(user))
+
+
+def _write_lines(path: str, lines):
+    """Replace path with lines (bytes, newline-terminated) atomically."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        for line in lines:
+            f.write(line)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def _ensure_legacy():
+    """Migrate database.load_favourites() into the shared log, once."""
+    path = _legacy_path()
+    if os.path.exists(path):
+        return
+
+    with store_lock("favourites_legacy"):
+        if os.path.exists(path):
+            return
+        legacy = load_favourites() or []
+        entries = [
+            _new_entry(e) for e in (legacy if isinstance(legacy, list) else [])
+            if isinstance(e, dict)
+        ]
+        _write_lines(path, [_encode(e) for e in entries])
+
+
+def _owned_by(entry: dict, user: str) -> bool:
+    owner = entry.get("username") or entry.get("user")
+    return not owner or owner == user
+
+
+def _parse(line: bytes):
+    try:
+        entry = json.loads(line)
+    except ValueError:
+        return None  # torn trailing write
+    return entry if isinstance(entry, dict) else None
+
+
+def _reverse_lines(path: str, before: int):
+    """Yield (line, start_offset) for each line before byte offset before, last line first."""
+    try:
+        f = open(path, "rb")
+    except FileNotFoundError:
+        return
+
+    with f:
+        pos = min(before, f.seek(0, os.SEEK_END))
+        buf = b""  # file bytes [pos, end of the lines not yet yielded)
+        while True:
+            nl = buf.rfind(b"\n", 0, len(buf) - 1)
+            while nl != -1:
+                yield buf[nl + 1:], pos + nl + 1
+                buf = buf[:nl + 1]
+                nl = buf.rfind(b"\n", 0, len(buf) - 1)
+            if pos == 0:
+                if buf:
+                    yield buf, 0
+                return
+            start = max(0, pos - _READ_BLOCK)
+            f.seek(start)
+            buf = f.read(pos - start) + buf
+            pos = start
+
+
+def _tombstones(user: str) -> set:
+    try:
+        with open(_tombstone_path(user), "r", encoding="utf-8") as f:
+            return {line.strip() for line in f if line.strip()}
+    except FileNotFoundError:
+        return set()
+
+
+# -----------------------------------------------------------
+# PUBLIC API
+# -----------------------------------------------------------
+
+def favourites_log_version(user: str) -> int:
+    """Changes whenever the user's log is compacted; older cursors are void."""
+    return store_version(_store_name(user))
+
+
+def add_favourite(user: str, entry: dict) -> str:
+    """Append one saved story and return its id."""
+    entry = _new_entry(entry)
+    os.makedirs(FAVOURITES_DIR, exist_ok=True)
+    with _user_lock(user):  # compaction rewrites the log
+        _append(_user_path(user), _encode(entry))
+    return entry["id"]
+
+
+def delete_favourite(user: str, entry_id: str):
+    with _user_lock(user):
+        os.makedirs(FAVOURITES_DIR, exist_ok=True)
+        _append(_tombstone_path(user), (entry_id + "\n").encode("utf-8"))
+        if len(_tombstones(user)) >= FAVOURITES_COMPACT_AFTER:
+            compact_favourites(user)
+
+
+def compact_favourites(user: str):
+    """
+    Rewrite the user's log without deleted stories. Tombstones are kept only
+    for legacy entries, which cannot be removed from the shared log.
+    """
+    with _user_lock(user):
+        dead = _tombstones(user)
+        if not dead:
+            return
+        path = _user_path(user)
+
+        kept = []
+        try:
+            with open(path, "rb") as f:
+                for line in f:
+                    entry = _parse(line)
+                    if entry is not None and entry.get("id") not in dead:
+                        kept.append(line if line.endswith(b"\n") else line + b"\n")
+        except FileNotFoundError:
+            pass
+
+        legacy_ids = set()
+        try:
+            with open(_legacy_path(), "rb") as f:
+                for line in f:
+                    entry = _parse(line)
+                    if entry is not None and entry.get("id") in dead:
+                        legacy_ids.add(entry["id"])
+        except FileNotFoundError:
+            pass
+
+        _write_lines(path, kept)
+        _write_lines(
+            _tombstone_path(user),
+            [(i + "\n").encode("utf-8") for i in sorted(legacy_ids)],
+        )
+        bump_store_version(_store_name(user))
+
+
+def _entries_before(user: str, cursor, version: int):
+    """Yield (entry, cursor after it): the user's log, then the legacy log."""
+    if cursor is None or cursor[0] != version:
+        cursor = (version, "own", float("inf"))  # start, or stale after compaction
+    _, source, before = cursor
+    if source == "own":
+        for line, offset in _reverse_lines(_user_path(user), before):
+            entry = _parse(line)
+            if entry is not None:
+                yield entry, (version, "own", offset)
+        before = float("inf")
+
+    for line, offset in _reverse_lines(_legacy_path(), before):
+        entry = _parse(line)
+        if entry is not None and _owned_by(entry, user):
+            yield entry, (version, "legacy", offset)
+
+
+def load_favourites_page(user: str, cursor=None, limit: int = FAVOURITES_PAGE_SIZE):
+    """
+    Return (entries, next_cursor), newest first. Pass next_cursor back to
+    get the following page; it is None when there are no older stories.
+    A cursor from before a compaction returns the newest page.
+    """
+    _ensure_legacy()
+    with _user_lock(user):  # no compaction mid-page
+        dead = _tombstones(user)
+        version = favourites_log_version(user)
+
+        page = []
+        next_cursor = None
+        for entry, position in _entries_before(user, cursor, version):
+            if entry.get("id") in dead:
+                continue
+            if len(page) >= limit:
+                # Another live story exists, so there is an older page.
+                return page, next_cursor
+            page.append(entry)
+            next_cursor = position
+
+        return page, None
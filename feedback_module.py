@@ -1,33 +1,224 @@
+"""
+feedback_module.py
+
+User feedback stored as an append-only log:
+
+- feedback.log         one compact JSON object per line
+- feedback.tombstones  ids of deleted entries, one per line
+
+New feedback is appended, deletes append a tombstone, and the log is
+compacted once enough tombstones have built up. Reads are paged by byte
+offset, so the admin panel never loads the whole log.
+
+database.save_feedback still writes feedback.json; whatever it holds is
+moved into the log on the next read or write here.
+"""
+
+import hashlib
 import json
+import os
+import uuid
+import datetime
+
+from json_store import bump_store_version, read_json, store_lock, store_version
+
+FEEDBACK_FILE = "feedback.json"  # legacy single-document store
+FEEDBACK_LOG = "feedback.log"
+FEEDBACK_TOMBSTONES = "feedback.tombstones"
+FEEDBACK_COMPACT_AFTER = int(os.environ.get("FEEDBACK_COMPACT_AFTER", "100"))
+
+_tombstone_cache = {"stamp": None, "ids": frozenset()}
 
-FEEDBACK_FILE = "feedback.json"
+
+# -----------------------------------------------------------
+# INTERNAL HELPERS
+# -----------------------------------------------------------
+
+def _encode(entry: dict) -> bytes:
+    return (json.dumps(entry, ensure_ascii=False, separators=(",", ":")) + "\n").encode("utf-8")
+
+
+def _new_entry(entry: dict) -> dict:
+    out = dict(entry)
+    out.setdefault("id", uuid.uuid4().hex[:12])
+    out.setdefault("date", datetime.datetime.now().isoformat(timespec="seconds"))
+    return out
+
+
+def _append_lines(path: str, payload: bytes):
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+    try:
+        os.write(fd, payload)
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _rewrite_log(entries):
+    tmp_path = FEEDBACK_LOG + ".tmp"
+    with open(tmp_path, "wb") as f:
+        for e in entries:
+            f.write(_encode(e))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, FEEDBACK_LOG)
+
+    if os.path.exists(FEEDBACK_TOMBSTONES):
+        os.remove(FEEDBACK_TOMBSTONES)
+    bump_store_version("feedback")
+
+
+def _legacy_id(item: dict) -> str:
+    # Stable across imports, so an entry re-saved to feedback.json by a
+    # racing writer is not imported twice.
+    raw = json.dumps(item, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:12]
+
+
+def _import_legacy():
+    """Move anything in feedback.json into the log (just a stat if absent)."""
+    if not os.path.exists(FEEDBACK_FILE):
+        return
+
+    with store_lock("feedback"):
+        items = read_json(FEEDBACK_FILE, None)
+        if items is None:
+            return  # missing, or caught mid-write: try again next call
+        if not isinstance(items, list):
+            items = []
+
+        known = {e.get("id") for e, _ in _iter_log()} | _tombstones()
+        new = []
+        for item in items:
+            if not isinstance(item, dict):
+                continue
+            entry = dict(item)
+            entry.setdefault("id", _legacy_id(item))
+            if entry["id"] not in known:
+                known.add(entry["id"])
+                new.append(_new_entry(entry))
+
+        if new:
+            _append_lines(FEEDBACK_LOG, b"".join(_encode(e) for e in new))
+        os.replace(FEEDBACK_FILE, FEEDBACK_FILE + ".migrated")
+
+
+def _tombstones() -> frozenset:
+    try:
+        info = os.stat(FEEDBACK_TOMBSTONES)
+        stamp = (info.st_ino, info.st_size, info.st_mtime_ns)
+    except FileNotFoundError:
+        return frozenset()
+
+    if _tombstone_cache["stamp"] != stamp:
+        with open(FEEDBACK_TOMBSTONES, "r", encoding="utf-8") as f:
+            ids = frozenset(line.strip() for line in f if line.strip())
+        _tombstone_cache.update(stamp=stamp, ids=ids)
+
+    return _tombstone_cache["ids"]
+
+
+def _iter_log(offset: int = 0):
+    """Yield (entry, offset_after_line) for every parseable line from offset."""
+    try:
+        f = open(FEEDBACK_LOG, "rb")
+    except FileNotFoundError:
+        return
+
+    with f:
+        # A stale offset (e.g. from before a compaction) may point mid-line;
+        # start over rather than return garbage.
+        if offset > 0:
+            f.seek(offset - 1)
+            if f.read(1) != b"\n":
+                offset = 0
+        f.seek(offset)
+
+        for line in f:
+            offset += len(line)
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue  # torn trailing write
+            if isinstance(entry, dict):
+                yield entry, offset
+
+
+# -----------------------------------------------------------
+# PUBLIC API
+# -----------------------------------------------------------
+
+def feedback_log_version():
+    """
+    Changes whenever the log is rewritten (compaction, save_feedback);
+    page offsets from an older version are no longer valid.
+    """
+    return store_version("feedback")
+
+
+def append_feedback(entry: dict) -> str:
+    """Append one feedback entry and return its id."""
+    _import_legacy()
+    entry = _new_entry(entry)
+    with store_lock("feedback"):
+        _append_lines(FEEDBACK_LOG, _encode(entry))
+    return entry["id"]
+
+
+def load_feedback_page(offset: int = 0, limit: int = 20):
+    """
+    Return (entries, next_offset) starting at byte offset.
+    next_offset is None when the end of the log has been reached.
+    """
+    _import_legacy()
+    dead = _tombstones()
+    page = []
+
+    for entry, end in _iter_log(offset):
+        if entry.get("id") in dead:
+            continue
+        page.append(entry)
+        if len(page) >= limit:
+            return page, end
+
+    return page, None
+
+
+def delete_feedback(entry_id: str):
+    """Tombstone one entry; compact once enough tombstones accumulate."""
+    with store_lock("feedback"):
+        _append_lines(FEEDBACK_TOMBSTONES, (entry_id + "\n").encode("utf-8"))
+        if len(_tombstones()) >= FEEDBACK_COMPACT_AFTER:
+            compact_feedback_log()
+
+
+def compact_feedback_log():
+    """Rewrite the log without tombstoned entries."""
+    with store_lock("feedback"):
+        dead = _tombstones()
+        live = [e for e, _ in _iter_log() if e.get("id") not in dead]
+        _rewrite_log(live)
 
 
 def load_feedback():
     """
-    Load all user feedback entries.
-    Behaviour is identical to your original app.py.
+    Load all live feedback entries.
+    Prefer load_feedback_page() for anything user-facing.
     """
-    try:
-        with open(FEEDBACK_FILE, "r", encoding="utf-8") as f:
-            data = json.load(f)
-        if isinstance(data, list):
-            return data
-        return []
-    except FileNotFoundError:
-        return []
-    except Exception:
-        return []
+    _import_legacy()
+    dead = _tombstones()
+    return [e for e, _ in _iter_log() if e.get("id") not in dead]
 
 
 def save_feedback(items):
     """
-    Save all feedback entries back to disk.
-    Same behaviour as original app.py.
+    Replace all feedback with items (kept for older callers).
+    Prefer append_feedback() / delete_feedback().
     """
     try:
-        with open(FEEDBACK_FILE, "w", encoding="utf-8") as f:
-            json.dump(items, f, ensure_ascii=False, indent=2)
+        _import_legacy()
+        with store_lock("feedback"):
+            _rewrite_log(_new_entry(i) for i in items if isinstance(i, dict))
     except Exception:
         # Silent fail (matching original behaviour)
         pass
@@ -1,12 +1,10 @@
-import os
-import datetime
-
 from database import (
     GUIDANCE_AUDIO_DIR,
     GUIDANCE_MEDIA_DIR,
-    load_approved_practices,
-    save_approved_practices,
 )
+from media_derivatives import schedule_derivatives
+from media_store import store_media
+from practice_store import get_practice_store
 
 
 # -----------------------------------------------------------
@@ -15,24 +13,15 @@ from database import (
 
 def _save_uploaded_file(upload, base_prefix: str, directory: str):
     """
-    Saves uploaded audio/image/video using the same logic from your original app.py:
-    - timestamped filenames
-    - spaces replaced with underscores
+    Saves uploaded audio/image/video into the content-addressed media store
+    (streamed in chunks, one copy per distinct file). base_prefix is kept
+    for callers; the stored name is the content hash.
     """
     if upload is None:
         return None, None
 
     try:
-        original_name = upload.name
-        ts = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-        safe_name = original_name.replace(" ", "_")
-        filename = f"{base_prefix}_{ts}_{safe_name}"
-        dest_path = os.path.join(directory, filename)
-
-        with open(dest_path, "wb") as f:
-            f.write(upload.getbuffer())
-
-        return dest_path, original_name
+        return store_media(upload, directory), upload.name
     except Exception:
         return None, None
 
@@ -50,10 +39,6 @@ def save_meditation_guidance(text: str, audio_file, image_file, video_file):
     image_path, image_orig = _save_uploaded_file(image_file, "meditation_img", GUIDANCE_MEDIA_DIR)
     video_path, video_orig = _save_uploaded_file(video_file, "meditation_vid", GUIDANCE_MEDIA_DIR)
 
-    # Load existing practices
-    approved = load_approved_practices()
-    med_list = approved.get("meditation") or []
-
     entry = {
         "source": "manual-guidance",
         "text": text.strip(),
@@ -72,9 +57,10 @@ def save_meditation_guidance(text: str, audio_file, image_file, video_file):
         entry["video_original_name"] = video_orig
 
     # Append and save
-    med_list.append(entry)
-    approved["meditation"] = med_list
-    save_approved_practices(approved)
+    get_practice_store().add("meditation", entry)
+
+    # Thumbnails / previews for the admin panels, built in the background.
+    schedule_derivatives(audio_path, image_path, video_path)
 
 
 # -----------------------------------------------------------
@@ -100,10 +86,6 @@ def save_mantra_guidance(
     image_path, image_orig = _save_uploaded_file(image_file, "mantra_img", GUIDANCE_MEDIA_DIR)
     video_path, video_orig = _save_uploaded_file(video_file, "mantra_vid", GUIDANCE_MEDIA_DIR)
 
-    # Load existing
-    approved = load_approved_practices()
-    mantra_list = approved.get("mantra") or []
-
     entry = {
         "source": "manual-guidance",
         "deity": deity.strip(),
@@ -126,6 +108,7 @@ def save_mantra_guidance(
         entry["video_original_name"] = video_orig
 
     # Save
-    mantra_list.append(entry)
-    approved["mantra"] = mantra_list
-    save_approved_practices(approved)
+    get_practice_store().add("mantra", entry)
+
+    # Thumbnails / previews for the admin panels, built in the background.
+    schedule_derivatives(audio_path, image_path, video_path)
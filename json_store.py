@@ -0,0 +1,173 @@
+"""
+json_store.py
+
+Multi-process-safe helpers for the JSON files the app keeps on disk.
+
+- `store_lock(name)` takes an exclusive cross-process file lock. Wrap every
+  load → modify → save sequence on a shared store in it so concurrent
+  Streamlit workers cannot lose each other's writes.
+- `atomic_write_json(path, data)` writes to a temp file and os.replace()s it
+  into place, so readers never see a half-written file.
+- `update_json(path, mutate, default)` does a locked read-modify-write of a
+  file owned by this repo.
+- `store_version(name)` / `bump_store_version(name)` give readers a cheap
+  way to notice that another worker changed a store.
+"""
+
+import contextlib
+import json
+import os
+import tempfile
+import threading
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+LOCK_DIR = ".locks"
+
+# flock() is per open file description, so threads of one process also need
+# an in-process lock per store.
+_thread_locks = {}
+_thread_locks_guard = threading.Lock()
+
+
+def _thread_lock(lock_path: str):
+    with _thread_locks_guard:
+        lock = _thread_locks.get(lock_path)
+        if lock is None:
+            lock = _thread_locks[lock_path] = threading.RLock()
+        return lock
+
+
+_held = threading.local()
+
+
+@contextlib.contextmanager
+def _file_lock(lock_path: str):
+    held = getattr(_held, "paths", None)
+    if held is None:
+        held = _held.paths = {}
+
+    # Re-entrant within one thread: nested helpers may lock the same store.
+    if held.get(lock_path):
+        held[lock_path] += 1
+        try:
+            yield
+        finally:
+            held[lock_path] -= 1
+        return
+
+    with _thread_lock(lock_path):
+        os.makedirs(os.path.dirname(lock_path) or ".", exist_ok=True)
+        with open(lock_path, "a+b") as fh:
+            if fcntl is not None:
+                fcntl.flock(fh.fileno(), fcntl.LOCK_EX)
+            else:
+                fh.seek(0)
+                msvcrt.locking(fh.fileno(), msvcrt.LK_LOCK, 1)
+            held[lock_path] = 1
+            try:
+                yield
+            finally:
+                held[lock_path] = 0
+                if fcntl is not None:
+                    fcntl.flock(fh.fileno(), fcntl.LOCK_UN)
+                else:
+                    fh.seek(0)
+                    msvcrt.locking(fh.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def store_lock(name: str):
+    """
+    Exclusive lock for a named store ("sessions", "users", "feedback", ...).
+    Usable as a context manager; re-entrant within a thread.
+    """
+    return _file_lock(os.path.join(LOCK_DIR, f"{name}.lock"))
+
+
+def path_lock(path: str):
+    """Exclusive lock tied to a specific data file path."""
+    return _file_lock(path + ".lock")
+
+
+# -----------------------------------------------------------
+# READ / WRITE
+# -----------------------------------------------------------
+
+def read_json(path: str, default):
+    """Load JSON from path, returning default if missing or unreadable."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return default
+    except Exception:
+        return default
+
+
+def atomic_write_json(path: str, data, indent=None):
+    """Write JSON to a temp file in the same directory, fsync, then replace."""
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+
+    fd, tmp_path = tempfile.mkstemp(
+        prefix=os.path.basename(path) + ".", suffix=".tmp", dir=directory
+    )
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=indent)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.remove(tmp_path)
+        raise
+
+
+def update_json(path: str, mutate, default, indent=None):
+    """
+    Locked read-modify-write: mutate(data) may change data in place or
+    return a replacement. Returns the saved value.
+    """
+    with path_lock(path):
+        data = read_json(path, default)
+        result = mutate(data)
+        if result is not None:
+            data = result
+        atomic_write_json(path, data, indent=indent)
+        return data
+
+
+# -----------------------------------------------------------
+# CHANGE COUNTERS
+# -----------------------------------------------------------
+
+def _version_path(name: str) -> str:
+    return os.path.join(LOCK_DIR, f"{name}.version")
+
+
+def store_version(name: str) -> int:
+    """
+    Cheap cross-process change counter for a store. Readers cache derived
+    data keyed on it; writers call bump_store_version() after saving.
+    """
+    try:
+        with open(_version_path(name), "r", encoding="utf-8") as f:
+            return int(f.read().strip() or 0)
+    except (FileNotFoundError, ValueError):
+        return 0
+
+
+def bump_store_version(name: str) -> int:
+    """Increment the change counter. Call while holding store_lock(name)."""
+    version = store_version(name) + 1
+    os.makedirs(LOCK_DIR, exist_ok=True)
+    tmp_path = _version_path(name) + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(str(version))
+    os.replace(tmp_path, _version_path(name))
+    return version
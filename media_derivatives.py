@@ -0,0 +1,284 @@
+"""
+media_derivatives.py
+
+Lightweight derivatives of guidance media for the admin panels:
+
+- images: a 256px thumbnail and a 1024px preview, both WebP (Pillow)
+- audio:  a 64 kbit/s mono MP3 preview (ffmpeg)
+- video:  a 256px poster frame and a 480p low-bitrate MP4 preview (ffmpeg)
+
+Derivatives are generated off the request path in a background worker
+when guidance is saved, the first time a panel asks for a missing one
+(ensure_derivatives), or for every approved practice at once with
+
+    python -m media_derivatives
+
+They are stored in DERIVED_DIR next to the content-hashed originals, named
+<original stem>.<variant>.<ext>. Each tool is optional: without Pillow or
+ffmpeg the matching derivatives are simply not produced, and the panels
+fall back to loading the original on demand. An ffmpeg run is killed after
+FFMPEG_TIMEOUT_SECONDS so one bad file cannot stall the queue.
+
+A variant that cannot be made (corrupt file, unsupported codec, timeout)
+leaves a <derivative>.failed marker, named after the original's content
+hash like the derivative itself. Marked variants are not queued again
+unless a retry is asked for (retry=True, or
+
+    python -m media_derivatives --retry
+).
+"""
+
+import contextlib
+import os
+import shutil
+import subprocess
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from database import GUIDANCE_MEDIA_DIR
+from practice_store import MEDIA_FIELDS, PRACTICE_KINDS, get_practice_store
+
+try:
+    from PIL import Image
+except ImportError:  # Pillow is optional
+    Image = None
+
+DERIVED_DIR = os.path.join(GUIDANCE_MEDIA_DIR, "derived")
+FFMPEG_TIMEOUT_SECONDS = float(os.environ.get("FFMPEG_TIMEOUT_SECONDS", "300"))
+
+IMAGE_EXTS = {".png", ".jpg", ".jpeg", ".webp"}
+AUDIO_EXTS = {".mp3", ".wav", ".m4a", ".ogg"}
+VIDEO_EXTS = {".mp4", ".mov", ".m4v", ".webm", ".mpeg4"}
+
+# variant -> file extension
+VARIANTS = {
+    "thumb": ".webp",
+    "preview": ".webp",
+    "audio_preview": ".mp3",
+    "poster": ".jpg",
+    "video_preview": ".mp4",
+}
+
+_executor = None
+_executor_lock = threading.Lock()
+_queued = set()  # originals waiting for or in generation
+
+
+def derivative_path(original: str, variant: str) -> str:
+    stem = os.path.splitext(os.path.basename(original))[0]
+    return os.path.join(DERIVED_DIR, f"{stem}.{variant}{VARIANTS[variant]}")
+
+
+def failed_marker(original: str, variant: str) -> str:
+    return derivative_path(original, variant) + ".failed"
+
+
+def _failed(original: str, variant: str) -> bool:
+    return os.path.exists(failed_marker(original, variant))
+
+
+def _mark_failed(original: str, variant: str):
+    os.makedirs(DERIVED_DIR, exist_ok=True)
+    with contextlib.suppress(OSError):
+        with open(failed_marker(original, variant), "w", encoding="utf-8") as f:
+            f.write(os.path.basename(original) + "\n")
+
+
+def existing_derivative(original: str, variant: str):
+    """Path of a finished derivative, or None."""
+    if not original:
+        return None
+    path = derivative_path(original, variant)
+    return path if os.path.exists(path) else None
+
+
+def _ffmpeg(*args) -> bool:
+    ffmpeg = shutil.which("ffmpeg")
+    if not ffmpeg:
+        return False
+    try:
+        result = subprocess.run(
+            [ffmpeg, "-y", "-loglevel", "error", *args],
+            capture_output=True,
+            timeout=FFMPEG_TIMEOUT_SECONDS,
+        )
+    except subprocess.TimeoutExpired:
+        return False  # run() has already killed ffmpeg
+    return result.returncode == 0
+
+
+def _write_atomically(dest: str, produce) -> bool:
+    """Run produce(tmp_path) and move the result into place only on success."""
+    os.makedirs(DERIVED_DIR, exist_ok=True)
+    root, ext = os.path.splitext(dest)
+    tmp = f"{root}.tmp{ext}"  # keep the extension so tools pick the format
+    try:
+        ok = produce(tmp)
+        if ok and os.path.exists(tmp):
+            os.replace(tmp, dest)
+            return True
+        return False
+    except Exception:
+        return False
+    finally:
+        with contextlib.suppress(OSError):
+            os.remove(tmp)
+
+
+def _image_variant(src: str, dest: str, max_side: int) -> bool:
+    if Image is None:
+        return False
+
+    def produce(tmp):
+        with Image.open(src) as img:
+            img.thumbnail((max_side, max_side))
+            if img.mode not in ("RGB", "RGBA"):
+                img = img.convert("RGBA" if "A" in img.getbands() else "RGB")
+            img.save(tmp, "WEBP", quality=75, method=4)
+        return True
+
+    return _write_atomically(dest, produce)
+
+
+def generate_derivatives(original: str, retry: bool = False) -> list:
+    """
+    Create any missing derivatives for one original; returns those created.
+    Variants that failed before are skipped unless retry is set.
+    """
+    if not original or not os.path.exists(original):
+        return []
+
+    ext = os.path.splitext(original)[1].lower()
+    jobs = []
+
+    if ext in IMAGE_EXTS:
+        jobs = [
+            ("thumb", lambda d: _image_variant(original, d, 256)),
+            ("preview", lambda d: _image_variant(original, d, 1024)),
+        ]
+    elif ext in AUDIO_EXTS:
+        jobs = [
+            ("audio_preview", lambda d: _write_atomically(d, lambda tmp: _ffmpeg(
+                "-i", original, "-vn", "-ac", "1", "-codec:a", "libmp3lame", "-b:a", "64k", tmp,
+            ))),
+        ]
+    elif ext in VIDEO_EXTS:
+        jobs = [
+            ("poster", lambda d: _write_atomically(d, lambda tmp: _ffmpeg(
+                "-i", original, "-frames:v", "1", "-vf", "scale=256:-2", tmp,
+            ))),
+            ("video_preview", lambda d: _write_atomically(d, lambda tmp: _ffmpeg(
+                "-i", original, "-vf", "scale=-2:480", "-c:v", "libx264",
+                "-preset", "veryfast", "-crf", "30", "-c:a", "aac", "-b:a", "64k",
+                "-movflags", "+faststart", tmp,
+            ))),
+        ]
+
+    # Without the tool a variant is unavailable, not failed.
+    available = set(expected_variants(original))
+
+    created = []
+    for variant, make in jobs:
+        dest = derivative_path(original, variant)
+        if variant not in available or os.path.exists(dest):
+            continue
+        if _failed(original, variant) and not retry:
+            continue
+        if make(dest):
+            created.append(dest)
+            with contextlib.suppress(OSError):
+                os.remove(failed_marker(original, variant))
+        else:
+            _mark_failed(original, variant)
+    return created
+
+
+def _generate_queued(original: str, retry: bool):
+    try:
+        generate_derivatives(original, retry=retry)
+    finally:
+        with _executor_lock:
+            _queued.discard(original)
+
+
+def schedule_derivatives(*originals, retry: bool = False):
+    """Queue derivative generation in the background (one worker per process)."""
+    global _executor
+    paths = [p for p in originals if p]
+    if not paths:
+        return
+
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="media-derivatives")
+        for path in paths:
+            if path in _queued:
+                continue
+            _queued.add(path)
+            _executor.submit(_generate_queued, path, retry)
+
+
+def expected_variants(original: str) -> list:
+    """Variants that can be made for original with the tools installed."""
+    ext = os.path.splitext(original or "")[1].lower()
+    if ext in IMAGE_EXTS:
+        return ["thumb", "preview"] if Image is not None else []
+    if not shutil.which("ffmpeg"):
+        return []
+    if ext in AUDIO_EXTS:
+        return ["audio_preview"]
+    if ext in VIDEO_EXTS:
+        return ["poster", "video_preview"]
+    return []
+
+
+def ensure_derivatives(original: str, retry: bool = False) -> bool:
+    """
+    Queue generation if any derivative of original is missing (e.g. media
+    saved before derivatives existed). True while one is pending; variants
+    that failed before count as settled unless retry is set.
+    """
+    if not original or not os.path.exists(original):
+        return False
+    missing = [
+        v for v in expected_variants(original)
+        if not existing_derivative(original, v) and (retry or not _failed(original, v))
+    ]
+    if missing:
+        schedule_derivatives(original, retry=retry)
+    return bool(missing)
+
+
+def backfill_derivatives(entries, retry: bool = False) -> int:
+    """Queue generation for every media file of entries; returns files queued."""
+    queued = 0
+    for entry in entries:
+        for field in MEDIA_FIELDS:
+            if ensure_derivatives(entry.get(field), retry=retry):
+                queued += 1
+    return queued
+
+
+def remove_derivatives(original: str) -> int:
+    """Delete every derivative (and failure marker) of original; returns bytes freed."""
+    freed = 0
+    for variant in VARIANTS:
+        for path in (derivative_path(original, variant), failed_marker(original, variant)):
+            with contextlib.suppress(OSError):
+                size = os.path.getsize(path)
+                os.remove(path)
+                freed += size
+    return freed
+
+
+if __name__ == "__main__":
+    store = get_practice_store()
+    total = backfill_derivatives(
+        (e for kind in PRACTICE_KINDS for e in store.list(kind)),
+        retry="--retry" in sys.argv[1:],
+    )
+    print(f"Generating derivatives for {total} media files...")
+    if _executor is not None:
+        _executor.shutdown(wait=True)
+    print("Done.")
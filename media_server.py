@@ -0,0 +1,290 @@
+"""
+media_server.py
+
+Static file route for guidance media, so audio and video players stream
+from disk instead of Streamlit reading whole files into memory and pushing
+them over the websocket.
+
+- URL mode is opt-in: set MEDIA_BASE_URL to the address browsers use to
+  reach the server (e.g. https://example.org/media behind a proxy). Without
+  it media_src() returns plain paths and Streamlit serves the files as
+  before, so remote deployments never get URLs pointing at localhost.
+- A small threaded HTTP server runs alongside Streamlit, started once per
+  process by ensure_media_server(). If the port is already taken, a
+  /_health request decides whether it is another process's media server
+  (used) or an unrelated listener (paths are used instead).
+- Only files under MEDIA_ROOTS are served (guidance audio, guidance media
+  and its derived/ previews, plus anything listed in MEDIA_SERVER_ROOTS).
+- Range requests (206 / 416), ETag, Last-Modified and 304 revalidation are
+  supported. Content-hashed files are served as immutable.
+
+media_src(path) returns the URL for a servable file and falls back to the
+path itself, so callers can hand it straight to st.audio / st.video.
+"""
+
+import email.utils
+import mimetypes
+import os
+import re
+import threading
+import urllib.parse
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from database import GUIDANCE_AUDIO_DIR, GUIDANCE_MEDIA_DIR
+
+MEDIA_SERVER_HOST = os.environ.get("MEDIA_SERVER_HOST", "127.0.0.1")
+MEDIA_SERVER_PORT = int(os.environ.get("MEDIA_SERVER_PORT", "8765"))
+# Browser-facing base URL of the server; empty disables URL mode.
+MEDIA_BASE_URL = os.environ.get("MEDIA_BASE_URL", "").rstrip("/")
+
+MEDIA_ROOTS = [GUIDANCE_AUDIO_DIR, GUIDANCE_MEDIA_DIR] + [
+    p for p in os.environ.get("MEDIA_SERVER_ROOTS", "").split(os.pathsep) if p
+]
+
+MEDIA_CHUNK_SIZE = 64 * 1024
+
+_HASHED_NAME = re.compile(r"^[0-9a-f]{64}(\.|$)")
+
+HEALTH_PATH = "/_health"
+HEALTH_BODY = b"guidance-media ok"
+
+mimetypes.add_type("image/webp", ".webp")
+mimetypes.add_type("audio/mp4", ".m4a")
+mimetypes.add_type("video/mp4", ".mpeg4")
+
+_server = None
+_external = None  # another process holds the port
+_server_lock = threading.Lock()
+
+
+# -----------------------------------------------------------
+# PATH <-> URL
+# -----------------------------------------------------------
+
+def _roots() -> dict:
+    """{url prefix: absolute directory}"""
+    return {os.path.basename(os.path.normpath(r)): os.path.realpath(r) for r in MEDIA_ROOTS}
+
+
+def _local_url() -> str:
+    host = "127.0.0.1" if MEDIA_SERVER_HOST in ("0.0.0.0", "") else MEDIA_SERVER_HOST
+    return f"http://{host}:{MEDIA_SERVER_PORT}"
+
+
+def media_url(path: str):
+    """URL for a file under one of MEDIA_ROOTS, or None (also without MEDIA_BASE_URL)."""
+    if not path or not MEDIA_BASE_URL:
+        return None
+    real = os.path.realpath(path)
+    for prefix, root in _roots().items():
+        if real.startswith(root + os.sep):
+            rel = os.path.relpath(real, root).replace(os.sep, "/")
+            return f"{MEDIA_BASE_URL}/{urllib.parse.quote(prefix)}/{urllib.parse.quote(rel)}"
+    return None
+
+
+def media_src(path: str):
+    """What to give st.audio / st.video / st.image: a URL when served, else the path."""
+    if MEDIA_BASE_URL and ensure_media_server():
+        url = media_url(path)
+        if url:
+            return url
+    return path
+
+
+def _resolve(url_path: str):
+    """Filesystem path for a request path, or None if outside MEDIA_ROOTS."""
+    parts = urllib.parse.unquote(urllib.parse.urlsplit(url_path).path).lstrip("/").split("/", 1)
+    if len(parts) != 2:
+        return None
+    root = _roots().get(parts[0])
+    if root is None:
+        return None
+    real = os.path.realpath(os.path.join(root, parts[1]))
+    if not real.startswith(root + os.sep) or not os.path.isfile(real):
+        return None
+    return real
+
+
+# -----------------------------------------------------------
+# REQUEST HANDLER
+# -----------------------------------------------------------
+
+def _parse_range(header: str, size: int):
+    """
+    (start, end) inclusive for a single "bytes=" range, None to ignore the
+    header and send the whole file, or "invalid" for a 416.
+    """
+    unit, _, spec = header.partition("=")
+    if unit.strip() != "bytes" or "," in spec:
+        return None  # multi-range: a full response is allowed
+    first, _, last = spec.strip().partition("-")
+    try:
+        if first:
+            start = int(first)
+            end = int(last) if last else size - 1
+        elif last:
+            start = max(0, size - int(last))
+            end = size - 1
+        else:
+            return None
+    except ValueError:
+        return None
+    if start >= size or start > end:
+        return "invalid"
+    return start, min(end, size - 1)
+
+
+class MediaRequestHandler(BaseHTTPRequestHandler):
+    server_version = "GuidanceMedia/1.0"
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_HEAD(self):
+        self._serve(send_body=False)
+
+    def do_GET(self):
+        self._serve(send_body=True)
+
+    def _serve(self, send_body: bool):
+        if self.path == HEALTH_PATH:
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain")
+            self.send_header("Content-Length", str(len(HEALTH_BODY)))
+            self.end_headers()
+            if send_body:
+                self.wfile.write(HEALTH_BODY)
+            return
+
+        path = _resolve(self.path)
+        if path is None:
+            self.send_error(404)
+            return
+
+        info = os.stat(path)
+        size = info.st_size
+        name = os.path.basename(path)
+        immutable = bool(_HASHED_NAME.match(name))
+        etag = f'"{name}"' if immutable else f'"{size:x}-{info.st_mtime_ns:x}"'
+        last_modified = email.utils.formatdate(info.st_mtime, usegmt=True)
+
+        if self._not_modified(etag, info.st_mtime):
+            self.send_response(304)
+            self._common_headers(etag, last_modified, immutable)
+            self.end_headers()
+            return
+
+        start, end = 0, size - 1
+        status = 200
+        range_header = self.headers.get("Range")
+        if_range = self.headers.get("If-Range")
+        if range_header and (not if_range or if_range in (etag, last_modified)):
+            rng = _parse_range(range_header, size)
+            if rng == "invalid":
+                self.send_response(416)
+                self.send_header("Content-Range", f"bytes */{size}")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            if rng:
+                start, end = rng
+                status = 206
+
+        length = end - start + 1 if size else 0
+        self.send_response(status)
+        self._common_headers(etag, last_modified, immutable)
+        self.send_header("Content-Type", mimetypes.guess_type(name)[0] or "application/octet-stream")
+        self.send_header("Content-Length", str(length))
+        if status == 206:
+            self.send_header("Content-Range", f"bytes {start}-{end}/{size}")
+        self.end_headers()
+
+        if not send_body or not length:
+            return
+
+        try:
+            with open(path, "rb") as f:
+                f.seek(start)
+                remaining = length
+                while remaining:
+                    chunk = f.read(min(MEDIA_CHUNK_SIZE, remaining))
+                    if not chunk:
+                        break
+                    self.wfile.write(chunk)
+                    remaining -= len(chunk)
+        except (BrokenPipeError, ConnectionResetError):
+            # Players routinely drop a connection after seeking.
+            pass
+
+    def _not_modified(self, etag: str, mtime: float) -> bool:
+        if_none_match = self.headers.get("If-None-Match")
+        if if_none_match:
+            tags = [t.strip() for t in if_none_match.split(",")]
+            return etag in tags or "*" in tags
+        if_modified_since = self.headers.get("If-Modified-Since")
+        if if_modified_since:
+            try:
+                since = email.utils.parsedate_to_datetime(if_modified_since).timestamp()
+            except (TypeError, ValueError):
+                return False
+            return int(mtime) <= since
+        return False
+
+    def _common_headers(self, etag: str, last_modified: str, immutable: bool):
+        self.send_header("Accept-Ranges", "bytes")
+        self.send_header("ETag", etag)
+        self.send_header("Last-Modified", last_modified)
+        if immutable:
+            self.send_header("Cache-Control", "public, max-age=31536000, immutable")
+        else:
+            self.send_header("Cache-Control", "public, max-age=300")
+
+
+# -----------------------------------------------------------
+# SERVER LIFECYCLE
+# -----------------------------------------------------------
+
+def ensure_media_server() -> bool:
+    """
+    Start the media server in a daemon thread (once per process).
+    Returns True when media can be served by URL.
+    """
+    global _server, _external
+    if _server is not None or _external is not None:
+        return _server is not None or _external
+
+    with _server_lock:
+        if _server is not None or _external is not None:
+            return _server is not None or _external
+        try:
+            server = ThreadingHTTPServer((MEDIA_SERVER_HOST, MEDIA_SERVER_PORT), MediaRequestHandler)
+        except OSError:
+            # Usually another worker on this host already serves it; make
+            # sure the listener really is a media server before using it.
+            _external = _healthy()
+            return _external
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, name="media-server", daemon=True).start()
+        _server = server
+        return True
+
+
+def _healthy() -> bool:
+    """True if the listener on MEDIA_SERVER_PORT answers like a media server."""
+    try:
+        opener = urllib.request.build_opener(urllib.request.ProxyHandler({}))
+        with opener.open(_local_url() + HEALTH_PATH, timeout=1) as resp:
+            return resp.status == 200 and resp.read(64) == HEALTH_BODY
+    except (OSError, ValueError):
+        return False
+
+
+def shutdown_media_server():
+    global _server
+    with _server_lock:
+        if _server is not None:
+            _server.shutdown()
+            _server.server_close()
+            _server = None
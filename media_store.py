@@ -0,0 +1,148 @@
+"""
+media_store.py
+
+Content-addressed storage for guidance audio, images and video.
+
+- Uploads are streamed to disk in chunks (uploads.stream_upload) and stored
+  as <sha256><ext>, so attaching the same file to many practices keeps a
+  single copy.
+- Reference counts are kept by the practice store as entries change
+  (audio_path, image_path, video_path). release_media() removes a file once
+  its last practice is gone. collect_garbage() sweeps the guidance
+  directories for anything no longer referenced. Derivatives
+  (media_derivatives) go with their original.
+- Neither touches a file stored or re-stored within MEDIA_GC_GRACE_SECONDS:
+  a concurrent save of the same content may not have added its practice yet.
+"""
+
+import collections
+import contextlib
+import os
+import time
+
+from database import GUIDANCE_AUDIO_DIR, GUIDANCE_MEDIA_DIR
+from json_store import store_lock
+from media_derivatives import DERIVED_DIR, remove_derivatives
+from practice_store import get_practice_store, MEDIA_FIELDS
+from uploads import stream_upload
+
+# Files younger than this are never collected: a save may be between
+# writing the media and adding its practice.
+MEDIA_GC_GRACE_SECONDS = 3600
+
+
+def _norm(path: str) -> str:
+    return os.path.normpath(path)
+
+
+def store_media(upload, directory: str) -> str:
+    """Store an upload under its content hash; returns the file path."""
+    tmp_path, digest, _ = stream_upload(upload, directory)
+    ext = os.path.splitext(upload.name or "")[1].lower()
+    dest_path = os.path.join(directory, f"{digest}{ext}")
+
+    with store_lock("guidance_media"):
+        if os.path.exists(dest_path):
+            os.remove(tmp_path)
+            # Refresh mtime so the GC grace period covers the new reference.
+            os.utime(dest_path)
+        else:
+            os.replace(tmp_path, dest_path)
+
+    return dest_path
+
+
+def media_refcounts() -> collections.Counter:
+    """{normalised path: number of approved practices referencing it}"""
+    return get_practice_store().media_refcounts()
+
+
+def _in_grace_period(path: str, now: float) -> bool:
+    try:
+        return now - os.path.getmtime(path) < MEDIA_GC_GRACE_SECONDS
+    except OSError:
+        return False
+
+
+def _remove(path: str) -> int:
+    try:
+        size = os.path.getsize(path)
+        os.remove(path)
+        return size
+    except OSError:
+        return 0
+
+
+def release_media(entry: dict) -> int:
+    """
+    Call after a practice is deleted: removes its media files that no other
+    practice references. Recently stored files are left for
+    collect_garbage(). Returns bytes freed.
+    """
+    paths = {_norm(entry[f]) for f in MEDIA_FIELDS if entry.get(f)}
+    if not paths:
+        return 0
+
+    now = time.time()
+    store = get_practice_store()
+    freed = 0
+    with store_lock("guidance_media"):
+        for path in paths:
+            if store.media_refcount(path) or _in_grace_period(path, now):
+                continue
+            freed += _remove(path)
+            freed += remove_derivatives(path)
+    return freed
+
+
+def collect_garbage(dry_run: bool = False):
+    """
+    Remove guidance media that no approved practice references.
+    Returns (files, bytes) removed (or that would be removed).
+    """
+    now = time.time()
+    files = 0
+    freed = 0
+
+    with store_lock("guidance_media"):
+        counts = media_refcounts()
+        for directory in {GUIDANCE_AUDIO_DIR, GUIDANCE_MEDIA_DIR}:
+            if not os.path.isdir(directory):
+                continue
+            for entry in os.scandir(directory):
+                if not entry.is_file():
+                    continue
+                info = entry.stat()
+                if now - info.st_mtime < MEDIA_GC_GRACE_SECONDS:
+                    continue
+                if counts.get(_norm(entry.path), 0):
+                    continue
+                files += 1
+                if dry_run:
+                    freed += info.st_size
+                else:
+                    with contextlib.suppress(OSError):
+                        os.remove(entry.path)
+                        freed += info.st_size
+
+        # Derivatives whose original is gone.
+        originals = {
+            os.path.splitext(os.path.basename(path))[0] for path in counts
+        }
+        if os.path.isdir(DERIVED_DIR):
+            for entry in os.scandir(DERIVED_DIR):
+                if not entry.is_file():
+                    continue
+                stem = entry.name.split(".", 1)[0]
+                info = entry.stat()
+                if stem in originals or now - info.st_mtime < MEDIA_GC_GRACE_SECONDS:
+                    continue
+                files += 1
+                if dry_run:
+                    freed += info.st_size
+                else:
+                    with contextlib.suppress(OSError):
+                        os.remove(entry.path)
+                        freed += info.st_size
+
+    return files, freed
@@ -0,0 +1,344 @@
+"""
+metrics.py
+
+In-process metrics: counters, gauges and latency histograms.
+
+- span(name) / timed(name) time a block or function into the histogram
+  "<name>" (milliseconds) and count calls in "<name>.calls" and failures
+  in "<name>.errors".
+- METRICS_SAMPLE_RATE (0..1) samples spans. A skipped span costs one
+  random() call. Sampled spans add 1/rate to their counters, so counts
+  and rates stay unbiased.
+- Histograms use fixed exponential buckets. p50 / p95 / p99 are
+  interpolated within a bucket, and memory per histogram is constant.
+- suppressed() turns recording off for the current thread, so synthetic
+  traffic (warm-up) stays out of the figures.
+- snapshot() returns everything as a dict. start_metrics_exporter() writes
+  it to METRICS_DIR/<pid>.json every METRICS_EXPORT_INTERVAL seconds, and
+  serves it on http://METRICS_HTTP_HOST:METRICS_HTTP_PORT/metrics when a
+  port is set. Use /metrics?format=prometheus for the text format. Files
+  of processes that are no longer running are deleted on export.
+"""
+
+import bisect
+import collections
+import contextlib
+import functools
+import json
+import os
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from json_store import atomic_write_json
+
+METRICS_SAMPLE_RATE = float(os.environ.get("METRICS_SAMPLE_RATE", "1.0"))
+METRICS_DIR = os.environ.get("METRICS_DIR", "metrics")
+METRICS_EXPORT_INTERVAL = float(os.environ.get("METRICS_EXPORT_INTERVAL", "15"))
+METRICS_HTTP_HOST = os.environ.get("METRICS_HTTP_HOST", "127.0.0.1")
+METRICS_HTTP_PORT = int(os.environ.get("METRICS_HTTP_PORT", "0"))  # 0 = off
+
+# Upper bounds in milliseconds; the last bucket is open-ended.
+BUCKETS_MS = (
+    1, 2, 5, 10, 20, 50, 100, 200, 500,
+    1000, 2000, 5000, 10000, 20000, 60000, float("inf"),
+)
+
+RATE_WINDOW_SECONDS = 300
+
+_lock = threading.Lock()
+_started_at = time.time()
+_counters = {}
+_rate_buckets = {}  # counter -> deque[[second, amount]]
+_gauges = {}
+_gauge_fns = {}
+_histograms = {}
+
+_exporter_started = False
+_local = threading.local()
+
+
+# -----------------------------------------------------------
+# HISTOGRAM
+# -----------------------------------------------------------
+
+class Histogram:
+    __slots__ = ("counts", "count", "total", "max")
+
+    def __init__(self):
+        self.counts = [0] * len(BUCKETS_MS)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, ms: float):
+        self.counts[bisect.bisect_left(BUCKETS_MS, ms)] += 1
+        self.count += 1
+        self.total += ms
+        if ms > self.max:
+            self.max = ms
+
+    def percentile(self, q: float) -> float:
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            if seen + n >= rank and n:
+                lower = BUCKETS_MS[i - 1] if i else 0.0
+                upper = min(BUCKETS_MS[i], self.max)
+                return lower + (upper - lower) * (rank - seen) / n
+            seen += n
+        return self.max
+
+    def summary(self) -> dict:
+        return {
+            "count": self.count,
+            "mean_ms": round(self.total / self.count, 2) if self.count else 0.0,
+            "p50_ms": round(self.percentile(0.50), 2),
+            "p95_ms": round(self.percentile(0.95), 2),
+            "p99_ms": round(self.percentile(0.99), 2),
+            "max_ms": round(self.max, 2),
+        }
+
+
+# -----------------------------------------------------------
+# RECORDING
+# -----------------------------------------------------------
+
+@contextlib.contextmanager
+def suppressed():
+    """Record nothing from this thread inside the block."""
+    previous = getattr(_local, "suppressed", False)
+    _local.suppressed = True
+    try:
+        yield
+    finally:
+        _local.suppressed = previous
+
+
+def _recording() -> bool:
+    return not getattr(_local, "suppressed", False)
+
+
+def inc(name: str, amount: float = 1.0):
+    if not _recording():
+        return
+    now = int(time.time())
+    with _lock:
+        _counters[name] = _counters.get(name, 0.0) + amount
+        buckets = _rate_buckets.get(name)
+        if buckets is None:
+            buckets = _rate_buckets[name] = collections.deque(maxlen=RATE_WINDOW_SECONDS)
+        if buckets and buckets[-1][0] == now:
+            buckets[-1][1] += amount
+        else:
+            buckets.append([now, amount])
+
+
+def set_gauge(name: str, value: float):
+    with _lock:
+        _gauges[name] = value
+
+
+def add_gauge(name: str, delta: float):
+    if not _recording():
+        return
+    with _lock:
+        _gauges[name] = _gauges.get(name, 0.0) + delta
+
+
+def register_gauge(name: str, fn):
+    """Gauge read from fn() at snapshot time (e.g. a cache size)."""
+    with _lock:
+        _gauge_fns[name] = fn
+
+
+def observe(name: str, ms: float):
+    if not _recording():
+        return
+    with _lock:
+        hist = _histograms.get(name)
+        if hist is None:
+            hist = _histograms[name] = Histogram()
+        hist.observe(ms)
+
+
+@contextlib.contextmanager
+def span(name: str):
+    """Time the enclosed block into histogram name (sampled)."""
+    rate = METRICS_SAMPLE_RATE
+    if rate <= 0 or (rate < 1 and random.random() >= rate) or not _recording():
+        yield
+        return
+
+    weight = 1.0 / rate
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        inc(f"{name}.errors", weight)
+        raise
+    finally:
+        observe(name, (time.perf_counter() - start) * 1000)
+        inc(f"{name}.calls", weight)
+
+
+def timed(name: str):
+    """Decorator form of span()."""
+    def wrap(fn):
+        @functools.wraps(fn)
+        def inner(*args, **kwargs):
+            with span(name):
+                return fn(*args, **kwargs)
+        return inner
+    return wrap
+
+
+# -----------------------------------------------------------
+# READING
+# -----------------------------------------------------------
+
+def rate(name: str, window: float = 60) -> float:
+    """Per-second rate of a counter over the last window seconds."""
+    cutoff = time.time() - window
+    with _lock:
+        buckets = list(_rate_buckets.get(name, ()))
+    return sum(amount for sec, amount in buckets if sec >= cutoff) / window
+
+
+def snapshot() -> dict:
+    with _lock:
+        counters = dict(_counters)
+        gauges = dict(_gauges)
+        gauge_fns = dict(_gauge_fns)
+        histograms = {name: h.summary() for name, h in _histograms.items()}
+
+    for name, fn in gauge_fns.items():
+        try:
+            gauges[name] = fn()
+        except Exception:
+            gauges[name] = None
+
+    return {
+        "pid": os.getpid(),
+        "time": time.time(),
+        "uptime_s": round(time.time() - _started_at, 1),
+        "sample_rate": METRICS_SAMPLE_RATE,
+        "counters": counters,
+        "gauges": gauges,
+        "histograms": histograms,
+    }
+
+
+def reset():
+    with _lock:
+        _counters.clear()
+        _rate_buckets.clear()
+        _gauges.clear()
+        _histograms.clear()
+
+
+def prometheus_text(snap: dict = None) -> str:
+    snap = snap or snapshot()
+
+    def metric(name):
+        return "app_" + "".join(c if c.isalnum() else "_" for c in name)
+
+    lines = []
+    for name, value in sorted(snap["counters"].items()):
+        lines.append(f"{metric(name)}_total {value}")
+    for name, value in sorted(snap["gauges"].items()):
+        if isinstance(value, (int, float)):
+            lines.append(f"{metric(name)} {value}")
+    for name, h in sorted(snap["histograms"].items()):
+        for q in ("p50", "p95", "p99"):
+            quantile = "0." + q[1:]
+            lines.append(f'{metric(name)}_ms{{quantile="{quantile}"}} {h[q + "_ms"]}')
+        lines.append(f"{metric(name)}_ms_count {h['count']}")
+    return "\n".join(lines) + "\n"
+
+
+# -----------------------------------------------------------
+# EXPORT
+# -----------------------------------------------------------
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        if not self.path.startswith("/metrics"):
+            self.send_error(404)
+            return
+        if "format=prometheus" in self.path:
+            body = prometheus_text().encode("utf-8")
+            ctype = "text/plain; version=0.0.4"
+        else:
+            body = json.dumps(snapshot()).encode("utf-8")
+            ctype = "application/json"
+        self.send_response(200)
+        self.send_header("Content-Type", ctype)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True  # exists, owned by someone else
+    return True
+
+
+def prune_metrics_files():
+    """Delete export files of processes that are no longer running."""
+    try:
+        names = os.listdir(METRICS_DIR)
+    except FileNotFoundError:
+        return
+    for name in names:
+        stem, ext = os.path.splitext(name)
+        if ext != ".json" or not stem.isdigit() or _pid_alive(int(stem)):
+            continue
+        with contextlib.suppress(OSError):
+            os.remove(os.path.join(METRICS_DIR, name))
+
+
+def export_metrics_file():
+    os.makedirs(METRICS_DIR, exist_ok=True)
+    atomic_write_json(os.path.join(METRICS_DIR, f"{os.getpid()}.json"), snapshot())
+    prune_metrics_files()
+
+
+def _export_loop():
+    while True:
+        time.sleep(METRICS_EXPORT_INTERVAL)
+        try:
+            export_metrics_file()
+        except OSError:
+            pass
+
+
+def start_metrics_exporter():
+    """Start the file exporter and (if configured) the HTTP endpoint, once per process."""
+    global _exporter_started
+    with _lock:
+        if _exporter_started:
+            return
+        _exporter_started = True
+
+    if METRICS_EXPORT_INTERVAL > 0:
+        threading.Thread(target=_export_loop, name="metrics-export", daemon=True).start()
+
+    if METRICS_HTTP_PORT:
+        try:
+            server = ThreadingHTTPServer((METRICS_HTTP_HOST, METRICS_HTTP_PORT), _MetricsHandler)
+        except OSError:
+            return  # another worker on this host already serves the port
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
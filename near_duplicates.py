@@ -0,0 +1,125 @@
+"""
+near_duplicates.py
+
+MinHash / LSH near-duplicate detection for practice texts.
+
+The same mantra turns up in many books and translations with small
+differences in spacing, punctuation or a word here and there. Texts are
+normalised, cut into character shingles, and sketched with one-permutation
+MinHash (NEAR_DUP_PERMUTATIONS bins). The sketches are then bucketed with
+LSH banding, so a lookup only compares against texts that share a band.
+"""
+
+import re
+import zlib
+
+NEAR_DUP_PERMUTATIONS = 64
+NEAR_DUP_BANDS = 8  # 8 bands x 8 rows: candidates start showing at ~0.77 similarity
+NEAR_DUP_THRESHOLD = 0.8
+SHINGLE_SIZE = 5
+
+_EMPTY = 1 << 32
+_WS = re.compile(r"\s+")
+_PUNCT = re.compile(r"[^\w\s]", re.UNICODE)
+
+
+def normalize_text(text: str) -> str:
+    text = _PUNCT.sub(" ", (text or "").lower())
+    return _WS.sub(" ", text).strip()
+
+
+def _shingles(text: str):
+    text = normalize_text(text)
+    if len(text) <= SHINGLE_SIZE:
+        return {text} if text else set()
+    return {text[i:i + SHINGLE_SIZE] for i in range(len(text) - SHINGLE_SIZE + 1)}
+
+
+def minhash(text: str):
+    """
+    One-permutation MinHash sketch: each shingle hash goes to bin
+    (h mod bins) and every bin keeps its minimum. Empty bins borrow
+    from the next non-empty bin, so sparse sketches still band sensibly.
+    Returns None for empty text.
+    """
+    bins = NEAR_DUP_PERMUTATIONS
+    sig = [_EMPTY] * bins
+
+    for sh in _shingles(text):
+        h = zlib.crc32(sh.encode("utf-8"))
+        b = h % bins
+        v = h // bins
+        if v < sig[b]:
+            sig[b] = v
+
+    if all(v == _EMPTY for v in sig):
+        return None
+
+    # Densify: fill empty bins from the next filled bin (circular).
+    for i in range(bins):
+        if sig[i] != _EMPTY:
+            continue
+        j = (i + 1) % bins
+        while sig[j] == _EMPTY:
+            j = (j + 1) % bins
+        sig[i] = sig[j] + (i - j) % bins * 0x9E3779B1  # keep borrowed bins distinct
+
+    return tuple(sig)
+
+
+def similarity(sig_a, sig_b) -> float:
+    """Estimated Jaccard similarity of two sketches."""
+    if not sig_a or not sig_b:
+        return 0.0
+    same = sum(1 for a, b in zip(sig_a, sig_b) if a == b)
+    return same / len(sig_a)
+
+
+class NearDuplicateIndex:
+    """LSH index of MinHash sketches keyed by caller-chosen ids."""
+
+    def __init__(self, threshold: float = NEAR_DUP_THRESHOLD):
+        self.threshold = threshold
+        self._rows = NEAR_DUP_PERMUTATIONS // NEAR_DUP_BANDS
+        self._buckets = {}
+        self._sigs = {}
+
+    def __len__(self):
+        return len(self._sigs)
+
+    def _bands(self, sig):
+        rows = self._rows
+        for band in range(NEAR_DUP_BANDS):
+            yield band, sig[band * rows:(band + 1) * rows]
+
+    def add(self, key, text: str = None, sig=None):
+        """Index one text (or a precomputed sketch) under key."""
+        sig = sig if sig is not None else minhash(text)
+        if sig is None:
+            return
+        self._sigs.setdefault(key, []).append(sig)
+        for band_key in self._bands(sig):
+            self._buckets.setdefault(band_key, set()).add(key)
+
+    def query(self, text: str = None, sig=None):
+        """[(key, similarity)] of indexed texts at or above the threshold, best first."""
+        sig = sig if sig is not None else minhash(text)
+        if sig is None:
+            return []
+
+        seen = set()
+        for band_key in self._bands(sig):
+            seen.update(self._buckets.get(band_key, ()))
+
+        hits = []
+        for key in seen:
+            best = max(similarity(sig, other) for other in self._sigs[key])
+            if best >= self.threshold:
+                hits.append((key, best))
+        hits.sort(key=lambda item: -item[1])
+        return hits
+
+    def find(self, text: str = None, sig=None):
+        """Key of the closest near-duplicate, or None."""
+        hits = self.query(text, sig)
+        return hits[0][0] if hits else None
@@ -0,0 +1,127 @@
+"""
+online_suggestions.py
+
+Cached, concurrent front end for admin_tools.fetch_online_practices().
+
+- Results are cached per (deity, scope, level) for ONLINE_CACHE_TTL_SECONDS.
+  Empty results (often a failed or timed-out lookup) are only cached for
+  ONLINE_EMPTY_TTL_SECONDS, and exceptions are not cached at all.
+- Concurrent misses for the same key share one fetch.
+- scope "Both" fans out the "Mantras" and "Meditations" lookups in
+  parallel. Each half is cached on its own, so it can reuse an earlier
+  single-scope search.
+- The fetcher is pluggable: set_fetcher(fn) swaps in a local stand-in
+  (same signature as fetch_online_practices) for tests and benchmarks.
+"""
+
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+ONLINE_CACHE_TTL_SECONDS = float(os.environ.get("ONLINE_CACHE_TTL_SECONDS", "3600"))
+ONLINE_EMPTY_TTL_SECONDS = float(os.environ.get("ONLINE_EMPTY_TTL_SECONDS", "30"))
+ONLINE_CACHE_MAX_ENTRIES = 256
+
+_fetcher = None
+_cache = {}  # key -> (expires_at, results)
+_inflight = {}  # key -> threading.Event set when that key's fetch ends
+_cache_lock = threading.Lock()
+_stats = {"hits": 0, "misses": 0}
+
+
+def set_fetcher(fn):
+    """Replace the fetcher; None restores admin_tools.fetch_online_practices."""
+    global _fetcher
+    _fetcher = fn
+    clear_cache()
+
+
+def _get_fetcher():
+    if _fetcher is not None:
+        return _fetcher
+    from admin_tools import fetch_online_practices
+    return fetch_online_practices
+
+
+def clear_cache():
+    with _cache_lock:
+        _cache.clear()
+        _stats.update(hits=0, misses=0)
+
+
+def cache_stats() -> dict:
+    with _cache_lock:
+        return dict(_stats, entries=len(_cache))
+
+
+def _cache_key(deity_name: str, scope: str, level_label: str):
+    return (deity_name.strip().lower(), scope, level_label)
+
+
+def _store(key, results, now: float):
+    ttl = ONLINE_CACHE_TTL_SECONDS if results else ONLINE_EMPTY_TTL_SECONDS
+    with _cache_lock:
+        if len(_cache) >= ONLINE_CACHE_MAX_ENTRIES:
+            # Drop expired entries first, then the oldest.
+            for k in [k for k, (exp, _) in _cache.items() if exp <= now]:
+                del _cache[k]
+            while len(_cache) >= ONLINE_CACHE_MAX_ENTRIES:
+                del _cache[next(iter(_cache))]
+        _cache[key] = (now + ttl, results)
+
+
+def _fetch_one(deity_name: str, scope: str, level_label: str, use_cache: bool):
+    key = _cache_key(deity_name, scope, level_label)
+    leader = False
+
+    while use_cache:
+        with _cache_lock:
+            hit = _cache.get(key)
+            if hit and hit[0] > time.monotonic():
+                _stats["hits"] += 1
+                return hit[1]
+            pending = _inflight.get(key)
+            if pending is None:
+                _stats["misses"] += 1
+                _inflight[key] = threading.Event()
+                leader = True
+                break
+        # Another thread is fetching this key; use its result (or retry
+        # ourselves if it failed).
+        pending.wait()
+
+    try:
+        results = _get_fetcher()(
+            deity_name=deity_name,
+            scope=scope,
+            level_label=level_label,
+        ) or []
+        _store(key, results, time.monotonic())
+    finally:
+        if leader:
+            with _cache_lock:
+                _inflight.pop(key).set()
+
+    return results
+
+
+def fetch_suggestions(deity_name: str, scope: str, level_label: str, use_cache: bool = True):
+    """
+    Online mantra / meditation suggestions for the admin review panel.
+    scope: "Mantras", "Meditations" or "Both".
+    """
+    if scope == "Both":
+        with ThreadPoolExecutor(max_workers=2) as ex:
+            parts = list(
+                ex.map(
+                    lambda s: _fetch_one(deity_name, s, level_label, use_cache),
+                    ["Mantras", "Meditations"],
+                )
+            )
+        results = parts[0] + parts[1]
+    else:
+        results = _fetch_one(deity_name, scope, level_label, use_cache)
+
+    # Callers keep results in session state and may edit them.
+    return [dict(r) for r in results]
@@ -0,0 +1,84 @@
+"""
+passage_store.py
+
+Shared, content-addressed store for retrieved source passages.
+
+Chat messages keep only passage ids; the passage itself (a dict or string
+as returned by rag.retrieve_passages) is written once to
+PASSAGE_DIR/<id[:2]>/<id>.json and shared by every message and session
+that retrieved it. Reads go through a process-wide LRU cache.
+
+Passages come from the indexed books, so the store is bounded by the
+corpus rather than by chat traffic.
+"""
+
+import collections
+import hashlib
+import json
+import os
+import threading
+
+from json_store import read_json, atomic_write_json
+
+PASSAGE_DIR = "chat_passages"
+PASSAGE_CACHE_SIZE = int(os.environ.get("PASSAGE_CACHE_SIZE", "2048"))
+
+_cache = collections.OrderedDict()  # id -> passage
+_cache_lock = threading.Lock()
+_stats = {"hits": 0, "misses": 0}
+
+
+def passage_id(passage) -> str:
+    raw = json.dumps(passage, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+def _path(pid: str) -> str:
+    return os.path.join(PASSAGE_DIR, pid[:2], f"{pid}.json")
+
+
+def _remember(pid: str, passage):
+    with _cache_lock:
+        _cache[pid] = passage
+        _cache.move_to_end(pid)
+        while len(_cache) > PASSAGE_CACHE_SIZE:
+            _cache.popitem(last=False)
+
+
+def put_passages(passages) -> list:
+    """Store passages (if new) and return their ids, in order."""
+    ids = []
+    for passage in passages or []:
+        pid = passage_id(passage)
+        path = _path(pid)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            atomic_write_json(path, passage)
+        _remember(pid, passage)
+        ids.append(pid)
+    return ids
+
+
+def get_passages(ids) -> list:
+    """Passages for ids, in order; ids whose file is missing are skipped."""
+    out = []
+    for pid in ids or []:
+        with _cache_lock:
+            if pid in _cache:
+                _cache.move_to_end(pid)
+                _stats["hits"] += 1
+                out.append(_cache[pid])
+                continue
+            _stats["misses"] += 1
+
+        passage = read_json(_path(pid), None)
+        if passage is None:
+            continue
+        _remember(pid, passage)
+        out.append(passage)
+    return out
+
+
+def cache_stats() -> dict:
+    with _cache_lock:
+        return dict(_stats, entries=len(_cache))
@@ -0,0 +1,150 @@
+"""
+password_pool.py
+
+Password hashing and verification, dispatched to a bounded process pool so a
+burst of logins cannot freeze the Streamlit script threads.
+
+- New hashes use PBKDF2-SHA256 with a configurable work factor
+  (PASSWORD_HASH_ROUNDS).
+- Hashes created by the older `auth.hash_password` are still verified via
+  `auth.check_password` inside the pool.
+- A job that waits longer than PASSWORD_POOL_TIMEOUT is cancelled and
+  PasswordPoolBusy is raised, so the caller can ask the user to retry.
+"""
+
+import base64
+import hashlib
+import hmac
+import multiprocessing
+import os
+import secrets
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+
+PASSWORD_HASH_ROUNDS = int(os.environ.get("PASSWORD_HASH_ROUNDS", "200000"))
+PASSWORD_POOL_WORKERS = int(
+    os.environ.get("PASSWORD_POOL_WORKERS", str(min(4, os.cpu_count() or 1)))
+)
+PASSWORD_POOL_TIMEOUT = float(os.environ.get("PASSWORD_POOL_TIMEOUT", "30"))
+
+_HASH_SCHEME = "pbkdf2_sha256"
+
+_pool = None
+_pool_lock = threading.Lock()
+
+# At most this many hash jobs may be queued or running at once; extra
+# callers wait here instead of piling work onto the pool.
+_pending = threading.BoundedSemaphore(PASSWORD_POOL_WORKERS * 4)
+
+
+class PasswordPoolBusy(RuntimeError):
+    """The pool did not finish a hash job within PASSWORD_POOL_TIMEOUT."""
+
+
+# -----------------------------------------------------------
+# WORKER FUNCTIONS (run inside the pool processes)
+# -----------------------------------------------------------
+
+def _b64(raw: bytes) -> str:
+    return base64.b64encode(raw).decode("ascii")
+
+
+def _hash_worker(password: str, rounds: int) -> str:
+    salt = secrets.token_bytes(16)
+    digest = hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), salt, rounds)
+    return f"{_HASH_SCHEME}${rounds}${_b64(salt)}${_b64(digest)}"
+
+
+def _verify_worker(password: str, stored: str) -> bool:
+    if not stored:
+        return False
+
+    if stored.startswith(_HASH_SCHEME + "$"):
+        try:
+            _, rounds, salt_b64, digest_b64 = stored.split("$", 3)
+            salt = base64.b64decode(salt_b64)
+            expected = base64.b64decode(digest_b64)
+            actual = hashlib.pbkdf2_hmac(
+                "sha256", password.encode("utf-8"), salt, int(rounds)
+            )
+        except Exception:
+            return False
+        return hmac.compare_digest(actual, expected)
+
+    # Legacy hash format from auth.py
+    from auth import check_password as legacy_check_password
+    return bool(legacy_check_password(password, stored))
+
+
+# -----------------------------------------------------------
+# POOL MANAGEMENT
+# -----------------------------------------------------------
+
+def _get_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # "spawn" avoids forking a multi-threaded Streamlit server.
+            _pool = ProcessPoolExecutor(
+                max_workers=PASSWORD_POOL_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _pool
+
+
+def _reset_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+def shutdown_pool():
+    """Stop the worker processes (used by benchmarks and tests)."""
+    _reset_pool()
+
+
+def _run(fn, *args):
+    """Run fn(*args) in the pool and wait for the result."""
+    with _pending:
+        try:
+            future = _get_pool().submit(fn, *args)
+            return future.result(timeout=PASSWORD_POOL_TIMEOUT)
+        except FutureTimeoutError:
+            # Drop the job if it has not started; the caller shows "try again".
+            future.cancel()
+            raise PasswordPoolBusy("password check timed out") from None
+        except BrokenProcessPool:
+            # A worker died; start fresh next time and answer inline now.
+            _reset_pool()
+            return fn(*args)
+
+
+# -----------------------------------------------------------
+# PUBLIC API
+# -----------------------------------------------------------
+
+def hash_password(password: str, rounds: int = None) -> str:
+    """Hash a password in the worker pool."""
+    return _run(_hash_worker, password, rounds or PASSWORD_HASH_ROUNDS)
+
+
+def check_password(password: str, stored: str) -> bool:
+    """Verify a password against a stored hash in the worker pool."""
+    return _run(_verify_worker, password, stored or "")
+
+
+def needs_rehash(stored: str) -> bool:
+    """
+    True when the stored hash is a legacy hash or uses a different work
+    factor than PASSWORD_HASH_ROUNDS.
+    """
+    if not stored or not stored.startswith(_HASH_SCHEME + "$"):
+        return True
+    try:
+        return int(stored.split("$", 2)[1]) != PASSWORD_HASH_ROUNDS
+    except ValueError:
+        return True
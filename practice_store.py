@@ -0,0 +1,615 @@
+"""
+practice_store.py
+
+Approved practices (meditations and mantras) with stable ids and per-entry
+writes.
+
+On disk (PRACTICE_STORE_DIR):
+- snapshot.json           {"generation", "next_seq", "entries": {id: entry}}
+- journal.<generation>    one JSON record per line: {"op": "put", "entry": ...}
+                          or {"op": "del", "id": ...}
+
+A single edit appends one journal line. Every process tails the journal to
+stay current. Once the journal grows past PRACTICE_COMPACT_AFTER records it
+is folded into a new snapshot, and the legacy approved-practices document
+(database.save_approved_practices) is re-exported for out-of-tree readers
+(rag, admin_tools). Those lag the store by up to PRACTICE_COMPACT_AFTER
+edits; everything in this repository reads through the store.
+
+Each entry carries a "rev" counter. Passing expected_rev to put()/delete()
+turns a lost update between two admins into a StaleEntryError.
+
+Secondary indexes (deity, level band, age group) and media reference
+counts (media_refcount) are kept up to date as records are applied. query() serves filtered listings from them for the
+admin panel and the user-facing side. find_near_duplicate() checks a text
+against every approved practice through a MinHash/LSH index.
+"""
+
+import bisect
+import collections
+import contextlib
+import json
+import os
+import threading
+import uuid
+
+from database import load_approved_practices, save_approved_practices
+from json_store import store_lock, read_json, atomic_write_json
+from near_duplicates import NearDuplicateIndex, minhash
+
+PRACTICE_STORE_DIR = "practice_store"
+PRACTICE_COMPACT_AFTER = int(os.environ.get("PRACTICE_COMPACT_AFTER", "200"))
+
+PRACTICE_KINDS = ("meditation", "mantra")
+
+# Fields holding guidance media paths (media_store)
+MEDIA_FIELDS = ("audio_path", "image_path", "video_path")
+
+# Bookkeeping fields that are not part of the legacy document
+_INTERNAL_FIELDS = ("kind", "seq", "rev")
+
+# Computed by query(); never stored
+_DERIVED_FIELDS = ("position", "band")
+
+
+class StaleEntryError(RuntimeError):
+    """Raised when an entry changed since the caller last read it."""
+
+
+# -----------------------------------------------------------
+# LEVEL BANDING / FIELD HELPERS
+# -----------------------------------------------------------
+
+def meditation_band(index: int) -> str:
+    """
+    Identical to your app.py:
+    index <= 3: Beginner
+    4–7: Intermediate
+    >7: Deeper
+    """
+    if index <= 3:
+        return "Beginner"
+    elif index <= 7:
+        return "Intermediate"
+    else:
+        return "Deeper"
+
+
+def mantra_band(level: int) -> str:
+    """
+    Same logic as app.py:
+    level <= 3: Beginner
+    <=7: Intermediate
+    else: Deeper
+    """
+    if level <= 3:
+        return "Beginner"
+    elif level <= 7:
+        return "Intermediate"
+    else:
+        return "Deeper"
+
+
+def practice_deity(entry: dict) -> str:
+    return (entry.get("deity") or "General").strip() or "General"
+
+
+def practice_level(entry: dict) -> int:
+    try:
+        return int(entry.get("level", 1))
+    except (TypeError, ValueError):
+        return 1
+
+
+def practice_age_group(entry: dict) -> str:
+    return entry.get("age_group") or "both"
+
+
+LEVEL_BANDS = ("Beginner", "Intermediate", "Deeper")
+
+# Meditation bands come from position, not a stored field: (start, stop)
+# slices of the meditation order (positions are 1-based in meditation_band).
+_MEDITATION_BAND_SLICES = {
+    "Beginner": (0, 3),
+    "Intermediate": (3, 7),
+    "Deeper": (7, None),
+}
+
+
+class PracticeStore:
+    def __init__(self, directory: str = PRACTICE_STORE_DIR):
+        self.directory = directory
+        self._lock = threading.RLock()
+        self._entries = {}
+        self._next_seq = 1
+        self._generation = None
+        self._snapshot_stamp = None
+        self._journal_offset = 0
+        self._journal_records = 0
+
+        # kind -> [(seq, id)] sorted by seq
+        self._order = {kind: [] for kind in PRACTICE_KINDS}
+        # (kind, field, value) -> {id}
+        self._index = {}
+        # normalised media path -> number of entries referencing it
+        self._media_refs = collections.Counter()
+
+        # Bumped on every applied change; derived caches key on it.
+        self._version = 0
+        self._dup_index = None
+        self._dup_index_version = None
+        self._sig_cache = {}  # (id, rev) -> [sketches]
+
+    # -------------------------------------------------------
+    # PATHS
+    # -------------------------------------------------------
+
+    @property
+    def _snapshot_path(self):
+        return os.path.join(self.directory, "snapshot.json")
+
+    def _journal_path(self, generation=None):
+        gen = self._generation if generation is None else generation
+        return os.path.join(self.directory, f"journal.{gen}")
+
+    # -------------------------------------------------------
+    # LOADING
+    # -------------------------------------------------------
+
+    def _bootstrap(self):
+        """
+        Create the first snapshot from the legacy approved document.
+        Takes store_lock, so never call it while holding self._lock
+        (writers take store_lock first); see _ensure_snapshot().
+        """
+        with store_lock("practice_store"):
+            if os.path.exists(self._snapshot_path):
+                return
+
+            legacy = load_approved_practices() or {}
+            entries = {}
+            seq = 1
+            for kind in PRACTICE_KINDS:
+                for item in legacy.get(kind) or []:
+                    entry = dict(item)
+                    entry_id = entry.get("id") or uuid.uuid4().hex[:12]
+                    entry.update(id=entry_id, kind=kind, seq=seq, rev=1)
+                    entries[entry_id] = entry
+                    seq += 1
+
+            os.makedirs(self.directory, exist_ok=True)
+            atomic_write_json(
+                self._snapshot_path,
+                {"generation": 1, "next_seq": seq, "entries": entries},
+            )
+
+    def _ensure_snapshot(self):
+        if self._snapshot_stamp is None and not os.path.exists(self._snapshot_path):
+            self._bootstrap()
+
+    @contextlib.contextmanager
+    def _reading(self):
+        """self._lock, with the store refreshed from disk."""
+        self._ensure_snapshot()
+        with self._lock:
+            self.refresh()
+            yield
+
+    def _stat_snapshot(self):
+        try:
+            info = os.stat(self._snapshot_path)
+        except FileNotFoundError:
+            return None
+        return (info.st_ino, info.st_mtime_ns, info.st_size)
+
+    # -------------------------------------------------------
+    # INDEXES
+    # -------------------------------------------------------
+
+    @staticmethod
+    def _index_keys(entry: dict):
+        kind = entry.get("kind")
+        if kind != "mantra":
+            return []
+        return [
+            (kind, "deity", practice_deity(entry)),
+            (kind, "band", mantra_band(practice_level(entry))),
+            (kind, "age_group", practice_age_group(entry)),
+        ]
+
+    @staticmethod
+    def _media_paths(entry: dict):
+        return [os.path.normpath(entry[f]) for f in MEDIA_FIELDS if entry.get(f)]
+
+    def _index_add(self, entry: dict):
+        order = self._order.setdefault(entry.get("kind"), [])
+        bisect.insort(order, (entry.get("seq", 0), entry["id"]))
+        for key in self._index_keys(entry):
+            self._index.setdefault(key, set()).add(entry["id"])
+        self._media_refs.update(self._media_paths(entry))
+
+    def _index_remove(self, entry: dict):
+        order = self._order.get(entry.get("kind"), [])
+        item = (entry.get("seq", 0), entry["id"])
+        pos = bisect.bisect_left(order, item)
+        if pos < len(order) and order[pos] == item:
+            order.pop(pos)
+        for key in self._index_keys(entry):
+            ids = self._index.get(key)
+            if ids is not None:
+                ids.discard(entry["id"])
+                if not ids:
+                    del self._index[key]
+        for path in self._media_paths(entry):
+            self._media_refs[path] -= 1
+            if self._media_refs[path] <= 0:
+                del self._media_refs[path]
+
+    def _rebuild_indexes(self):
+        self._order = {kind: [] for kind in PRACTICE_KINDS}
+        self._index = {}
+        self._media_refs = collections.Counter()
+        for entry in self._entries.values():
+            self._index_add(entry)
+        self._version += 1
+
+    def _apply(self, record: dict):
+        self._version += 1
+        op = record.get("op")
+        if op == "put":
+            entry = record["entry"]
+            old = self._entries.get(entry["id"])
+            if old is not None:
+                self._index_remove(old)
+            self._entries[entry["id"]] = entry
+            self._index_add(entry)
+            self._next_seq = max(self._next_seq, entry.get("seq", 0) + 1)
+        elif op == "del":
+            old = self._entries.pop(record.get("id"), None)
+            if old is not None:
+                self._index_remove(old)
+
+    def refresh(self):
+        """Pick up snapshot changes and new journal records from disk."""
+        self._ensure_snapshot()
+        with self._lock:
+            stamp = self._stat_snapshot()
+            if stamp is None:
+                return
+
+            if stamp != self._snapshot_stamp:
+                snap = read_json(self._snapshot_path, {})
+                self._entries = snap.get("entries") or {}
+                self._next_seq = snap.get("next_seq", 1)
+                self._generation = snap.get("generation", 1)
+                self._snapshot_stamp = stamp
+                self._journal_offset = 0
+                self._journal_records = 0
+                self._rebuild_indexes()
+
+            try:
+                with open(self._journal_path(), "rb") as f:
+                    f.seek(self._journal_offset)
+                    for line in f:
+                        if not line.endswith(b"\n"):
+                            break  # incomplete write; pick it up next time
+                        self._journal_offset += len(line)
+                        self._journal_records += 1
+                        try:
+                            self._apply(json.loads(line))
+                        except (ValueError, KeyError):
+                            continue
+            except FileNotFoundError:
+                pass
+
+    # -------------------------------------------------------
+    # WRITING
+    # -------------------------------------------------------
+
+    def _append(self, records):
+        payload = b"".join(
+            (json.dumps(r, ensure_ascii=False, separators=(",", ":")) + "\n").encode("utf-8")
+            for r in records
+        )
+        fd = os.open(self._journal_path(), os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+        try:
+            os.write(fd, payload)
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+        # Apply through refresh() so the offset bookkeeping stays in one place.
+        self.refresh()
+
+        if self._journal_records >= PRACTICE_COMPACT_AFTER:
+            self.compact()
+
+    def _check_rev(self, entry_id, expected_rev):
+        if expected_rev is None:
+            return
+        current = self._entries.get(entry_id)
+        current_rev = current.get("rev") if current else None
+        if current_rev != expected_rev:
+            raise StaleEntryError(entry_id)
+
+    def _put_records(self, items):
+        """Journal records for put_many(); call under the store lock."""
+        records = []
+        next_seq = self._next_seq
+
+        for entry, expected_rev in items:
+            entry = {k: v for k, v in entry.items() if k not in _DERIVED_FIELDS}
+            entry_id = entry.get("id")
+            current = self._entries.get(entry_id) if entry_id else None
+
+            if current is None:
+                if entry.get("kind") not in PRACTICE_KINDS:
+                    raise ValueError(f"unknown practice kind: {entry.get('kind')!r}")
+                if expected_rev is not None:
+                    raise StaleEntryError(entry_id)
+                new = dict(entry)
+                new.update(id=entry_id or uuid.uuid4().hex[:12], seq=next_seq, rev=1)
+                next_seq += 1
+            else:
+                self._check_rev(entry_id, expected_rev)
+                new = dict(current)
+                new.update(entry)
+                new.update(kind=current["kind"], seq=current["seq"], rev=current.get("rev", 0) + 1)
+
+            records.append({"op": "put", "entry": new})
+        return records
+
+    def put_many(self, items):
+        """
+        Insert or update several entries in one journal write.
+        items: iterable of (entry, expected_rev). New entries need a "kind".
+        Returns the stored entries.
+        """
+        with store_lock("practice_store"), self._lock:
+            self.refresh()
+            records = self._put_records(items)
+            if records:
+                self._append(records)
+            return [dict(r["entry"]) for r in records]
+
+    def replace_kind(self, kind: str, entries):
+        """
+        Make one kind's entries match entries, in one locked journal write.
+        Ids missing from entries are deleted and entries without an id are
+        added. An entry whose id was deleted meanwhile stays deleted.
+        """
+        with store_lock("practice_store"), self._lock:
+            self.refresh()
+            entries = list(entries)
+            keep_ids = {e.get("id") for e in entries if e.get("id")}
+
+            records = [
+                {"op": "del", "id": entry_id}
+                for _, entry_id in self._order.get(kind, [])
+                if entry_id not in keep_ids
+            ]
+            records += self._put_records(
+                (dict(e, kind=kind), None)
+                for e in entries
+                if not e.get("id") or e["id"] in self._entries
+            )
+            if records:
+                self._append(records)
+
+    def add_unique(self, entries):
+        """
+        Add new entries (each with a "kind"), skipping near-duplicates of
+        approved practices and of each other. Returns (added, duplicates).
+        """
+        with store_lock("practice_store"), self._lock:
+            batch = NearDuplicateIndex()
+            fresh = []
+            for entry in entries:
+                sig = minhash(entry.get("mantra_text") or entry.get("text") or "")
+                if sig and (self.find_near_duplicate(sig=sig) or batch.query(sig=sig)):
+                    continue
+                if sig:
+                    batch.add(len(fresh), sig=sig)
+                fresh.append((entry, None))
+
+            added = self.put_many(fresh)
+            return len(added), len(entries) - len(added)
+
+    def put(self, entry: dict, expected_rev: int = None) -> dict:
+        """Insert or update one entry (partial updates merge into it)."""
+        return self.put_many([(entry, expected_rev)])[0]
+
+    def add(self, kind: str, fields: dict) -> dict:
+        """Append a new practice of the given kind."""
+        entry = dict(fields)
+        entry.pop("id", None)
+        entry["kind"] = kind
+        return self.put(entry)
+
+    def delete(self, entry_id: str, expected_rev: int = None):
+        """Remove one entry. Deleting a missing entry is a no-op."""
+        with store_lock("practice_store"), self._lock:
+            self.refresh()
+            if entry_id not in self._entries:
+                return
+            self._check_rev(entry_id, expected_rev)
+            self._append([{"op": "del", "id": entry_id}])
+
+    def compact(self):
+        """Fold the journal into a new snapshot."""
+        with store_lock("practice_store"), self._lock:
+            self.refresh()
+            old_journal = self._journal_path()
+            generation = self._generation + 1
+
+            atomic_write_json(
+                self._snapshot_path,
+                {
+                    "generation": generation,
+                    "next_seq": self._next_seq,
+                    "entries": self._entries,
+                },
+            )
+            try:
+                os.remove(old_journal)
+            except FileNotFoundError:
+                pass
+            self.refresh()
+            save_approved_practices(self.export())
+
+    # -------------------------------------------------------
+    # READING
+    # -------------------------------------------------------
+
+    def get(self, entry_id: str):
+        with self._reading():
+            entry = self._entries.get(entry_id)
+            return dict(entry) if entry else None
+
+    def list(self, kind: str):
+        """Entries of one kind, in the order they were approved."""
+        with self._reading():
+            return [dict(self._entries[i]) for _, i in self._order.get(kind, [])]
+
+    def query(self, kind: str, deity=None, band=None, age_group=None, visible_to=None):
+        """
+        Filtered listing served from the indexes, in approval order.
+
+        deity / band / age_group match exactly (an unknown band raises
+        ValueError); visible_to ("child" or "adult") also includes entries
+        meant for all ages. Each returned
+        entry gets its 1-based "position" within the kind and its "band".
+        """
+        entries, _ = self.query_page(
+            kind, 0, None,
+            deity=deity, band=band, age_group=age_group, visible_to=visible_to,
+        )
+        return entries
+
+    def query_page(self, kind: str, offset: int, limit, **filters):
+        """
+        One page of query() results plus the total number of matches.
+        Only the entries on the page are copied out of the store.
+        """
+        deity = filters.get("deity")
+        band = filters.get("band")
+        age_group = filters.get("age_group")
+        visible_to = filters.get("visible_to")
+        if band is not None and band not in LEVEL_BANDS:
+            raise ValueError(f"unknown level band: {band!r}")
+
+        with self._reading():
+            order = self._order.get(kind, [])
+
+            if kind == "meditation":
+                # Bands are positional; the order list is the index.
+                start, stop = _MEDITATION_BAND_SLICES.get(band, (0, None))
+                rows = list(enumerate(order[start:stop], start=start + 1))
+            else:
+                ids = None
+                for field, value in (("deity", deity), ("band", band), ("age_group", age_group)):
+                    if value is None:
+                        continue
+                    matches = self._index.get((kind, field, value), set())
+                    ids = matches if ids is None else ids & matches
+
+                if visible_to in ("child", "adult"):
+                    audience = (
+                        self._index.get((kind, "age_group", visible_to), set())
+                        | self._index.get((kind, "age_group", "both"), set())
+                    )
+                    ids = audience if ids is None else ids & audience
+
+                if ids is None:
+                    rows = list(enumerate(order, start=1))
+                else:
+                    rows = []
+                    for entry_id in ids:
+                        item = (self._entries[entry_id].get("seq", 0), entry_id)
+                        rows.append((bisect.bisect_left(order, item) + 1, item))
+                    rows.sort()
+
+            total = len(rows)
+            stop = None if limit is None else offset + limit
+
+            out = []
+            for pos, (_, entry_id) in rows[offset:stop]:
+                entry = dict(self._entries[entry_id])
+                entry["position"] = pos
+                entry["band"] = (
+                    meditation_band(pos) if kind == "meditation"
+                    else mantra_band(practice_level(entry))
+                )
+                out.append(entry)
+            return out, total
+
+    def _sketches(self, entry: dict):
+        key = (entry["id"], entry.get("rev"))
+        sigs = self._sig_cache.get(key)
+        if sigs is None:
+            texts = {entry.get("mantra_text") or "", entry.get("text") or ""}
+            sigs = [sig for sig in (minhash(t) for t in texts if t.strip()) if sig]
+            self._sig_cache[key] = sigs
+        return sigs
+
+    def find_near_duplicate(self, text: str = None, sig=None):
+        """Id of an approved practice that is a near-duplicate of text, or None."""
+        with self._reading():
+            if self._dup_index_version != self._version:
+                index = NearDuplicateIndex()
+                live = set()
+                for entry in self._entries.values():
+                    live.add((entry["id"], entry.get("rev")))
+                    for s in self._sketches(entry):
+                        index.add(entry["id"], sig=s)
+                # Drop sketches of deleted / superseded revisions
+                self._sig_cache = {k: v for k, v in self._sig_cache.items() if k in live}
+                self._dup_index = index
+                self._dup_index_version = self._version
+            return self._dup_index.find(text, sig)
+
+    def media_refcount(self, path: str) -> int:
+        """Number of entries referencing a media file path."""
+        with self._reading():
+            return self._media_refs.get(os.path.normpath(path), 0)
+
+    def media_refcounts(self) -> collections.Counter:
+        """{normalised media path: number of entries referencing it}"""
+        with self._reading():
+            return collections.Counter(self._media_refs)
+
+    def count(self, kind: str) -> int:
+        with self._reading():
+            return len(self._order.get(kind, []))
+
+    def deities(self, kind: str = "mantra"):
+        """Deity names that have at least one practice, sorted case-insensitively."""
+        with self._reading():
+            names = [
+                value for (k, field, value) in self._index
+                if k == kind and field == "deity"
+            ]
+        return sorted(names, key=str.lower)
+
+    def export(self) -> dict:
+        """The legacy {"meditation": [...], "mantra": [...]} document."""
+        out = {}
+        for kind in PRACTICE_KINDS:
+            out[kind] = [
+                {k: v for k, v in e.items() if k not in _INTERNAL_FIELDS}
+                for e in self.list(kind)
+            ]
+        return out
+
+
+_store = None
+_store_guard = threading.Lock()
+
+
+def get_practice_store() -> PracticeStore:
+    """Process-wide PracticeStore instance."""
+    global _store
+    with _store_guard:
+        if _store is None:
+            _store = PracticeStore()
+        return _store
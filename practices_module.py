@@ -2,13 +2,10 @@ import os
 import json
 from typing import List, Optional, Dict, Any
 
-from database import (
-    load_approved_practices,
-    save_approved_practices,
-    load_practice_candidates,
-    save_practice_candidates,
-)
 from admin_tools import scan_practice_candidates_from_chroma
+from book_catalog import book_names
+from candidate_queue import get_candidate_queue, book_name
+from practice_store import get_practice_store
 
 
 # -----------------------------------------------------------
@@ -17,17 +14,16 @@ from admin_tools import scan_practice_candidates_from_chroma
 
 def get_practice_candidates() -> List[dict]:
     """
-    Loads practice candidates exactly like original app.py does.
+    Loads practice candidates (each with a stable "id").
     """
-    candidates = load_practice_candidates()
-    return candidates or []
+    return get_candidate_queue().all()
 
 
 def set_practice_candidates(items: List[dict]):
     """
     Persists updated practice candidates.
     """
-    save_practice_candidates(items)
+    get_candidate_queue().replace_all(items)
 
 
 # -----------------------------------------------------------
@@ -57,64 +53,32 @@ def scan_candidates(
 def filter_candidates_by_books(candidates: List[dict], selected_books: List[str]) -> List[dict]:
     """
     Original logic: only keep candidates whose filenames match selected_books.
+    Books no longer in the book catalog are ignored.
     """
     if not selected_books:
         return candidates
 
-    selected_set = set(selected_books)
-    out = []
-
-    for c in candidates:
-        src = c.get("source") or ""
-        fname = os.path.basename(src) if src else ""
-        if fname in selected_set:
-            out.append(c)
-
-    return out
+    selected_set = set(selected_books) & set(book_names())
+    return [c for c in candidates if book_name(c.get("source") or "") in selected_set]
 
 
 # -----------------------------------------------------------
 # APPROVAL LOGIC
 # -----------------------------------------------------------
 
-def approve_selected_candidates(approval_pairs: List[tuple]):
+def approve_selected_candidates(candidate_ids: List[str]):
     """
-    approval_pairs: list of (candidate_index, is_checked).
-    This function updates both approved_practices.json and practice_candidates.json
-    exactly like in your original app.py.
+    Approve candidates by stable id: marks them approved in the candidates
+    file and adds them to the practice store in one transaction.
+    Near-duplicates of approved practices are skipped.
+    Returns (added, duplicates).
     """
-    candidates = load_practice_candidates()
-    approved = load_approved_practices()
-
-    for idx, is_checked in approval_pairs:
-        if not is_checked:
-            continue
-        if idx < 0 or idx >= len(candidates):
-            continue
-
-        cand = candidates[idx]
-        if cand.get("approved"):
-            continue
-
-        kind = cand.get("kind")
-        if kind not in ("mantra", "meditation"):
-            continue
+    return get_candidate_queue().approve(candidate_ids)
 
-        cand["approved"] = True
 
-        # Append to approved list
-        items = approved.get(kind) or []
-        items.append(
-            {
-                "text": cand.get("text", ""),
-                "source": cand.get("source", ""),
-            }
-        )
-        approved[kind] = items
-
-    # Save updated lists
-    save_practice_candidates(candidates)
-    save_approved_practices(approved)
+def reject_selected_candidates(candidate_ids: List[str]) -> int:
+    """Reject candidates by stable id. Returns the number rejected."""
+    return get_candidate_queue().reject(candidate_ids)
 
 
 # -----------------------------------------------------------
@@ -125,48 +89,34 @@ def get_approved(kind: str) -> List[dict]:
     """
     Return approved practices for the given kind: "mantra" or "meditation".
     """
-    approved = load_approved_practices()
-    return approved.get(kind) or []
+    return get_practice_store().list(kind)
 
 
-def update_approved_list(kind: str, new_list: List[dict]):
-    """
-    Save back the updated approved list (for edits/deletions).
-    """
-    approved = load_approved_practices()
-    approved[kind] = new_list
-    save_approved_practices(approved)
-
-
-# -----------------------------------------------------------
-# LEVEL BANDING HELPERS (unchanged from original)
-# -----------------------------------------------------------
-
-def meditation_band(index: int) -> str:
+def query_approved(
+    kind: str,
+    deity: Optional[str] = None,
+    band: Optional[str] = None,
+    age_group: Optional[str] = None,
+    visible_to: Optional[str] = None,
+) -> List[dict]:
     """
-    Identical to your app.py:
-    index <= 3: Beginner
-    4–7: Intermediate
-    >7: Deeper
+    Indexed lookup of approved practices, e.g. for the user-facing side:
+    query_approved("mantra", deity="Shiva", visible_to="child").
+    band must be one of practice_store.LEVEL_BANDS (ValueError otherwise).
     """
-    if index <= 3:
-        return "Beginner"
-    elif index <= 7:
-        return "Intermediate"
-    else:
-        return "Deeper"
+    return get_practice_store().query(
+        kind,
+        deity=deity,
+        band=band,
+        age_group=age_group,
+        visible_to=visible_to,
+    )
 
 
-def mantra_band(level: int) -> str:
+def update_approved_list(kind: str, new_list: List[dict]):
     """
-    Same logic as app.py:
-    level <= 3: Beginner
-    <=7: Intermediate
-    else: Deeper
+    Save back the updated approved list (for edits/deletions).
+    Entries missing from new_list are deleted; entries without an id are added.
+    Applied as one locked batch, so a concurrent delete is never undone.
     """
-    if level <= 3:
-        return "Beginner"
-    elif level <= 7:
-        return "Intermediate"
-    else:
-        return "Deeper"
+    get_practice_store().replace_kind(kind, new_list)
@@ -0,0 +1,138 @@
+"""
+profiling.py
+
+On-demand cProfile traces of real Streamlit reruns, scoped to one session.
+
+- request_profiling(state, n) arms profiling for the next n reruns of that
+  session (admin toggle in the Operations view).
+- PROFILE_RERUNS / PROFILE_USER arm it from the environment for every new
+  session of that user ("*" for anyone), e.g. to profile a user's chat.
+- app.py wraps the routed page in profile_rerun(); each profiled rerun is
+  written to PROFILE_DIR/<profile id>-<n>.prof (loadable with pstats or
+  snakeviz), and top_functions() merges a profile's reruns for display.
+- Only the newest PROFILE_KEEP profiles are kept; older ones are deleted
+  whenever a profile is written.
+
+cProfile follows only the calling thread, i.e. the one session's script
+run. Only one profiler can be active per process on newer Pythons, so a
+rerun that starts while another session is being profiled is skipped and
+retried on the next one.
+"""
+
+import contextlib
+import cProfile
+import datetime
+import glob
+import os
+import pstats
+import uuid
+
+PROFILE_DIR = "profiles"
+PROFILE_RERUNS = int(os.environ.get("PROFILE_RERUNS", "0"))
+PROFILE_USER = os.environ.get("PROFILE_USER", "")
+PROFILE_KEEP = int(os.environ.get("PROFILE_KEEP", "20"))
+
+
+def request_profiling(state, reruns: int):
+    """Profile the next reruns script runs of this session."""
+    state["profile_remaining"] = max(0, int(reruns))
+    stamp = datetime.datetime.now().strftime("%Y%m%d-%H%M%S")
+    state["profile_id"] = f"{stamp}_{uuid.uuid4().hex[:4]}"
+    state["profile_done"] = 0
+
+
+def enable_from_env(state, username: str):
+    """Arm profiling for this session (once) if PROFILE_RERUNS / PROFILE_USER match."""
+    if not PROFILE_RERUNS or state.get("profile_env_checked"):
+        return
+    if PROFILE_USER not in ("*", username):
+        return
+    state["profile_env_checked"] = True
+    request_profiling(state, PROFILE_RERUNS)
+
+
+def profiling_active(state) -> bool:
+    return state.get("profile_remaining", 0) > 0
+
+
+@contextlib.contextmanager
+def profile_rerun(state, label: str = ""):
+    """Profile the enclosed block if this session has profiling armed."""
+    if not profiling_active(state):
+        yield
+        return
+
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+    except ValueError:
+        # Another session's profile is running in this process.
+        yield
+        return
+
+    try:
+        yield
+    finally:
+        profiler.disable()
+        state["profile_done"] = state.get("profile_done", 0) + 1
+        state["profile_remaining"] -= 1
+        name = f"{state['profile_id']}-{state['profile_done']}"
+        if label:
+            name += f"-{label}"
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        profiler.dump_stats(os.path.join(PROFILE_DIR, f"{name}.prof"))
+        prune_profiles()
+
+
+def _profile_groups() -> list:
+    """Saved profiles grouped by id, newest first."""
+    groups = {}
+    for path in glob.glob(os.path.join(PROFILE_DIR, "*.prof")):
+        pid = "-".join(os.path.basename(path).split("-")[:2])
+        group = groups.setdefault(pid, {"id": pid, "files": [], "saved": 0.0})
+        group["files"].append(path)
+        with contextlib.suppress(OSError):
+            group["saved"] = max(group["saved"], os.path.getmtime(path))
+    return sorted(groups.values(), key=lambda g: g["saved"], reverse=True)
+
+
+def prune_profiles(keep: int = None):
+    """Delete all but the newest keep (PROFILE_KEEP) profiles."""
+    keep = PROFILE_KEEP if keep is None else keep
+    for group in _profile_groups()[max(0, keep):]:
+        for path in group["files"]:
+            with contextlib.suppress(OSError):
+                os.remove(path)
+
+
+def list_profiles() -> list:
+    """[{"id", "reruns", "saved"}] newest first."""
+    out = []
+    for group in _profile_groups():
+        out.append({
+            "id": group["id"],
+            "reruns": len(group["files"]),
+            "saved": datetime.datetime.fromtimestamp(group["saved"]).isoformat(timespec="seconds"),
+        })
+    return out
+
+
+def top_functions(profile_id: str, sort: str = "cumulative", limit: int = 25) -> list:
+    """Hottest functions across all reruns of one profile."""
+    files = sorted(glob.glob(os.path.join(PROFILE_DIR, f"{profile_id}-*.prof")))
+    if not files:
+        return []
+
+    stats = pstats.Stats(*files)
+    key = {"cumulative": 3, "tottime": 2, "calls": 1}[sort]
+    rows = sorted(stats.stats.items(), key=lambda item: item[1][key], reverse=True)
+
+    out = []
+    for (filename, line, func), (_, ncalls, tottime, cumtime, _) in rows[:limit]:
+        out.append({
+            "function": f"{func} ({os.path.basename(filename)}:{line})",
+            "calls": ncalls,
+            "own s": round(tottime, 4),
+            "total s": round(cumtime, 4),
+        })
+    return out
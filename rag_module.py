@@ -1,16 +1,54 @@
 # rag_module.py
+#
+# Thin front end over the RAG backend (the `rag` module by default).
+# - configure_backend() swaps in any object with retrieve_passages,
+#   answer_question and generate_styled_image (benchmarks, tests).
+# - Sources of the last answer are kept per thread. Streamlit runs every
+#   rerun on a fresh script thread, so they only live for one script run:
+#   call get_sources() in the same rerun as get_answer(). Concurrent
+#   sessions never see each other's passages.
 
-from rag import retrieve_passages, answer_question, generate_styled_image
+import threading
 
-_last_sources = []
+from metrics import span, add_gauge
+
+_backend = None
+_local = threading.local()
+
+def configure_backend(backend=None):
+    """Use backend instead of `rag` (None restores it)."""
+    global _backend
+    _backend = backend
+
+def _get_backend():
+    # Imported lazily: loading `rag` loads the vector store and model clients.
+    global _backend
+    if _backend is None:
+        import rag
+        _backend = rag
+    return _backend
+
+def retrieve_passages(question: str, age_group: str):
+    with span("rag.retrieve_passages"):
+        return _get_backend().retrieve_passages(question, age_group)
+
+def answer_question(question: str, passages, age_group: str) -> str:
+    # llm.in_flight: answers currently waiting on the LLM.
+    add_gauge("llm.in_flight", 1)
+    try:
+        with span("rag.answer_question"):
+            return _get_backend().answer_question(question, passages, age_group)
+    finally:
+        add_gauge("llm.in_flight", -1)
 
 def get_answer(question: str, age_group: str) -> str:
-    global _last_sources
-    _last_sources = retrieve_passages(question, age_group)
-    return answer_question(question, _last_sources, age_group)
+    sources = retrieve_passages(question, age_group)
+    _local.sources = sources
+    return answer_question(question, sources, age_group)
 
 def get_sources():
-    return _last_sources
+    return getattr(_local, "sources", [])
 
 def generate_image(prompt: str):
-    return generate_styled_image(prompt)
+    with span("rag.generate_image"):
+        return _get_backend().generate_styled_image(prompt)
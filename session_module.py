@@ -1,7 +1,15 @@
 import datetime
 import streamlit as st
-from database import load_sessions, save_sessions, SESSION_TTL_MINUTES
-from auth import load_users
+from database import SESSION_TTL_MINUTES
+from session_store import (
+    age_group_for,
+    end_session,
+    load_session_records,
+    load_user_records,
+    lookup_session,
+)
+from metrics import timed
+from chat_history import clear_history
 
 def restore_session():
     """Restore login if user visits with ?session=token."""
@@ -15,30 +23,15 @@ def restore_session():
     if not token_list:
         return
 
-    token = token_list[0]
-    sessions = load_sessions()
-    sess = sessions.get(token)
+    _restore(token_list[0])
 
+@timed("session.restore")
+def _restore(token: str):
+    """The lookup itself; only this is timed, not the no-op reruns."""
+    sess = lookup_session(token)  # None if unknown or expired (expired ones are removed)
     if not sess:
         return
 
-    created_str = sess.get("created_at")
-    expired = False
-
-    try:
-        created_dt = datetime.datetime.fromisoformat(created_str)
-        if datetime.datetime.now() - created_dt > datetime.timedelta(
-            minutes=SESSION_TTL_MINUTES
-        ):
-            expired = True
-    except Exception:
-        expired = True
-
-    if expired:
-        sessions.pop(token, None)
-        save_sessions(sessions)
-        return
-
     role = sess.get("role")
     username = sess.get("username")
 
@@ -52,13 +45,12 @@ def restore_session():
         })
         return
 
-    users = load_users()
+    users = load_user_records()
     profile = users.get(username)
     if not profile:
         return
 
-    year = profile.get("year_of_birth")
-    age_group = "adult" if (datetime.datetime.now().year - year) >= 22 else "child"
+    age_group = age_group_for(profile)
 
     st.session_state.update({
         "role": "user",
@@ -75,7 +67,7 @@ def show_session_expiry_warning():
         return
 
     try:
-        sess = load_sessions().get(token)
+        sess = load_session_records().get(token)
         if not sess:
             return
         created_str = sess.get("created_at")
@@ -92,9 +84,8 @@ def show_session_expiry_warning():
 def logout_user():
     token = st.session_state.get("session_token")
     if token:
-        sessions = load_sessions()
-        sessions.pop(token, None)
-        save_sessions(sessions)
+        end_session(token)
 
+    clear_history(st.session_state)
     st.session_state.clear()
     st.session_state["role"] = "guest"
@@ -0,0 +1,135 @@
+"""
+session_store.py
+
+Streamlit-free account and session operations, shared by the login UI
+(auth_module, session_module) and benchmarks/session_load.py.
+
+Storage stays in auth (users) and database (sessions). Every call to
+their load / save functions made here holds that file's store lock, so
+concurrent workers cannot lose each other's records and no reader sees
+a file while it is being rewritten. Read users and sessions through
+load_user_records / load_session_records rather than the raw loaders.
+"""
+
+import datetime
+import secrets
+
+from auth import load_users, save_users
+from database import load_sessions, save_sessions, SESSION_TTL_MINUTES
+from json_store import store_lock
+from password_pool import PasswordPoolBusy, hash_password, check_password, needs_rehash
+
+
+def load_user_records() -> dict:
+    """All user profiles by username."""
+    with store_lock("users"):
+        return load_users() or {}
+
+
+def load_session_records() -> dict:
+    """All session records by token."""
+    with store_lock("sessions"):
+        return load_sessions() or {}
+
+
+# -----------------------------------------------------------
+# ACCOUNTS
+# -----------------------------------------------------------
+
+def age_group_for(profile: dict):
+    """"adult" / "child" from the profile's birth year (None if unknown)."""
+    year = profile.get("year_of_birth")
+    if not isinstance(year, int):
+        return None
+    return "adult" if datetime.datetime.now().year - year >= 22 else "child"
+
+
+def register_user(username: str, profile: dict) -> bool:
+    """Add a user; False if the name is taken (checked under the lock)."""
+    with store_lock("users"):
+        users = load_user_records()
+        if username in users:
+            return False
+        users[username] = profile
+        save_users(users)
+    return True
+
+
+def authenticate_user(username: str, password: str):
+    """
+    Check a password. Returns (status, profile) with status "ok",
+    "unknown_user", "bad_password" or "busy" (the password pool timed out).
+    Legacy hashes and old work factors are upgraded on success.
+    """
+    profile = load_user_records().get(username)
+    if not profile:
+        return "unknown_user", None
+
+    stored_pw = profile.get("password", "")
+    try:
+        if not check_password(password, stored_pw):
+            return "bad_password", None
+    except PasswordPoolBusy:
+        return "busy", None
+
+    if needs_rehash(stored_pw):
+        try:
+            new_hash = hash_password(password)
+        except PasswordPoolBusy:
+            return "ok", profile  # upgrade on a later sign-in
+        with store_lock("users"):
+            users = load_user_records()
+            if username in users:
+                users[username]["password"] = new_hash
+                save_users(users)
+                profile = users[username]
+
+    return "ok", profile
+
+
+# -----------------------------------------------------------
+# SESSIONS
+# -----------------------------------------------------------
+
+def create_session_record(role: str, username: str) -> str:
+    """Create a session token and save it to the session store."""
+    token = secrets.token_urlsafe(16)
+
+    with store_lock("sessions"):
+        sessions = load_session_records()
+        sessions[token] = {
+            "role": role,
+            "username": username,
+            "created_at": datetime.datetime.now().isoformat(),
+        }
+        save_sessions(sessions)
+
+    return token
+
+
+def session_expired(sess: dict) -> bool:
+    try:
+        created_dt = datetime.datetime.fromisoformat(sess.get("created_at"))
+    except (TypeError, ValueError):
+        return True
+    return datetime.datetime.now() - created_dt > datetime.timedelta(minutes=SESSION_TTL_MINUTES)
+
+
+def lookup_session(token: str):
+    """The session record for token, or None. Expired records are removed."""
+    sess = load_session_records().get(token)
+    if not sess:
+        return None
+
+    if session_expired(sess):
+        end_session(token)
+        return None
+
+    return sess
+
+
+def end_session(token: str):
+    with store_lock("sessions"):
+        sessions = load_session_records()
+        if sessions.pop(token, None) is not None:
+            save_sessions(sessions)
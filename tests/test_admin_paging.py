@@ -0,0 +1,55 @@
+import types
+
+import pytest
+
+import admin_module
+import practice_store
+from practice_store import PracticeStore
+
+
+@pytest.fixture
+def store(workdir, monkeypatch):
+    monkeypatch.setattr(admin_module, "st", types.SimpleNamespace(session_state={}))
+    monkeypatch.setattr(practice_store, "load_approved_practices", lambda: {})
+    monkeypatch.setattr(practice_store, "save_approved_practices", lambda doc: None)
+    store = PracticeStore()
+    for i in range(5):
+        store.add("meditation", {"text": f"m{i}"})
+    return store
+
+
+def _fetch(store, filters=None):
+    filters = filters or {}
+    return admin_module._fetch_page(
+        "med_page", filters, 2,
+        lambda offset, limit: store.query_page("meditation", offset, limit, **filters),
+    )
+
+
+def test_page_past_the_end_is_clamped_to_the_last_page(store):
+    _fetch(store)
+    admin_module.st.session_state["med_page"] = 2  # viewing m4
+    for entry in store.list("meditation")[2:]:
+        store.delete(entry["id"])
+
+    items, total = _fetch(store)
+    assert total == 2
+    assert [e["text"] for e in items] == ["m0", "m1"]
+    assert admin_module.st.session_state["med_page"] == 0
+
+
+def test_everything_deleted_gives_an_empty_first_page(store):
+    _fetch(store)
+    admin_module.st.session_state["med_page"] = 1
+    for entry in store.list("meditation"):
+        store.delete(entry["id"])
+
+    assert _fetch(store) == ([], 0)
+    assert admin_module.st.session_state["med_page"] == 0
+
+
+def test_changing_filters_goes_back_to_page_one(store):
+    _fetch(store)
+    admin_module.st.session_state["med_page"] = 2
+    items, _ = _fetch(store, {"band": "Beginner"})
+    assert [e["text"] for e in items] == ["m0", "m1"]
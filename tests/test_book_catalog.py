@@ -0,0 +1,57 @@
+import os
+import time
+
+import pytest
+
+import book_catalog
+from book_catalog import (
+    book_catalog as catalog,
+    book_hashes,
+    book_watermark,
+    books_needing_reindex,
+    record_reindex,
+)
+
+
+@pytest.fixture
+def books(workdir, monkeypatch):
+    monkeypatch.setattr(book_catalog, "load_unreadable", lambda: {})
+    book_catalog._cache.clear()
+    os.makedirs("books")
+    for name, body in (("gita.txt", b"chapter one"), ("vedas.txt", b"hymns")):
+        with open(os.path.join("books", name), "wb") as f:
+            f.write(body)
+    return workdir
+
+
+def test_catalog_lists_books_with_hashes(books):
+    data = catalog()
+    assert sorted(data) == ["gita.txt", "vedas.txt"]
+    assert data["gita.txt"]["size"] == len(b"chapter one")
+    assert set(book_hashes().values()) == {"gita.txt", "vedas.txt"}
+
+
+def test_returned_catalog_is_a_copy(books):
+    catalog()["gita.txt"]["size"] = -1
+    catalog().pop("vedas.txt")
+    data = catalog()
+    assert data["gita.txt"]["size"] == len(b"chapter one") and "vedas.txt" in data
+
+
+def test_reindex_records_marks_and_chunk_counts(books):
+    marks = {name: book_watermark(name) for name in catalog()}
+    assert sorted(books_needing_reindex()) == ["gita.txt", "vedas.txt"]
+
+    record_reindex(marks, time.time(), ok=True, chunk_counts={"gita.txt": 12})
+    data = catalog()
+    assert data["gita.txt"]["chunks"] == 12 and data["vedas.txt"]["chunks"] == 0
+    assert data["gita.txt"]["last_indexed"]
+    assert books_needing_reindex() == []
+
+
+def test_new_book_invalidates_cache(books):
+    catalog()
+    time.sleep(0.01)
+    with open(os.path.join("books", "puranas.txt"), "wb") as f:
+        f.write(b"stories")
+    assert "puranas.txt" in catalog()
@@ -0,0 +1,43 @@
+import io
+import os
+
+import pytest
+
+import book_catalog
+from book_uploads import save_uploaded_book
+
+
+class _Upload(io.BytesIO):
+    def __init__(self, name, data):
+        super().__init__(data)
+        self.name = name
+
+
+@pytest.fixture
+def books(workdir, monkeypatch):
+    monkeypatch.setattr(book_catalog, "load_unreadable", lambda: {})
+    book_catalog._cache.clear()
+    os.makedirs("books")
+    with open(os.path.join("books", "gita.txt"), "wb") as f:
+        f.write(b"chapter one")
+    return workdir
+
+
+def _files():
+    return sorted(os.listdir("books"))
+
+
+def test_identical_upload_is_skipped_whatever_its_name(books):
+    assert save_uploaded_book(_Upload("copy of gita.txt", b"chapter one")) == ("duplicate", "gita.txt")
+    assert _files() == ["gita.txt"]  # no temp file left behind
+
+
+def test_new_content_under_a_taken_name_is_renamed(books):
+    assert save_uploaded_book(_Upload("gita.txt", b"chapter two")) == ("saved", "gita_1.txt")
+    assert _files() == ["gita.txt", "gita_1.txt"]
+
+
+def test_duplicate_within_one_batch_is_skipped(books):
+    assert save_uploaded_book(_Upload("vedas.txt", b"hymns")) == ("saved", "vedas.txt")
+    assert save_uploaded_book(_Upload("vedas (1).txt", b"hymns")) == ("duplicate", "vedas.txt")
+    assert _files() == ["gita.txt", "vedas.txt"]
@@ -0,0 +1,77 @@
+import json
+import os
+
+import pytest
+
+import candidate_queue
+from candidate_queue import CandidateQueue, candidate_id
+
+
+@pytest.fixture
+def queue(workdir, monkeypatch):
+    path = candidate_queue.CANDIDATES_FILE
+
+    def load():
+        try:
+            with open(path) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return []
+
+    def save(items):
+        with open(path, "w") as f:
+            json.dump(items, f)
+
+    monkeypatch.setattr(candidate_queue, "load_practice_candidates", load)
+    monkeypatch.setattr(candidate_queue, "save_practice_candidates", save)
+    return CandidateQueue()
+
+
+def _cand(book, kind, text):
+    return {"source": f"books/{book}", "kind": kind, "text": text}
+
+
+def test_ids_are_stable_and_filtered(queue):
+    cands = [
+        _cand("gita.pdf", "mantra", "Om namo bhagavate vasudevaya"),
+        _cand("gita.pdf", "meditation", "Sit still and watch the breath come and go"),
+        _cand("upanishad.pdf", "mantra", "Asato ma sad gamaya, tamaso ma jyotir gamaya"),
+    ]
+    assert queue.merge([dict(c) for c in cands]) == (3, 0)
+
+    expected = [candidate_id(c) for c in cands]
+    assert queue.ids(status=None) == expected
+    assert queue.ids(books=["gita.pdf"]) == expected[:2]
+    assert queue.ids(books=["gita.pdf", "upanishad.pdf"], kind="mantra") == [expected[0], expected[2]]
+
+    page, total = queue.page(1, 1, books=["gita.pdf"])
+    assert total == 2 and page[0]["id"] == expected[1]
+
+
+def test_ids_returns_a_copy(queue):
+    queue.merge([_cand("gita.pdf", "mantra", "Om namo narayanaya")])
+    queue.ids().clear()
+    assert len(queue.ids()) == 1
+
+
+def test_rescan_skips_known_and_near_duplicate_candidates(queue):
+    text = "Om namah shivaya, the five syllable mantra of Shiva"
+    queue.merge([_cand("a.pdf", "mantra", text)])
+    added, dups = queue.merge([
+        _cand("a.pdf", "mantra", text),
+        _cand("b.pdf", "mantra", text + "."),
+    ])
+    assert (added, dups) == (0, 1)
+    assert queue.ids(status="duplicate") and len(queue.ids()) == 1
+
+
+def test_reject_and_external_writes_refresh_the_index(queue):
+    queue.merge([_cand("a.pdf", "mantra", "Om shanti shanti shanti")])
+    (cid,) = queue.ids()
+    assert queue.reject([cid]) == 1
+    assert queue.ids() == [] and queue.ids(status="rejected") == [cid]
+
+    # A writer that bypasses the queue (no store version bump).
+    with open(candidate_queue.CANDIDATES_FILE, "w") as f:
+        json.dump([_cand("c.pdf", "meditation", "Rest attention on the heart space")], f)
+    assert [c["source"] for c in queue.all()] == ["books/c.pdf"]
@@ -0,0 +1,65 @@
+import os
+
+import pytest
+
+import chat_history
+from chat_history import (
+    append_message,
+    clear_history,
+    load_spilled,
+    make_message,
+    message_sources,
+    recent_messages,
+    total_messages,
+)
+
+
+@pytest.fixture(autouse=True)
+def small_window(workdir, monkeypatch):
+    monkeypatch.setattr(chat_history, "CHAT_MEMORY_TURNS", 3)
+
+
+def _ask(state, n):
+    for i in range(n):
+        append_message(state, make_message(f"q{i}", f"a{i}", [{"source": "gita.pdf", "text": f"p{i % 2}"}]))
+
+
+def test_old_turns_spill_to_disk_in_order():
+    state = {}
+    _ask(state, 7)
+
+    assert [m["question"] for m in state["messages"]] == ["q4", "q5", "q6"]
+    assert total_messages(state) == 7
+    assert [m["question"] for m in recent_messages(state, 5)] == ["q2", "q3", "q4", "q5", "q6"]
+    assert [m["question"] for m in load_spilled(state, 0, 4)] == ["q0", "q1", "q2", "q3"]
+
+
+def test_spilled_messages_keep_passage_ids_only():
+    state = {}
+    _ask(state, 5)
+
+    spilled = load_spilled(state, 0, 2)
+    assert all("sources" not in m and len(m["passage_ids"]) == 1 for m in spilled)
+    assert message_sources(spilled[1]) == [{"source": "gita.pdf", "text": "p1"}]
+
+
+def test_sessions_sharing_a_login_keep_separate_histories():
+    tab_a = {"session_token": "tok"}
+    tab_b = {"session_token": "tok"}
+    _ask(tab_a, 5)
+    _ask(tab_b, 4)
+
+    assert [m["question"] for m in recent_messages(tab_b, 4)] == ["q0", "q1", "q2", "q3"]
+
+    clear_history(tab_b)
+    assert total_messages(tab_b) == 0
+    assert [m["question"] for m in recent_messages(tab_a, 5)] == ["q0", "q1", "q2", "q3", "q4"]
+
+
+def test_clear_history_starts_a_new_spill_file():
+    state = {}
+    _ask(state, 5)
+    clear_history(state)
+    _ask(state, 4)
+    assert [m["question"] for m in recent_messages(state, 4)] == ["q0", "q1", "q2", "q3"]
+    assert len(os.listdir(chat_history.CHAT_HISTORY_DIR)) == 1
@@ -0,0 +1,118 @@
+import os
+
+import pytest
+
+import favourites_store
+from favourites_store import (
+    add_favourite,
+    compact_favourites,
+    delete_favourite,
+    load_favourites_page,
+)
+
+LEGACY = [
+    {"question": "legacy untagged 1"},
+    {"question": "legacy for bob", "username": "bob"},
+    {"question": "legacy for alice", "username": "alice"},
+    {"question": "legacy untagged 2"},
+]
+
+
+@pytest.fixture(autouse=True)
+def legacy(workdir, monkeypatch):
+    calls = []
+
+    def load():
+        calls.append(1)
+        return [dict(e) for e in LEGACY]
+
+    monkeypatch.setattr(favourites_store, "load_favourites", load)
+    return calls
+
+
+def _all_pages(user, limit):
+    pages, cursor = [], None
+    while True:
+        page, cursor = load_favourites_page(user, cursor, limit)
+        pages.append([e["question"] for e in page])
+        if cursor is None:
+            return pages
+
+
+def test_pages_run_newest_first_into_legacy_entries(legacy):
+    for i in range(3):
+        add_favourite("alice", {"question": f"own {i}"})
+
+    assert _all_pages("alice", 2) == [
+        ["own 2", "own 1"],
+        ["own 0", "legacy untagged 2"],
+        ["legacy for alice", "legacy untagged 1"],
+    ]
+    assert _all_pages("bob", 10) == [["legacy untagged 2", "legacy for bob", "legacy untagged 1"]]
+    assert len(legacy) == 1  # migrated once, shared by every user
+    assert not os.path.exists(favourites_store._user_path("bob"))
+
+
+def test_last_full_page_has_no_next_cursor(legacy, monkeypatch):
+    monkeypatch.setattr(favourites_store, "load_favourites", lambda: [])
+    add_favourite("carol", {"question": "a"})
+    add_favourite("carol", {"question": "b"})
+    page, cursor = load_favourites_page("carol", None, 2)
+    assert [e["question"] for e in page] == ["b", "a"] and cursor is None
+
+
+def test_deletes_hide_entries_per_user(legacy):
+    own = add_favourite("alice", {"question": "own"})
+    page, _ = load_favourites_page("alice", None, 10)
+    shared = next(e["id"] for e in page if e["question"] == "legacy untagged 1")
+
+    delete_favourite("alice", own)
+    delete_favourite("alice", shared)
+
+    assert [e["question"] for e in load_favourites_page("alice", None, 10)[0]] == [
+        "legacy untagged 2", "legacy for alice",
+    ]
+    assert "legacy untagged 1" in [e["question"] for e in load_favourites_page("bob", None, 10)[0]]
+
+
+def test_compaction_drops_deleted_lines_and_tombstones(legacy, monkeypatch):
+    monkeypatch.setattr(favourites_store, "FAVOURITES_COMPACT_AFTER", 3)
+    ids = [add_favourite("alice", {"question": f"own {i}"}) for i in range(4)]
+    legacy_id = load_favourites_page("alice", None, 10)[0][-1]["id"]
+
+    delete_favourite("alice", ids[0])
+    delete_favourite("alice", legacy_id)
+    delete_favourite("alice", ids[2])  # third tombstone triggers compaction
+
+    with open(favourites_store._user_path("alice"), "rb") as f:
+        assert len(f.read().splitlines()) == 2
+    with open(favourites_store._tombstone_path("alice")) as f:
+        assert f.read().split() == [legacy_id]
+    assert [e["question"] for e in load_favourites_page("alice", None, 10)[0]] == [
+        "own 3", "own 1", "legacy untagged 2", "legacy for alice",
+    ]
+
+    compact_favourites("alice")  # idempotent
+    assert len(load_favourites_page("alice", None, 10)[0]) == 4
+
+
+def test_torn_trailing_write_is_skipped(legacy, monkeypatch):
+    monkeypatch.setattr(favourites_store, "load_favourites", lambda: [])
+    add_favourite("dave", {"question": "kept"})
+    with open(favourites_store._user_path("dave"), "ab") as f:
+        f.write(b'{"id": "x", "quest')
+    assert [e["question"] for e in load_favourites_page("dave")[0]] == ["kept"]
+
+
+def test_cursor_from_before_compaction_restarts_at_newest_page(legacy, monkeypatch):
+    monkeypatch.setattr(favourites_store, "load_favourites", lambda: [])
+    ids = [add_favourite("dana", {"question": f"q{i}"}) for i in range(6)]
+    version = favourites_store.favourites_log_version("dana")
+    _, cursor = load_favourites_page("dana", None, 2)
+
+    delete_favourite("dana", ids[5])
+    compact_favourites("dana")
+    assert favourites_store.favourites_log_version("dana") != version
+
+    page, _ = load_favourites_page("dana", cursor, 2)
+    assert [e["question"] for e in page] == ["q4", "q3"]
@@ -0,0 +1,83 @@
+import json
+import os
+
+import feedback_module
+from feedback_module import (
+    append_feedback,
+    compact_feedback_log,
+    delete_feedback,
+    feedback_log_version,
+    load_feedback,
+    load_feedback_page,
+)
+
+
+def _messages(entries):
+    return [e["message"] for e in entries]
+
+
+def test_pages_walk_the_log_in_order(workdir):
+    for i in range(5):
+        append_feedback({"user": "u", "message": f"m{i}"})
+
+    page, offset = load_feedback_page(0, 2)
+    assert _messages(page) == ["m0", "m1"]
+    page, offset = load_feedback_page(offset, 2)
+    assert _messages(page) == ["m2", "m3"]
+    page, offset = load_feedback_page(offset, 2)
+    assert _messages(page) == ["m4"]
+    assert offset is None
+
+
+def test_deleted_entries_are_hidden_then_compacted(workdir, monkeypatch):
+    monkeypatch.setattr(feedback_module, "FEEDBACK_COMPACT_AFTER", 2)
+    ids = [append_feedback({"message": f"m{i}"}) for i in range(4)]
+    version = feedback_log_version()
+
+    delete_feedback(ids[1])
+    assert _messages(load_feedback()) == ["m0", "m2", "m3"]
+    assert feedback_log_version() == version
+
+    delete_feedback(ids[2])  # second tombstone triggers compaction
+    assert _messages(load_feedback()) == ["m0", "m3"]
+    assert not os.path.exists(feedback_module.FEEDBACK_TOMBSTONES)
+    assert feedback_log_version() != version
+
+
+def test_compaction_changes_version_even_if_inode_is_reused(workdir):
+    append_feedback({"message": "a"})
+    before = feedback_log_version()
+    compact_feedback_log()
+    compact_feedback_log()
+    assert feedback_log_version() == before + 2
+
+
+def _write_legacy(items):
+    with open(feedback_module.FEEDBACK_FILE, "w", encoding="utf-8") as f:
+        json.dump(items, f)
+
+
+def test_legacy_file_is_imported_on_every_call(workdir):
+    _write_legacy([{"user": "a", "message": "old"}])
+    append_feedback({"message": "new"})
+    assert _messages(load_feedback()) == ["old", "new"]
+
+    # database.save_feedback keeps writing the legacy file after migration.
+    _write_legacy([{"user": "b", "message": "later"}])
+    assert _messages(load_feedback()) == ["old", "new", "later"]
+    assert not os.path.exists(feedback_module.FEEDBACK_FILE)
+
+
+def test_legacy_entry_re_saved_is_not_duplicated(workdir):
+    item = {"user": "a", "message": "once", "date": "2024-01-01T00:00:00"}
+    _write_legacy([item])
+    load_feedback()
+    _write_legacy([item, {"user": "a", "message": "twice"}])
+    assert _messages(load_feedback()) == ["once", "twice"]
+
+
+def test_torn_legacy_file_is_left_for_the_next_call(workdir):
+    with open(feedback_module.FEEDBACK_FILE, "w") as f:
+        f.write('[{"message": "par')
+    assert load_feedback() == []
+    assert os.path.exists(feedback_module.FEEDBACK_FILE)
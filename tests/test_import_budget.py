@@ -0,0 +1,32 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from benchmarks.import_budget import ADMIN_ONLY_MODULES, user_path_imports
+from conftest import ROOT
+
+_CHILD = """
+import json, sys
+for name in json.loads(sys.argv[1]):
+    __import__(name)
+print(json.dumps(sorted(sys.modules)))
+"""
+
+
+def test_user_path_loads_no_admin_module():
+    mods = user_path_imports(os.path.join(ROOT, "app.py"))
+    result = subprocess.run(
+        [sys.executable, "-c", _CHILD, json.dumps(mods)],
+        capture_output=True,
+        text=True,
+        cwd=ROOT,
+    )
+    if result.returncode != 0 and "ModuleNotFoundError" in result.stderr:
+        pytest.skip(f"app dependencies not installed: {result.stderr.strip().splitlines()[-1]}")
+    assert result.returncode == 0, result.stderr
+
+    loaded = set(json.loads(result.stdout))
+    assert sorted(m for m in ADMIN_ONLY_MODULES if m in loaded) == []
@@ -0,0 +1,83 @@
+import json
+import multiprocessing
+import os
+import threading
+
+import pytest
+
+import json_store
+from json_store import (
+    atomic_write_json,
+    bump_store_version,
+    read_json,
+    store_lock,
+    store_version,
+    update_json,
+)
+
+
+def test_atomic_write_round_trip(workdir):
+    atomic_write_json("data/store.json", {"a": [1, 2], "b": "ü"})
+    assert read_json("data/store.json", None) == {"a": [1, 2], "b": "ü"}
+    assert os.listdir("data") == ["store.json"]
+
+
+def test_read_json_default_on_missing_or_torn_file(workdir):
+    assert read_json("missing.json", {"x": 1}) == {"x": 1}
+    with open("torn.json", "w") as f:
+        f.write('{"a": [1, 2')
+    assert read_json("torn.json", []) == []
+
+
+def test_failed_atomic_write_keeps_old_file(workdir):
+    atomic_write_json("store.json", {"ok": True})
+    with pytest.raises(TypeError):
+        atomic_write_json("store.json", {"bad": object()})
+    assert read_json("store.json", None) == {"ok": True}
+    assert os.listdir(".") == ["store.json"]
+
+
+def test_store_lock_is_reentrant(workdir):
+    with store_lock("users"):
+        with store_lock("users"):
+            pass
+    assert os.path.exists(os.path.join(json_store.LOCK_DIR, "users.lock"))
+
+
+def test_update_json_threads_do_not_lose_updates(workdir):
+    def bump():
+        for _ in range(50):
+            update_json("counter.json", lambda d: d.update(n=d.get("n", 0) + 1), {})
+
+    threads = [threading.Thread(target=bump) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert read_json("counter.json", {}) == {"n": 200}
+
+
+def _bump_in_process(path, times):
+    os.chdir(path)
+    for _ in range(times):
+        update_json("counter.json", lambda d: d.update(n=d.get("n", 0) + 1), {})
+
+
+def test_update_json_processes_do_not_lose_updates(workdir):
+    ctx = multiprocessing.get_context("spawn")
+    procs = [ctx.Process(target=_bump_in_process, args=(str(workdir), 25)) for _ in range(3)]
+    for p in procs:
+        p.start()
+    for p in procs:
+        p.join()
+        assert p.exitcode == 0
+    with open("counter.json") as f:
+        assert json.load(f) == {"n": 75}
+
+
+def test_store_version_counts_bumps(workdir):
+    assert store_version("books") == 0
+    with store_lock("books"):
+        bump_store_version("books")
+        bump_store_version("books")
+    assert store_version("books") == 2
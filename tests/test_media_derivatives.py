@@ -0,0 +1,57 @@
+import os
+
+import pytest
+
+import media_derivatives
+from media_derivatives import ensure_derivatives, failed_marker, generate_derivatives
+
+
+class _BrokenImage:
+    """Pillow stand-in that cannot decode anything."""
+
+    @staticmethod
+    def open(path):
+        raise OSError("cannot identify image file")
+
+
+@pytest.fixture
+def corrupt_image(workdir, monkeypatch):
+    monkeypatch.setattr(media_derivatives, "Image", _BrokenImage)
+    scheduled = []
+    monkeypatch.setattr(
+        media_derivatives, "schedule_derivatives",
+        lambda *paths, retry=False: scheduled.append((paths, retry)),
+    )
+    os.makedirs("guidance_media")
+    path = os.path.join("guidance_media", "0123abcd.png")
+    with open(path, "wb") as f:
+        f.write(b"not a png")
+    return path, scheduled
+
+
+def test_failed_variants_are_marked_and_not_requeued(corrupt_image):
+    path, scheduled = corrupt_image
+    assert ensure_derivatives(path)
+    assert len(scheduled) == 1
+
+    assert generate_derivatives(path) == []
+    assert os.path.exists(failed_marker(path, "thumb"))
+    assert os.path.basename(failed_marker(path, "thumb")).startswith("0123abcd.")
+
+    assert not ensure_derivatives(path)
+    assert len(scheduled) == 1
+
+
+def test_retry_ignores_failure_markers(corrupt_image):
+    path, scheduled = corrupt_image
+    generate_derivatives(path)
+
+    assert ensure_derivatives(path, retry=True)
+    assert scheduled[-1] == ((path,), True)
+
+
+def test_remove_derivatives_clears_markers(corrupt_image):
+    path, _ = corrupt_image
+    generate_derivatives(path)
+    media_derivatives.remove_derivatives(path)
+    assert not os.path.exists(failed_marker(path, "thumb"))
@@ -0,0 +1,91 @@
+import http.client
+import os
+import threading
+from http.server import ThreadingHTTPServer
+
+import pytest
+
+import media_server
+from media_server import MediaRequestHandler
+
+BODY = bytes(range(256)) * 4  # 1024 bytes
+HASHED = "ab" * 32 + ".mp3"
+
+
+@pytest.fixture
+def server(workdir, monkeypatch):
+    os.makedirs("guidance_media")
+    for name in ("clip.mp4", HASHED):
+        with open(os.path.join("guidance_media", name), "wb") as f:
+            f.write(BODY)
+    monkeypatch.setattr(media_server, "MEDIA_ROOTS", [str(workdir / "guidance_media")])
+
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), MediaRequestHandler)
+    threading.Thread(target=httpd.serve_forever, args=(0.05,), daemon=True).start()
+    yield httpd.server_address[1]
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def _get(port, path, headers=None, method="GET"):
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=5)
+    try:
+        conn.request(method, path, headers=headers or {})
+        resp = conn.getresponse()
+        return resp.status, dict(resp.getheaders()), resp.read()
+    finally:
+        conn.close()
+
+
+def test_full_file_advertises_ranges(server):
+    status, headers, body = _get(server, "/guidance_media/clip.mp4")
+    assert status == 200 and body == BODY
+    assert headers["Accept-Ranges"] == "bytes"
+    assert headers["Content-Type"] == "video/mp4"
+
+
+@pytest.mark.parametrize("spec, start, end", [
+    ("bytes=100-199", 100, 199),
+    ("bytes=1000-", 1000, 1023),
+    ("bytes=-24", 1000, 1023),
+    ("bytes=1000-5000", 1000, 1023),
+])
+def test_range_returns_206_with_the_slice(server, spec, start, end):
+    status, headers, body = _get(server, "/guidance_media/clip.mp4", {"Range": spec})
+    assert status == 206
+    assert body == BODY[start:end + 1]
+    assert headers["Content-Range"] == f"bytes {start}-{end}/{len(BODY)}"
+
+
+def test_unsatisfiable_range_is_416(server):
+    status, headers, body = _get(server, "/guidance_media/clip.mp4", {"Range": "bytes=2000-"})
+    assert status == 416 and body == b""
+    assert headers["Content-Range"] == f"bytes */{len(BODY)}"
+
+
+def test_stale_if_range_sends_the_whole_file(server):
+    status, _, body = _get(
+        server, "/guidance_media/clip.mp4", {"Range": "bytes=0-9", "If-Range": '"old"'},
+    )
+    assert status == 200 and body == BODY
+
+
+def test_revalidation_returns_304(server):
+    _, headers, _ = _get(server, "/guidance_media/clip.mp4")
+    status, _, body = _get(server, "/guidance_media/clip.mp4", {"If-None-Match": headers["ETag"]})
+    assert status == 304 and body == b""
+
+    status, _, _ = _get(
+        server, "/guidance_media/clip.mp4", {"If-Modified-Since": headers["Last-Modified"]},
+    )
+    assert status == 304
+
+
+def test_hashed_names_are_immutable(server):
+    _, headers, _ = _get(server, f"/guidance_media/{HASHED}", method="HEAD")
+    assert "immutable" in headers["Cache-Control"]
+
+
+def test_paths_outside_the_roots_are_404(server):
+    assert _get(server, "/guidance_media/../clip.mp4")[0] == 404
+    assert _get(server, "/elsewhere/clip.mp4")[0] == 404
@@ -0,0 +1,46 @@
+import os
+import time
+
+import pytest
+
+import media_store
+import practice_store
+from media_store import release_media
+
+
+@pytest.fixture
+def store(workdir, monkeypatch):
+    monkeypatch.setattr(practice_store, "load_approved_practices", lambda: {})
+    monkeypatch.setattr(practice_store, "save_approved_practices", lambda doc: None)
+    instance = practice_store.PracticeStore()
+    monkeypatch.setattr(media_store, "get_practice_store", lambda: instance)
+    os.makedirs("guidance_media")
+    return instance
+
+
+def _media(name, age=0):
+    path = os.path.join("guidance_media", name)
+    with open(path, "wb") as f:
+        f.write(b"x" * 10)
+    old = time.time() - age
+    os.utime(path, (old, old))
+    return path
+
+
+def test_release_removes_unreferenced_old_media(store):
+    path = _media("a.jpg", age=media_store.MEDIA_GC_GRACE_SECONDS + 60)
+    entry = store.add("meditation", {"text": "t", "image_path": path})
+    store.delete(entry["id"])
+    assert release_media(entry) == 10
+    assert not os.path.exists(path)
+
+
+def test_release_keeps_shared_and_recent_media(store):
+    shared = _media("shared.jpg", age=media_store.MEDIA_GC_GRACE_SECONDS + 60)
+    recent = _media("recent.jpg")
+    gone = store.add("meditation", {"text": "t", "image_path": shared, "audio_path": recent})
+    store.add("meditation", {"text": "u", "image_path": shared})
+    store.delete(gone["id"])
+
+    assert release_media(gone) == 0
+    assert os.path.exists(shared) and os.path.exists(recent)
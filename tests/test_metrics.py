@@ -0,0 +1,61 @@
+import os
+import subprocess
+import sys
+import threading
+
+import pytest
+
+import metrics
+from metrics import inc, observe, snapshot, span, suppressed
+
+
+@pytest.fixture(autouse=True)
+def clean_registry():
+    metrics.reset()
+    yield
+    metrics.reset()
+
+
+def test_suppressed_block_records_nothing():
+    with suppressed():
+        with span("rag.answer_question"):
+            pass
+        inc("chat.questions")
+        observe("rag.retrieve_passages", 5)
+    snap = snapshot()
+    assert snap["histograms"] == {} and snap["counters"] == {}
+
+    with span("rag.answer_question"):
+        pass
+    assert snapshot()["histograms"]["rag.answer_question"]["count"] == 1
+
+
+def test_suppression_is_per_thread():
+    inside = threading.Event()
+    release = threading.Event()
+
+    def warmup():
+        with suppressed():
+            inside.set()
+            release.wait(5)
+
+    thread = threading.Thread(target=warmup)
+    thread.start()
+    inside.wait(5)
+    inc("chat.questions")
+    release.set()
+    thread.join()
+    assert snapshot()["counters"]["chat.questions"] == 1
+
+
+def test_export_prunes_files_of_dead_processes(workdir, monkeypatch):
+    monkeypatch.setattr(metrics, "METRICS_DIR", "metrics")
+    os.makedirs("metrics")
+    dead = subprocess.Popen([sys.executable, "-c", "pass"])
+    dead.wait()
+    for pid in (dead.pid, os.getppid()):
+        with open(os.path.join("metrics", f"{pid}.json"), "w") as f:
+            f.write("{}")
+
+    metrics.export_metrics_file()
+    assert sorted(os.listdir("metrics")) == sorted(f"{p}.json" for p in (os.getpid(), os.getppid()))
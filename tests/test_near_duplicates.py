@@ -0,0 +1,37 @@
+from near_duplicates import NearDuplicateIndex, minhash, normalize_text, similarity
+
+MANTRA = "Om Namah Shivaya. Om Namah Shivaya. Shivaya Namah Om, the five syllables."
+
+
+def test_normalize_ignores_case_punctuation_and_spacing():
+    assert normalize_text("  Om,  NAMAH\nShivaya! ") == "om namah shivaya"
+
+
+def test_minhash_is_deterministic_and_empty_safe():
+    assert minhash(MANTRA) == minhash(MANTRA)
+    assert minhash("") is None and minhash("  !! ") is None
+
+
+def test_similarity_tracks_small_edits():
+    base = minhash(MANTRA)
+    assert similarity(base, minhash(MANTRA.upper() + "!")) == 1.0
+    assert similarity(base, minhash(MANTRA.replace("syllables", "sylables"))) >= 0.8
+    assert similarity(base, minhash("Sit quietly and follow the breath to the belly.")) < 0.3
+
+
+def test_index_finds_near_duplicates_only():
+    index = NearDuplicateIndex()
+    index.add("shiva", MANTRA)
+    index.add("breath", "Sit quietly and follow the breath down to the belly and back.")
+    assert len(index) == 2
+
+    assert index.find("om namah shivaya  om namah shivaya shivaya namah om the five syllables") == "shiva"
+    assert index.find("Gayatri: Om bhur bhuvah svah, tat savitur varenyam") is None
+    assert index.query("") == []
+
+
+def test_index_keeps_several_sketches_per_key():
+    index = NearDuplicateIndex()
+    index.add("p1", "First rendering of the prayer to the morning sun")
+    index.add("p1", MANTRA)
+    assert index.find(MANTRA) == "p1"
@@ -0,0 +1,94 @@
+import threading
+import time
+
+import pytest
+
+import online_suggestions
+from online_suggestions import cache_stats, fetch_suggestions, set_fetcher
+
+
+class FakeFetcher:
+    def __init__(self, results=None, delay=0.0, fail=False):
+        self.results = results if results is not None else []
+        self.delay = delay
+        self.fail = fail
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def __call__(self, deity_name, scope, level_label):
+        with self._lock:
+            self.calls.append((deity_name, scope, level_label))
+        time.sleep(self.delay)
+        if self.fail:
+            raise TimeoutError("lookup timed out")
+        return [dict(r, scope=scope) for r in self.results]
+
+
+@pytest.fixture(autouse=True)
+def restore_fetcher():
+    yield
+    set_fetcher(None)
+
+
+def test_results_are_cached_per_key():
+    fetcher = FakeFetcher([{"kind": "mantra", "text": "Om Gam"}])
+    set_fetcher(fetcher)
+
+    first = fetch_suggestions("Ganesha", "Mantras", "Beginner")
+    first[0]["text"] = "edited by the caller"
+    again = fetch_suggestions(" ganesha ", "Mantras", "Beginner")
+
+    assert again[0]["text"] == "Om Gam"
+    assert len(fetcher.calls) == 1
+    assert cache_stats()["hits"] == 1
+
+
+def test_both_fans_out_and_reuses_single_scope_entries():
+    fetcher = FakeFetcher([{"text": "x"}])
+    set_fetcher(fetcher)
+
+    fetch_suggestions("Shiva", "Mantras", "Any")
+    both = fetch_suggestions("Shiva", "Both", "Any")
+
+    assert [r["scope"] for r in both] == ["Mantras", "Meditations"]
+    assert sorted(c[1] for c in fetcher.calls) == ["Mantras", "Meditations"]
+
+
+def test_empty_results_expire_quickly(monkeypatch):
+    monkeypatch.setattr(online_suggestions, "ONLINE_EMPTY_TTL_SECONDS", 0.05)
+    fetcher = FakeFetcher([])
+    set_fetcher(fetcher)
+
+    assert fetch_suggestions("Devi", "Mantras", "Any") == []
+    fetch_suggestions("Devi", "Mantras", "Any")
+    assert len(fetcher.calls) == 1
+
+    time.sleep(0.1)
+    fetcher.results = [{"text": "Om Dum"}]
+    assert fetch_suggestions("Devi", "Mantras", "Any")[0]["text"] == "Om Dum"
+
+
+def test_errors_are_not_cached():
+    fetcher = FakeFetcher([{"text": "Om"}], fail=True)
+    set_fetcher(fetcher)
+    with pytest.raises(TimeoutError):
+        fetch_suggestions("Rama", "Mantras", "Any")
+
+    fetcher.fail = False
+    assert fetch_suggestions("Rama", "Mantras", "Any")
+    assert len(fetcher.calls) == 2
+
+
+def test_concurrent_misses_share_one_fetch():
+    fetcher = FakeFetcher([{"text": "Om"}], delay=0.1)
+    set_fetcher(fetcher)
+
+    threads = [
+        threading.Thread(target=fetch_suggestions, args=("Krishna", "Mantras", "Any"))
+        for _ in range(8)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(fetcher.calls) == 1
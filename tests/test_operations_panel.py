@@ -0,0 +1,19 @@
+import datetime
+
+import admin_module
+
+
+def test_hit_ratio():
+    assert admin_module._hit_ratio({"hits": 0, "misses": 0}) == "–"
+    assert admin_module._hit_ratio({"hits": 3, "misses": 1}) == "75% of 4"
+
+
+def test_session_counts_split_active_from_stored(monkeypatch):
+    now = datetime.datetime.now()
+    sessions = {
+        "fresh": {"created_at": now.isoformat()},
+        "old": {"created_at": (now - datetime.timedelta(days=1)).isoformat()},
+        "broken": {"created_at": "yesterday"},
+    }
+    monkeypatch.setattr(admin_module, "load_session_records", lambda: sessions)
+    assert admin_module._session_counts() == (1, 3)
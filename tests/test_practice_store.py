@@ -0,0 +1,161 @@
+import json
+import os
+import threading
+import time
+
+import pytest
+
+import practice_store
+from json_store import store_lock
+from practice_store import PracticeStore, StaleEntryError
+
+
+@pytest.fixture
+def legacy(workdir, monkeypatch):
+    """Stand-in for the legacy approved-practices document."""
+    doc = {
+        "meditation": [{"text": "Breathe slowly"}],
+        "mantra": [{"mantra_text": "Om Namah Shivaya", "deity": "Shiva", "level": 2}],
+    }
+    exports = []
+    monkeypatch.setattr(practice_store, "load_approved_practices", lambda: doc)
+    monkeypatch.setattr(practice_store, "save_approved_practices", exports.append)
+    return exports
+
+
+def test_bootstrap_imports_legacy_document(legacy):
+    store = PracticeStore()
+    assert [e["text"] for e in store.list("meditation")] == ["Breathe slowly"]
+    (mantra,) = store.list("mantra")
+    assert mantra["rev"] == 1 and mantra["id"]
+
+
+def test_journal_replays_into_a_fresh_instance(legacy):
+    store = PracticeStore()
+    added = store.add("mantra", {"mantra_text": "Om Gam", "deity": "Ganesha"})
+    store.put({"id": added["id"], "level": 5})
+    first = store.list("meditation")[0]
+    store.delete(first["id"])
+
+    other = PracticeStore()
+    assert other.get(first["id"]) is None
+    entry = other.get(added["id"])
+    assert entry["level"] == 5 and entry["rev"] == 2
+    assert other.query("mantra", deity="Ganesha")[0]["band"] == "Intermediate"
+
+
+def test_torn_journal_tail_is_ignored_until_completed(legacy):
+    store = PracticeStore()
+    store.add("meditation", {"text": "Walk"})
+    path = store._journal_path()
+    record = json.dumps({"op": "put", "entry": {"id": "x1", "kind": "meditation", "seq": 99, "text": "Torn"}})
+
+    with open(path, "a") as f:
+        f.write(record[:20])  # crash mid-append
+    reader = PracticeStore()
+    assert [e["text"] for e in reader.list("meditation")] == ["Breathe slowly", "Walk"]
+
+    with open(path, "a") as f:
+        f.write(record[20:] + "\n")
+    assert reader.get("x1")["text"] == "Torn"
+
+
+def test_stale_rev_is_rejected(legacy):
+    store = PracticeStore()
+    entry = store.list("mantra")[0]
+    store.put({"id": entry["id"], "level": 4}, expected_rev=entry["rev"])
+    with pytest.raises(StaleEntryError):
+        store.put({"id": entry["id"], "level": 9}, expected_rev=entry["rev"])
+
+
+def test_compaction_folds_journal_into_snapshot(legacy, monkeypatch):
+    monkeypatch.setattr(practice_store, "PRACTICE_COMPACT_AFTER", 3)
+    store = PracticeStore()
+    for i in range(4):
+        store.add("meditation", {"text": f"Step {i}"})
+
+    assert store._generation == 2
+    assert not os.path.exists(store._journal_path(1))
+    reader = PracticeStore()
+    assert len(reader.list("meditation")) == 5
+    assert reader._journal_records < 3
+
+
+def test_legacy_document_is_exported_at_compaction_only(legacy):
+    store = PracticeStore()
+    store.add("mantra", {"mantra_text": "Om Shanti"})
+    assert legacy == []
+
+    store.compact()
+    assert [m["mantra_text"] for m in legacy[-1]["mantra"]] == ["Om Namah Shivaya", "Om Shanti"]
+    assert "rev" not in legacy[-1]["mantra"][0]
+
+
+def test_first_read_does_not_deadlock_with_a_writer(legacy):
+    store = PracticeStore()
+    locked = threading.Event()
+    acquired = []
+
+    def writer():
+        # Same order as put_many(): store_lock, then the instance lock.
+        with store_lock("practice_store"):
+            locked.set()
+            time.sleep(0.2)
+            acquired.append(store._lock.acquire(timeout=2))
+            if acquired[-1]:
+                store._lock.release()
+
+    thread = threading.Thread(target=writer)
+    thread.start()
+    locked.wait(5)
+    reader = threading.Thread(target=store.list, args=("meditation",))
+    reader.start()
+    thread.join()
+    reader.join()
+    assert acquired == [True]
+
+
+def test_replace_kind_does_not_revive_deleted_entries(legacy):
+    store = PracticeStore()
+    edited = store.list("meditation")
+    deleted = store.add("meditation", {"text": "Gone"})
+    edited.append(deleted)
+    PracticeStore().delete(deleted["id"])  # another admin
+
+    edited[0]["text"] = "Breathe deeply"
+    edited.append({"text": "New"})
+    store.replace_kind("meditation", edited)
+
+    assert [e["text"] for e in store.list("meditation")] == ["Breathe deeply", "New"]
+    assert [m["mantra_text"] for m in store.list("mantra")] == ["Om Namah Shivaya"]
+
+
+def test_query_rejects_unknown_band(legacy):
+    store = PracticeStore()
+    assert len(store.query("meditation", band="Beginner")) == 1
+    with pytest.raises(ValueError):
+        store.query("meditation", band="Advanced")
+    with pytest.raises(ValueError):
+        store.query("mantra", band="beginner")
+
+
+def test_add_unique_skips_near_duplicates(legacy):
+    store = PracticeStore()
+    added, dups = store.add_unique([
+        {"kind": "mantra", "text": "om namah shivaya"},
+        {"kind": "meditation", "text": "Count ten slow breaths, then rest"},
+        {"kind": "meditation", "text": "Count ten slow breaths, then rest."},
+    ])
+    assert (added, dups) == (1, 2)
+    assert len(store.list("meditation")) == 2
+
+
+def test_media_refcounts_follow_puts_and_deletes(legacy):
+    store = PracticeStore()
+    a = store.add("meditation", {"text": "A", "audio_path": "guidance_audio/x.mp3"})
+    b = store.add("meditation", {"text": "B", "audio_path": "guidance_audio/./x.mp3"})
+    assert store.media_refcount("guidance_audio/x.mp3") == 2
+
+    store.put({"id": b["id"], "audio_path": "guidance_audio/y.mp3"})
+    store.delete(a["id"])
+    assert PracticeStore().media_refcounts() == {"guidance_audio/y.mp3": 1}
@@ -0,0 +1,71 @@
+import os
+
+import pytest
+
+import profiling
+from profiling import list_profiles, profile_rerun, prune_profiles, request_profiling
+
+
+@pytest.fixture(autouse=True)
+def profile_dir(workdir, monkeypatch):
+    monkeypatch.setattr(profiling, "PROFILE_DIR", "profiles")
+
+
+def _touch(name, mtime):
+    os.makedirs("profiles", exist_ok=True)
+    path = os.path.join("profiles", name)
+    with open(path, "wb"):
+        pass
+    os.utime(path, (mtime, mtime))
+
+
+def test_armed_session_profiles_exactly_n_reruns():
+    state = {}
+    request_profiling(state, 2)
+    for _ in range(3):
+        with profile_rerun(state, "chat"):
+            sum(range(1000))
+
+    (profile,) = list_profiles()
+    assert profile["id"] == state["profile_id"] and profile["reruns"] == 2
+    assert profiling.top_functions(state["profile_id"])
+
+
+def test_only_the_newest_profiles_are_kept():
+    for i in range(5):
+        # Two reruns per profile; the group counts once.
+        _touch(f"20240101-00000{i}_abcd-1.prof", 1000 + i)
+        _touch(f"20240101-00000{i}_abcd-2.prof", 1000 + i)
+
+    prune_profiles(keep=3)
+    assert [p["id"] for p in list_profiles()] == [
+        "20240101-000004_abcd", "20240101-000003_abcd", "20240101-000002_abcd",
+    ]
+    assert len(os.listdir("profiles")) == 6
+
+
+def test_writing_a_profile_applies_profile_keep(monkeypatch):
+    monkeypatch.setattr(profiling, "PROFILE_KEEP", 1)
+    _touch("20240101-000000_abcd-1.prof", 1000)
+
+    state = {}
+    request_profiling(state, 1)
+    with profile_rerun(state):
+        pass
+
+    assert [p["id"] for p in list_profiles()] == [state["profile_id"]]
+
+
+def test_env_arms_matching_users_once(monkeypatch):
+    monkeypatch.setattr(profiling, "PROFILE_RERUNS", 3)
+    monkeypatch.setattr(profiling, "PROFILE_USER", "asha")
+
+    other = {}
+    profiling.enable_from_env(other, "ravi")
+    assert not profiling.profiling_active(other)
+
+    state = {}
+    profiling.enable_from_env(state, "asha")
+    state["profile_remaining"] = 0
+    profiling.enable_from_env(state, "asha")
+    assert not profiling.profiling_active(state)
@@ -0,0 +1,32 @@
+import session_store
+from session_store import (
+    create_session_record,
+    end_session,
+    load_session_records,
+    load_user_records,
+    lookup_session,
+    register_user,
+)
+
+
+def test_register_rejects_taken_name(workdir):
+    assert register_user("asha", {"username": "asha", "password": "x"})
+    assert not register_user("asha", {"username": "asha", "password": "y"})
+    assert load_user_records()["asha"]["password"] == "x"
+
+
+def test_session_round_trip(workdir):
+    token = create_session_record("user", "asha")
+    assert lookup_session(token)["username"] == "asha"
+    end_session(token)
+    assert lookup_session(token) is None
+
+
+def test_expired_session_is_removed(workdir):
+    token = create_session_record("user", "asha")
+    sessions = load_session_records()
+    sessions[token]["created_at"] = "2000-01-01T00:00:00"
+    session_store.save_sessions(sessions)
+
+    assert lookup_session(token) is None
+    assert token not in load_session_records()
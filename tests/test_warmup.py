@@ -0,0 +1,63 @@
+import pytest
+
+import metrics
+import rag_module
+import warmup
+
+
+class _Backend:
+    def __init__(self, fail=False):
+        self.fail = fail
+        self.questions = []
+
+    def retrieve_passages(self, question, age_group):
+        if self.fail:
+            raise RuntimeError("vector store missing")
+        return [{"text": "passage"}]
+
+    def answer_question(self, question, passages, age_group):
+        self.questions.append((question, age_group))
+        return "answer"
+
+
+@pytest.fixture(autouse=True)
+def fresh(monkeypatch):
+    monkeypatch.setattr(warmup, "WARMUP_ENABLED", True)
+    monkeypatch.setattr(warmup, "_thread", None)
+    metrics.reset()
+    yield
+    rag_module.configure_backend(None)
+    metrics.reset()
+
+
+def _run(backend):
+    rag_module.configure_backend(backend)
+    warmup.start_warmup()
+    warmup._thread.join(5)
+    return warmup.warmup_status()
+
+
+def test_warmup_answers_one_question_per_age_group_off_the_record():
+    backend = _Backend()
+    status = _run(backend)
+    assert status["state"] == "ready" and warmup.is_ready()
+    assert [a for _, a in backend.questions] == list(warmup.WARMUP_AGE_GROUPS)
+    assert metrics.snapshot()["histograms"] == {}
+
+
+def test_failed_warmup_still_counts_as_ready():
+    status = _run(_Backend(fail=True))
+    assert status["state"] == "failed" and "vector store" in status["error"]
+    assert warmup.is_ready()
+
+
+def test_warmup_runs_once_unless_forced():
+    backend = _Backend()
+    _run(backend)
+    warmup.start_warmup()
+    warmup._thread.join(5)
+    assert len(backend.questions) == len(warmup.WARMUP_AGE_GROUPS)
+
+    warmup.start_warmup(force=True)
+    warmup._thread.join(5)
+    assert len(backend.questions) == 2 * len(warmup.WARMUP_AGE_GROUPS)
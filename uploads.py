@@ -0,0 +1,54 @@
+"""
+uploads.py
+
+Chunked, hash-while-writing helpers for files uploaded through Streamlit.
+The upload is copied to disk in UPLOAD_CHUNK_SIZE pieces, so no extra
+full-size copy is made, and its SHA-256 is computed in the same pass.
+"""
+
+import contextlib
+import hashlib
+import os
+import tempfile
+
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+
+def stream_upload(upload, directory: str):
+    """
+    Copy an uploaded file into a temp file inside directory.
+    Returns (tmp_path, sha256_hex, size). The caller renames or removes
+    tmp_path.
+    """
+    os.makedirs(directory, exist_ok=True)
+    digest = hashlib.sha256()
+    size = 0
+
+    fd, tmp_path = tempfile.mkstemp(prefix=".upload-", suffix=".part", dir=directory)
+    try:
+        with os.fdopen(fd, "wb") as out:
+            if hasattr(upload, "seek"):
+                upload.seek(0)
+            while True:
+                chunk = upload.read(UPLOAD_CHUNK_SIZE)
+                if not chunk:
+                    break
+                digest.update(chunk)
+                out.write(chunk)
+                size += len(chunk)
+            out.flush()
+            os.fsync(out.fileno())
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.remove(tmp_path)
+        raise
+
+    return tmp_path, digest.hexdigest(), size
+
+
+def sha256_file(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(UPLOAD_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
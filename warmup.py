@@ -0,0 +1,87 @@
+"""
+warmup.py
+
+Background warm-up of the retrieval and generation stack.
+
+The first question in a fresh process otherwise pays for loading the
+vector store, the embedding model and the LLM client. start_warmup() runs
+once per process, in a daemon thread. It imports the RAG backend, which
+loads and keeps those resources at module level, and then runs one
+synthetic question per age group, with metrics suppressed so it does not
+show up in the Operations latencies. is_ready() tells the UI when this
+has finished.
+
+Set WARMUP_ENABLED=0 to skip it (e.g. for batch scripts).
+"""
+
+import datetime
+import os
+import threading
+import time
+
+from metrics import suppressed
+
+WARMUP_ENABLED = os.environ.get("WARMUP_ENABLED", "1") != "0"
+WARMUP_QUESTION = os.environ.get("WARMUP_QUESTION", "Tell me a short story about kindness.")
+WARMUP_AGE_GROUPS = ("child", "adult")
+
+_lock = threading.Lock()
+_thread = None
+_status = {
+    "state": "idle",  # idle | running | ready | failed
+    "started": None,
+    "seconds": None,
+    "age_groups": [],
+    "error": None,
+}
+
+
+def _run():
+    start = time.perf_counter()
+    try:
+        from rag_module import retrieve_passages, answer_question
+
+        with suppressed():
+            for age_group in WARMUP_AGE_GROUPS:
+                passages = retrieve_passages(WARMUP_QUESTION, age_group)
+                answer_question(WARMUP_QUESTION, passages, age_group)
+                with _lock:
+                    _status["age_groups"].append(age_group)
+        state, error = "ready", None
+    except Exception as e:
+        # A failed warm-up only means the first real question is slow.
+        state, error = "failed", str(e)
+
+    with _lock:
+        _status.update(state=state, error=error, seconds=round(time.perf_counter() - start, 2))
+
+
+def start_warmup(force: bool = False):
+    """Start warm-up unless it already ran (force=True re-runs it, e.g. after a reindex)."""
+    global _thread
+    if not WARMUP_ENABLED:
+        return
+
+    with _lock:
+        if _thread is not None and (_thread.is_alive() or not force):
+            return
+        _status.update(
+            state="running",
+            started=datetime.datetime.now().isoformat(timespec="seconds"),
+            seconds=None,
+            age_groups=[],
+            error=None,
+        )
+        _thread = threading.Thread(target=_run, name="warmup", daemon=True)
+        _thread.start()
+
+
+def is_ready() -> bool:
+    """True once warm-up has finished (or failed, or is disabled)."""
+    with _lock:
+        return not WARMUP_ENABLED or _status["state"] in ("ready", "failed")
+
+
+def warmup_status() -> dict:
+    with _lock:
+        return dict(_status, age_groups=list(_status["age_groups"]))